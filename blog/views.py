@@ -6,6 +6,7 @@ from django.views.decorators.http import require_POST
 from .models import (BlogPost, BlogReaction, BlogComment, BlogPostImage, 
                      BlogPostFile, BlogCommentImage, BlogCommentFile)
 from .forms import BlogPostForm, BlogCommentForm
+from core.comments import load_comment_tree
 
 
 def blog_list(request):
@@ -66,15 +67,9 @@ def blog_create(request):
 def blog_detail(request, pk):
     """Display a single blog post with comments"""
     post = get_object_or_404(BlogPost, pk=pk)
-    comments = post.comments.all().select_related(
-        'user', 'user__profile'
-    ).prefetch_related(
-        'images', 
-        'files',
-        'replies__images',
-        'replies__files',
-        'replies__user__profile'
-    )
+    # Whole comment thread in one query, linked into comment.children for the template
+    comments = load_comment_tree(post.comments.all(), like_relation=None, prefetch=['images', 'files'])
+    comment_count = sum(1 + comment.reply_count for comment in comments)
     
     # Get user's reaction
     user_reaction = None
@@ -128,6 +123,7 @@ def blog_detail(request, pk):
     context = {
         'post': post,
         'comments': comments,
+        'comment_count': comment_count,
         'comment_form': comment_form,
         'user_reaction': user_reaction,
     }
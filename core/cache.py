@@ -0,0 +1,138 @@
+"""
+Versioned caching for the public list pages (event_list, venue_list).
+
+Cache keys combine the normalized query string with the current number of every
+generation the page depends on ('events', 'venues'). Writes bump a generation
+(see core.signals), which orphans all pages built from it in O(1) - nothing is
+scanned or deleted, old entries simply expire with their TTL.
+
+Pages may be cached per process, but the generation numbers live in the
+'generations' cache (settings.CACHES) shared by every worker, so a committed
+write invalidates the pages of all workers on their next request.
+
+Anonymous HTML pages and JSON pages are cached whole; signed-in users share a
+cached results fragment (`request.list_cache` for the {% cache %} tag) since
+the rest of their page is personal.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+GENERATION_KEY = 'listcache:gen:{}'
+STATS_KEY = 'listcache:stats:{}:{}'
+
+
+def _fresh_generation():
+    # Time based, so a generation lost to eviction or a restart never repeats an old number
+    return int(time.time() * 1000)
+
+
+def generation_cache():
+    """The cache shared by all worker processes that holds generation numbers"""
+    return caches['generations' if 'generations' in settings.CACHES else 'default']
+
+
+def get_generations(names):
+    """Current generation number of each name, initializing missing ones"""
+    store = generation_cache()
+    keys = {GENERATION_KEY.format(name): name for name in names}
+    found = store.get_many(keys)
+    for key in keys.keys() - found.keys():
+        store.add(key, _fresh_generation(), None)
+        found[key] = store.get(key)
+    return {keys[key]: value for key, value in found.items()}
+
+
+def bump_generation(*names):
+    """Invalidate every cached page depending on the given generations"""
+    store = generation_cache()
+    for name in names:
+        key = GENERATION_KEY.format(name)
+        try:
+            store.incr(key)
+        except ValueError:
+            store.set(key, _fresh_generation(), None)
+
+
+def _count(name, outcome):
+    key = STATS_KEY.format(name, outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def cache_stats(names):
+    """{name: {'hits': n, 'misses': n}} for the given cached views"""
+    counts = cache.get_many([STATS_KEY.format(name, outcome) for name in names for outcome in ('hits', 'misses')])
+    return {
+        name: {outcome: counts.get(STATS_KEY.format(name, outcome), 0) for outcome in ('hits', 'misses')}
+        for name in names
+    }
+
+
+def reset_cache_stats(names):
+    cache.delete_many([STATS_KEY.format(name, outcome) for name in names for outcome in ('hits', 'misses')])
+
+
+def list_cache_key(request, name, depends_on):
+    """Key for this request's page: generations + today's date + normalized query parameters"""
+    params = sorted(
+        (key, value) for key in request.GET for value in request.GET.getlist(key) if value
+    )
+    generations = get_generations(depends_on)
+    # The date is part of the key because live/upcoming/completed are classified by day
+    raw = '|'.join([
+        name,
+        ','.join(f'{dep}={generations[dep]}' for dep in depends_on),
+        timezone.localdate().isoformat(),
+        urlencode(params),
+    ])
+    return f'listcache:page:{name}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def _has_pending_messages(request):
+    storage = getattr(request, '_messages', None)
+    return storage is not None and len(storage) > 0
+
+
+def cache_list_page(name, depends_on):
+    """
+    Serve a list view from the versioned cache.
+    The TTL comes from settings.LIST_CACHE_TTL[name] in seconds; 0 or a missing entry disables caching.
+    depends_on is a list of generation names, or a function of the request returning one.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            ttl = getattr(settings, 'LIST_CACHE_TTL', {}).get(name, 0)
+            if not ttl or request.method != 'GET':
+                request.list_cache = {'ttl': 0, 'key': ''}
+                return view(request, *args, **kwargs)
+
+            generations = depends_on(request) if callable(depends_on) else depends_on
+            key = list_cache_key(request, name, generations)
+            request.list_cache = {'ttl': ttl, 'key': key}
+            personal = request.user.is_authenticated and request.GET.get('format') != 'json'
+            if personal or _has_pending_messages(request):
+                return view(request, *args, **kwargs)
+
+            cached = cache.get(key)
+            if cached is not None:
+                _count(name, 'hits')
+                return HttpResponse(cached['content'], content_type=cached['content_type'])
+
+            _count(name, 'misses')
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(key, {'content': response.content, 'content_type': response['Content-Type']}, ttl)
+            return response
+        return wrapper
+    return decorator
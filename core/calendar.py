@@ -0,0 +1,225 @@
+"""
+iCalendar (.ics) feeds for calendar apps.
+
+A feed is addressed by the secret token of a CalendarFeed: a user's confirmed
+event and venue bookings, an organizer's events, or a venue's schedule.
+
+Calendar clients poll feeds every few minutes, so answering "nothing changed"
+is kept cheap. The token is cached (resolving it is one indexed lookup on a
+miss), and the ETag/Last-Modified validators - the latest updated_at and the
+row count of everything the feed shows - are cached under the generations its
+rows depend on, which core.signals bumps after every committed write. A poll
+ending in a 304 therefore normally runs a single query, the read of those
+generations from the shared generations cache. Bodies are streamed.
+"""
+import hashlib
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Q
+from django.urls import reverse
+
+from events.models import Event, EventBooking, SOLD_BOOKING_STATUSES
+from venues.models import Venue, VenueBooking, BLOCKING_BOOKING_STATUSES
+from .cache import get_generations
+from .models import CalendarFeed
+
+FEED_CACHE_KEY = 'calendar:feed:{}'
+VALIDATORS_CACHE_KEY = 'calendar:validators:{}:{}'
+
+# Generations of the rows of one user's / one venue's feeds (bumped in core.signals)
+USER_GENERATION = 'calendar:user:{}'
+VENUE_GENERATION = 'calendar:venue:{}'
+
+FEED_CHUNK_SIZE = 500
+
+
+def _ttl():
+    return getattr(settings, 'CALENDAR_FEED_TTL', 3600)
+
+
+def user_feeds(user):
+    """The feeds the user can subscribe to, created on first use"""
+    feeds = [CalendarFeed.for_owner(user, 'bookings')]
+    role = getattr(getattr(user, 'profile', None), 'role', None)
+    if user.is_superuser or role in ('admin', 'event_manager') or user.organized_events.exists():
+        feeds.append(CalendarFeed.for_owner(user, 'organizer'))
+    for venue in Venue.objects.filter(manager=user).order_by('name'):
+        feeds.append(CalendarFeed.for_owner(user, 'venue', venue))
+    return feeds
+
+
+def resolve_feed(token):
+    """{'token', 'kind', 'owner_id', 'venue_id'} of the feed with this token, or None"""
+    key = FEED_CACHE_KEY.format(token)
+    feed = cache.get(key)
+    if feed is None:
+        # Venue feeds stop working once their owner no longer manages the venue
+        feed = CalendarFeed.objects.filter(token=token).filter(
+            Q(venue__isnull=True) | Q(venue__manager_id=F('owner_id'))
+        ).values('token', 'kind', 'owner_id', 'venue_id').first()
+        if feed is None:
+            return None
+        cache.set(key, feed, _ttl())
+    return feed
+
+
+def forget_feed(token):
+    cache.delete(FEED_CACHE_KEY.format(token))
+
+
+def rotate_feed_token(feed):
+    """Give the feed a new token, so the old URL stops working"""
+    old_token = feed.token
+    feed.token = CalendarFeed.new_token()
+    feed.save(update_fields=['token'])
+    forget_feed(old_token)
+
+
+def feed_generations(feed):
+    """Cache generations that change whenever a row of the feed changes"""
+    if feed['kind'] == 'bookings':
+        return [USER_GENERATION.format(feed['owner_id']), 'events', 'venues']
+    if feed['kind'] == 'organizer':
+        return ['events']
+    return [VENUE_GENERATION.format(feed['venue_id']), 'events', 'venues']
+
+
+def _event_entry(event):
+    location = ', '.join(part for part in [event.venue_name, event.venue_address] if part)
+    return {
+        'uid': f'event-{event.pk}',
+        'start': event.start_date,
+        'end': event.end_date,
+        'summary': event.title,
+        'description': event.description,
+        'location': location,
+        'url': reverse('events:event_detail', args=[event.pk]),
+        'modified': event.updated_at,
+    }
+
+
+def _event_booking_entry(booking):
+    entry = _event_entry(booking.event)
+    entry['modified'] = max(booking.updated_at, booking.event.updated_at)
+    return entry
+
+
+def _venue_booking_entry(booking):
+    venue = booking.venue
+    return {
+        'uid': f'venue-booking-{booking.pk}',
+        'start': booking.start_date,
+        'end': booking.end_date,
+        'summary': f'{booking.event_title} @ {venue.name}',
+        'description': booking.event_description,
+        'location': f'{venue.name}, {venue.address}, {venue.city}',
+        'url': reverse('venues:venue_detail', args=[venue.pk]),
+        'modified': max(booking.updated_at, venue.updated_at),
+    }
+
+
+def feed_sources(feed):
+    """(queryset, related objects shown, entry builder) for each kind of row in the feed"""
+    owner_id, venue_id = feed['owner_id'], feed['venue_id']
+    if feed['kind'] == 'bookings':
+        return [
+            (EventBooking.objects.filter(user_id=owner_id, status__in=SOLD_BOOKING_STATUSES, event__is_active=True),
+             ['event'], _event_booking_entry),
+            (VenueBooking.objects.filter(user_id=owner_id, status__in=BLOCKING_BOOKING_STATUSES),
+             ['venue'], _venue_booking_entry),
+        ]
+    if feed['kind'] == 'organizer':
+        return [(Event.objects.filter(organizer_id=owner_id, is_active=True), [], _event_entry)]
+    return [
+        (Event.objects.filter(venue_id=venue_id, is_active=True), [], _event_entry),
+        (VenueBooking.objects.filter(venue_id=venue_id, status__in=BLOCKING_BOOKING_STATUSES),
+         ['venue'], _venue_booking_entry),
+    ]
+
+
+def feed_validators(feed):
+    """{'etag': str, 'last_modified': datetime or None} for the feed's current content"""
+    names = feed_generations(feed)
+    generations = get_generations(names)
+    key = VALIDATORS_CACHE_KEY.format(feed['token'], ','.join(str(generations[name]) for name in names))
+    validators = cache.get(key)
+    if validators is None:
+        aggregates = []
+        for queryset, related, _ in feed_sources(feed):
+            fields = {'rows': Count('pk'), 'updated_at': Max('updated_at')}
+            for name in related:
+                fields[f'{name}_updated_at'] = Max(f'{name}__updated_at')
+            aggregates.append(sorted(queryset.order_by().aggregate(**fields).items()))
+        stamps = [value for aggregate in aggregates for name, value in aggregate if name != 'rows' and value]
+        validators = {
+            'etag': hashlib.md5(repr([feed['kind'], aggregates]).encode()).hexdigest(),
+            'last_modified': max(stamps) if stamps else None,
+        }
+        cache.set(key, validators, _ttl())
+    return validators
+
+
+def ics_escape(text):
+    """Escape a TEXT value (RFC 5545 3.3.11)"""
+    text = (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+    return text.replace('\r\n', '\\n').replace('\r', '\\n').replace('\n', '\\n')
+
+
+def ics_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_line(name, value):
+    """One content line, folded into 75-octet pieces without splitting a UTF-8 character"""
+    line = f'{name}:{value}'.encode()
+    pieces, limit = [], 75
+    while len(line) > limit:
+        cut = limit
+        while line[cut] & 0xC0 == 0x80:
+            cut -= 1
+        pieces.append(line[:cut])
+        line, limit = line[cut:], 74  # continuation lines start with a space
+    pieces.append(line)
+    return b'\r\n '.join(pieces).decode() + '\r\n'
+
+
+def _calendar_name(feed):
+    if feed['kind'] == 'venue':
+        name = Venue.objects.filter(pk=feed['venue_id']).values_list('name', flat=True).first()
+        return f'EventEase - {name}'
+    return f"EventEase - {dict(CalendarFeed.KIND_CHOICES)[feed['kind']]}"
+
+
+def stream_feed(feed, base_url):
+    """Yield the feed as iCalendar text, reading its rows in chunks"""
+    base_url = base_url.rstrip('/')
+    yield ''.join([
+        ics_line('BEGIN', 'VCALENDAR'),
+        ics_line('VERSION', '2.0'),
+        ics_line('PRODID', '-//EventEase//Calendar Feed//EN'),
+        ics_line('CALSCALE', 'GREGORIAN'),
+        ics_line('METHOD', 'PUBLISH'),
+        ics_line('X-WR-CALNAME', ics_escape(_calendar_name(feed))),
+    ])
+    for queryset, related, build_entry in feed_sources(feed):
+        if related:
+            queryset = queryset.select_related(*related)
+        for row in queryset.order_by('pk').iterator(chunk_size=FEED_CHUNK_SIZE):
+            entry = build_entry(row)
+            yield ''.join([
+                ics_line('BEGIN', 'VEVENT'),
+                ics_line('UID', f"{entry['uid']}@eventease"),
+                ics_line('DTSTAMP', ics_datetime(entry['modified'])),
+                ics_line('LAST-MODIFIED', ics_datetime(entry['modified'])),
+                ics_line('DTSTART', ics_datetime(entry['start'])),
+                ics_line('DTEND', ics_datetime(entry['end'])),
+                ics_line('SUMMARY', ics_escape(entry['summary'])),
+                ics_line('DESCRIPTION', ics_escape(entry['description'])),
+                ics_line('LOCATION', ics_escape(entry['location'])),
+                ics_line('URL', base_url + entry['url']),
+                ics_line('STATUS', 'CONFIRMED'),
+                ics_line('END', 'VEVENT'),
+            ])
+    yield ics_line('END', 'VCALENDAR')
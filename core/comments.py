@@ -0,0 +1,115 @@
+"""
+Comment thread loading shared by events, venues and blog.
+
+A whole thread is read with one query (user, profile and like count included) and
+linked into a tree in Python, so templates walk `comment.children` instead of
+issuing a query per `comment.replies` level.
+"""
+from django.apps import apps
+from django.db.models import Count, prefetch_related_objects
+
+# kind -> (comment model, field pointing at the commented object, text field, like relation)
+COMMENT_THREADS = {
+    'event': ('events.EventComment', 'event', 'comment', 'likes'),
+    'venue': ('venues.VenueComment', 'venue', 'comment', 'likes'),
+    'blog': ('blog.BlogComment', 'post', 'content', None),
+}
+
+# kind -> filters on the commented object matching what its detail page shows (404 otherwise)
+VISIBLE_OWNERS = {
+    'event': {'is_active': True},
+    'venue': {'is_available': True},
+    'blog': {},
+}
+
+
+def resolve_liked(comments, user, like_relation='likes'):
+    """
+    Set `liked_by_user` on every comment with one query for the user's likes among them,
+    instead of an EXISTS query per rendered comment.
+    """
+    comments = list(comments)
+    liked_ids = set()
+    if comments and user is not None and user.is_authenticated:
+        like_field = comments[0]._meta.get_field(like_relation)
+        liked_ids = set(like_field.related_model.objects.filter(
+            user=user, **{f'{like_field.field.name}__in': [comment.pk for comment in comments]}
+        ).values_list(f'{like_field.field.name}_id', flat=True))
+    for comment in comments:
+        comment.liked_by_user = comment.pk in liked_ids
+    return comments
+
+
+def load_comment_tree(queryset, like_relation='likes', prefetch=(), root_id=None, max_depth=None, user=None):
+    """
+    Build the reply tree for all comments in queryset.
+
+    Every comment gets `children` (oldest first), `depth` (0 for the returned level)
+    and `reply_count` (all descendants), plus `num_likes` and - when a user is given -
+    `liked_by_user`. With max_depth, comments at that depth keep their reply_count but
+    no children, so big subtrees can be fetched later with root_id. Returns the
+    top-level comments, or the direct replies of root_id.
+    """
+    comments = queryset.select_related('user', 'user__profile').order_by('created_at', 'pk')
+    if like_relation:
+        comments = comments.annotate(num_likes=Count(like_relation))
+    comments = list(comments)
+    if prefetch:
+        prefetch_related_objects(comments, *prefetch)
+    if like_relation and user is not None:
+        resolve_liked(comments, user, like_relation)
+
+    by_id = {comment.pk: comment for comment in comments}
+    roots = []
+    for comment in comments:
+        comment.children = []
+    for comment in comments:
+        if comment.parent_id == root_id:
+            roots.append(comment)
+        elif comment.parent_id in by_id:
+            by_id[comment.parent_id].children.append(comment)
+
+    # Iterative depth-first walk: depths on the way down, reply counts on the way up
+    stack = [(comment, 0, False) for comment in reversed(roots)]
+    while stack:
+        comment, depth, done = stack.pop()
+        if done:
+            comment.reply_count = sum(1 + child.reply_count for child in comment.children)
+            if max_depth is not None and depth >= max_depth:
+                comment.children = []
+            continue
+        comment.depth = depth
+        stack.append((comment, depth, True))
+        stack.extend((child, depth + 1, False) for child in reversed(comment.children))
+    return roots
+
+
+def load_thread_replies(kind, comment_id, max_depth=None, user=None):
+    """
+    Load the reply subtree under one comment of the given kind ('event', 'venue' or 'blog');
+    None when the comment is missing or its event/venue is not publicly visible
+    """
+    model_label, owner_field, _, like_relation = COMMENT_THREADS[kind]
+    model = apps.get_model(model_label)
+    visible = {f'{owner_field}__{field}': value for field, value in VISIBLE_OWNERS[kind].items()}
+    owner_id = model.objects.filter(pk=comment_id, **visible).values_list(f'{owner_field}_id', flat=True).first()
+    if owner_id is None:
+        return None
+    thread = model.objects.filter(**{f'{owner_field}_id': owner_id})
+    return load_comment_tree(thread, like_relation=like_relation, root_id=comment_id, max_depth=max_depth, user=user)
+
+
+def serialize_comment_tree(comments, text_field):
+    """Nested JSON-ready dicts for a loaded comment tree"""
+    return [{
+        'id': comment.pk,
+        'parent_id': comment.parent_id,
+        'user': comment.user.get_full_name() or comment.user.username,
+        'text': getattr(comment, text_field),
+        'image_url': comment.image.url if comment.image else None,
+        'created_at': comment.created_at.isoformat(),
+        'like_count': getattr(comment, 'num_likes', 0),
+        'liked': getattr(comment, 'liked_by_user', False),
+        'reply_count': comment.reply_count,
+        'replies': serialize_comment_tree(comment.children, text_field),
+    } for comment in comments]
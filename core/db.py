@@ -0,0 +1,35 @@
+"""
+Write transactions for the booking paths.
+
+SQLite starts a plain transaction as a reader; one that reads and then writes
+while another connection holds the write lock fails at once with "database is
+locked" instead of waiting for the busy timeout. write_atomic() begins the
+outermost transaction with BEGIN IMMEDIATE, so concurrent bookings, holds and
+payments queue for the write lock up front. Everything else keeps the default
+deferred transactions, so read-only requests are not serialized. Other
+backends lock rows (select_for_update / conditional UPDATEs) and get a plain
+atomic().
+"""
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def write_atomic(using=None):
+    """transaction.atomic() that takes the write lock when it begins; a savepoint when nested"""
+    connection = transaction.get_connection(using)
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+    # transaction_mode is read when the connection begins the transaction
+    connection.ensure_connection()
+    default_mode = connection.transaction_mode
+    connection.transaction_mode = 'IMMEDIATE'
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = default_mode
+            yield
+    finally:
+        connection.transaction_mode = default_mode
@@ -0,0 +1,165 @@
+"""
+Resized WebP/JPEG renditions of uploaded images, for responsive <img srcset>.
+
+Every image field in RENDITION_FIELDS gets downscaled copies stored next to the
+original (venues/images/hall.jpg -> venues/images/hall.640w.webp, .640w.jpg) and
+a manifest (hall.renditions.json) written last, listing them. Renditions are
+generated in a background thread pool once the upload is committed
+(core.signals), or for existing files by the generate_renditions command.
+
+Templates read the manifest through {% responsive_image %} (core/templatetags/
+image_extras.py); the manifest is cached, so a list page costs one cache lookup
+per image. Until an image's manifest exists the original is served as before.
+"""
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+CARD_WIDTHS = [320, 640, 1280]
+AVATAR_WIDTHS = [64, 128, 256]
+
+# (model label, image field, rendition widths in px)
+RENDITION_FIELDS = [
+    ('venues.Venue', 'main_image', CARD_WIDTHS),
+    ('venues.VenueImage', 'image', CARD_WIDTHS),
+    ('events.Event', 'image', CARD_WIDTHS),
+    ('users.UserProfile', 'avatar', AVATAR_WIDTHS),
+    ('blog.BlogPost', 'image', CARD_WIDTHS),
+    ('blog.BlogPostImage', 'image', CARD_WIDTHS),
+]
+
+MANIFEST_CACHE_KEY = 'image_renditions:{}'
+# Seconds "no renditions yet" is remembered, so they show up soon after a worker finishes
+MISSING_MANIFEST_TTL = 60
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def manifest_name(name):
+    return f'{os.path.splitext(name)[0]}.renditions.json'
+
+
+def rendition_name(name, width, extension):
+    return f'{os.path.splitext(name)[0]}.{width}w.{extension}'
+
+
+def _save(storage, name, content):
+    # Deterministic names: replace what an earlier run left behind
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(content))
+
+
+def _encode(image, image_format, **options):
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _flatten(image):
+    """RGB copy for JPEG, with transparency composited onto white"""
+    if image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image
+
+
+def generate_renditions(name, widths, storage=None, force=False):
+    """
+    Write the renditions and manifest of the stored image `name` and return the manifest,
+    or None if the file is missing or not an image. Widths at or above the original's are
+    skipped (no upscaling); an image smaller than every width gets one re-encoded copy.
+    """
+    storage = storage or default_storage
+    manifest_path = manifest_name(name)
+    if not force and storage.exists(manifest_path):
+        return read_manifest(name, storage)
+    try:
+        with storage.open(name) as fileobj:
+            image = ImageOps.exif_transpose(Image.open(fileobj))
+            image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        logger.warning('Cannot make renditions of %s: %s', name, exc)
+        return None
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    quality = _setting('IMAGE_RENDITION_QUALITY', 80)
+    targets = sorted({width for width in widths if width < image.width} or {image.width}, reverse=True)
+    renditions = []
+    source = image
+    # Largest first, each resized from the previous one: much cheaper than from the original every time
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        source = source.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        renditions.append({
+            'width': width,
+            'height': height,
+            'webp': _save(storage, rendition_name(name, width, 'webp'), _encode(source, 'WEBP', quality=quality, method=4)),
+            'jpeg': _save(storage, rendition_name(name, width, 'jpg'),
+                          _encode(_flatten(source), 'JPEG', quality=quality, optimize=True, progressive=True)),
+        })
+    manifest = {'width': image.width, 'height': image.height, 'renditions': renditions[::-1]}
+    _save(storage, manifest_path, json.dumps(manifest).encode())
+    cache.set(MANIFEST_CACHE_KEY.format(name), manifest, _setting('IMAGE_RENDITION_CACHE_TTL', 86400))
+    return manifest
+
+
+def read_manifest(name, storage=None):
+    """The manifest of a stored image, or None while it has no renditions (cached either way)"""
+    key = MANIFEST_CACHE_KEY.format(name)
+    manifest = cache.get(key)
+    if manifest is None:
+        storage = storage or default_storage
+        try:
+            with storage.open(manifest_name(name)) as fileobj:
+                manifest = json.load(fileobj)
+        except (OSError, ValueError):
+            cache.set(key, False, MISSING_MANIFEST_TTL)
+            return None
+        cache.set(key, manifest, _setting('IMAGE_RENDITION_CACHE_TTL', 86400))
+    return manifest or None
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_setting('IMAGE_RENDITION_WORKERS', 2), thread_name_prefix='renditions'
+            )
+    return _executor
+
+
+def _generate_logged(name, widths):
+    try:
+        generate_renditions(name, widths)
+    except Exception:
+        logger.exception('Generating renditions of %s failed', name)
+
+
+def schedule_renditions(name, widths):
+    """Generate renditions in the background once the current transaction commits"""
+    if not _setting('IMAGE_RENDITIONS_ASYNC', True):
+        transaction.on_commit(lambda: _generate_logged(name, widths))
+        return
+    transaction.on_commit(lambda: _pool().submit(_generate_logged, name, widths))
@@ -0,0 +1,55 @@
+"""
+Management command to generate WebP/JPEG renditions of the images already in media/
+Usage: python manage.py generate_renditions [--workers N] [--force]
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.images import RENDITION_FIELDS, generate_renditions
+
+
+def _generate(name, widths, force):
+    return generate_renditions(name, widths, force=force) is not None
+
+
+class Command(BaseCommand):
+    help = 'Generate resized renditions of every uploaded venue, event, avatar and blog image, in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--force', action='store_true', help='Regenerate images that already have renditions')
+
+    def handle(self, *args, **options):
+        jobs = {}
+        for label, field, widths in RENDITION_FIELDS:
+            model = apps.get_model(label)
+            names = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            for name in names.values_list(field, flat=True).distinct().iterator():
+                jobs.setdefault(name, widths)
+
+        # Workers only touch files; do not let them inherit open database connections
+        connections.close_all()
+        started = time.monotonic()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=max(1, options['workers']), initializer=django.setup) as pool:
+            futures = {pool.submit(_generate, name, widths, options['force']): name for name, widths in jobs.items()}
+            for future in as_completed(futures):
+                try:
+                    error = None if future.result() else 'missing or not an image'
+                except Exception as exc:
+                    error = exc
+                if error is None:
+                    done += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f'❌ {futures[future]}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Renditions ready for {done} images in {time.monotonic() - started:.1f}s ({failed} failed)'
+        ))
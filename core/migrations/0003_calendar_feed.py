@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_remove_notification_status_notification_booking_id_and_more'),
+        ('venues', '0012_venuebooking_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, unique=True)),
+                ('kind', models.CharField(choices=[('bookings', 'My Bookings'), ('organizer', 'Organized Events'), ('venue', 'Venue Schedule')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feeds', to=settings.AUTH_USER_MODEL)),
+                ('venue', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feeds', to='venues.venue')),
+            ],
+            options={
+                'ordering': ['kind', 'venue_id'],
+                'unique_together': {('owner', 'kind', 'venue')},
+            },
+        ),
+    ]
@@ -1,3 +1,5 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -55,3 +57,40 @@ class Notification(models.Model):
             notification_type=notification_type,
             **kwargs
         )
+
+
+class CalendarFeed(models.Model):
+    """
+    Secret-token iCalendar feed a user can subscribe to from a calendar app:
+    their own bookings, the events they organize, or the schedule of a venue they manage
+    """
+    KIND_CHOICES = [
+        ('bookings', 'My Bookings'),
+        ('organizer', 'Organized Events'),
+        ('venue', 'Venue Schedule'),
+    ]
+    
+    token = models.CharField(max_length=64, unique=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='calendar_feeds')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    venue = models.ForeignKey('venues.Venue', on_delete=models.CASCADE, related_name='calendar_feeds', null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['owner', 'kind', 'venue']
+        ordering = ['kind', 'venue_id']
+    
+    def __str__(self):
+        return f"{self.owner.username} - {self.get_kind_display()}"
+    
+    @staticmethod
+    def new_token():
+        return secrets.token_urlsafe(32)
+    
+    @classmethod
+    def for_owner(cls, owner, kind, venue=None):
+        """The owner's feed of this kind, created with a fresh token on first use"""
+        feed = cls.objects.filter(owner=owner, kind=kind, venue=venue).first()
+        if feed is None:
+            feed = cls.objects.create(owner=owner, kind=kind, venue=venue, token=cls.new_token())
+        return feed
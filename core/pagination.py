@@ -0,0 +1,192 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of COUNT(*) + OFFSET, each page is fetched with a WHERE clause that starts
+right after the last row already shown, so deep pages cost the same as the first one.
+The position is carried between requests as an opaque, signed cursor token.
+"""
+import heapq
+from datetime import date, datetime
+from decimal import Decimal
+from functools import cmp_to_key
+
+from django.core import signing
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import JsonResponse
+
+CURSOR_SALT = 'core.pagination.cursor'
+
+
+def _dump_value(value):
+    # Full precision: DjangoJSONEncoder would truncate microseconds and break ties
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _compare(a, b):
+    if a == b:
+        return 0
+    return -1 if a < b else 1
+
+
+class CursorPage:
+    """One page of a CursorPaginator; iterates like a django Page"""
+    
+    is_cursor = True
+    
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def __getitem__(self, index):
+        return self.object_list[index]
+    
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    def has_previous(self):
+        return self.previous_cursor is not None
+    
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate one or more querysets by a unique ordering.
+    
+    `ordering` is a list of field/annotation names (prefix '-' for descending) and
+    must end with a unique column, normally 'pk'/'-pk'; the ordering columns must
+    not be NULL. Several querysets sharing
+    the same ordering fields can be passed as `sources`; their pages are merged.
+    """
+    
+    def __init__(self, sources, per_page, ordering):
+        self.sources = list(sources) if isinstance(sources, (list, tuple)) else [sources]
+        self.per_page = int(per_page)
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.descending = [name.startswith('-') for name in ordering]
+    
+    # Cursor tokens
+    
+    def _key(self, obj, source_index):
+        return tuple(getattr(obj, field) for field in self.fields) + (source_index,)
+    
+    def encode_cursor(self, key, backwards=False):
+        values = [_dump_value(value) for value in key]
+        return signing.dumps({'k': values, 'b': backwards}, salt=CURSOR_SALT, compress=True)
+    
+    def decode_cursor(self, token):
+        """Return (key, backwards) or None for a missing/invalid token"""
+        if not token:
+            return None
+        try:
+            data = signing.loads(token, salt=CURSOR_SALT)
+            key, backwards = data['k'], bool(data['b'])
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            return None
+        if not isinstance(key, list) or len(key) != len(self.fields) + 1:
+            return None
+        return key, backwards
+    
+    # Query building
+    
+    def _after(self, key, source_index, backwards):
+        """Q selecting the rows of one source that come strictly after `key`"""
+        *values, key_source = key
+        conditions = Q(pk__in=[])
+        equal = Q()
+        for field, descending, value in zip(self.fields, self.descending, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            conditions |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        # Identical keys in different sources are ordered by source index
+        if source_index != key_source and (source_index > key_source) != backwards:
+            conditions |= equal
+        return conditions
+    
+    def _ordered(self, queryset, backwards):
+        return queryset.order_by(*[
+            f'-{field}' if descending != backwards else field
+            for field, descending in zip(self.fields, self.descending)
+        ])
+    
+    def _merge_order(self, backwards):
+        def compare(a, b):
+            for position, descending in enumerate(self.descending + [False]):
+                result = _compare(a[0][position], b[0][position])
+                if result:
+                    return -result if descending != backwards else result
+            return 0
+        return cmp_to_key(compare)
+    
+    def get_page(self, cursor=None):
+        position = self.decode_cursor(cursor)
+        backwards = bool(position and position[1])
+        limit = self.per_page + 1
+        
+        rows = []
+        for source_index, queryset in enumerate(self.sources):
+            if position:
+                queryset = queryset.filter(self._after(position[0], source_index, backwards))
+            for obj in self._ordered(queryset, backwards)[:limit]:
+                rows.append((self._key(obj, source_index), obj))
+        
+        if len(self.sources) > 1:
+            rows = heapq.nsmallest(limit, rows, key=self._merge_order(backwards))
+        
+        has_more = len(rows) > self.per_page
+        if backwards and not has_more:
+            # Walked back to the start - serve a full first page instead
+            return self.get_page(None)
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self.encode_cursor(rows[-1][0])
+            if position:
+                previous_cursor = self.encode_cursor(rows[0][0], backwards=True)
+        
+        return CursorPage([obj for _, obj in rows], next_cursor, previous_cursor)
+
+
+def wants_cursor(request, cursor_default=False):
+    """Cursor mode is used when a cursor or JSON is requested, or by default for a view"""
+    if 'cursor' in request.GET or request.GET.get('format') == 'json':
+        return True
+    return cursor_default and 'page' not in request.GET
+
+
+def paginate(request, queryset, per_page, ordering=None, cursor_default=False):
+    """
+    Return a keyset CursorPage when cursor mode applies (and an ordering is given),
+    otherwise a regular offset-based Page.
+    """
+    if ordering and wants_cursor(request, cursor_default):
+        return CursorPaginator(queryset, per_page, ordering).get_page(request.GET.get('cursor'))
+    return Paginator(queryset, per_page).get_page(request.GET.get('page'))
+
+
+def cursor_page_json(page, serialize):
+    """JSON body for a CursorPage: serialized results plus the cursors to continue with"""
+    return JsonResponse({
+        'results': [serialize(obj) for obj in page],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+        'has_next': page.has_next(),
+        'has_previous': page.has_previous(),
+    })
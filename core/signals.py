@@ -0,0 +1,67 @@
+"""
+Django signals invalidating the cached list pages and calendar feed validators
+when the models they show change, and queueing renditions of uploaded images
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .calendar import USER_GENERATION, VENUE_GENERATION, forget_feed
+from .images import RENDITION_FIELDS, read_manifest, schedule_renditions
+
+# Model -> list page generations it appears in
+LIST_CACHE_DEPENDENCIES = {
+    'events.Event': ['events'],
+    'events.TicketCategory': ['events'],
+    'reviews.EventReview': ['events'],
+    'venues.Venue': ['venues'],
+    'venues.VenueImage': ['venues'],
+    'reviews.VenueReview': ['venues'],
+    # Only pages filtered by an availability window depend on bookings
+    'venues.VenueBooking': ['venue_bookings'],
+}
+
+
+def _bump(generations):
+    def receiver(sender, **kwargs):
+        # After commit, so a request racing the write cannot cache the old rows under the new generation
+        transaction.on_commit(lambda: bump_generation(*generations))
+    return receiver
+
+
+for model, generations in LIST_CACHE_DEPENDENCIES.items():
+    handler = _bump(generations)
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'list_cache_{model}_save')
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'list_cache_{model}_delete')
+
+
+@receiver([post_save, post_delete], sender='events.EventBooking')
+def invalidate_booking_calendar(sender, instance, **kwargs):
+    generation = USER_GENERATION.format(instance.user_id)
+    transaction.on_commit(lambda: bump_generation(generation))
+
+
+@receiver([post_save, post_delete], sender='venues.VenueBooking')
+def invalidate_venue_booking_calendars(sender, instance, **kwargs):
+    generations = [USER_GENERATION.format(instance.user_id), VENUE_GENERATION.format(instance.venue_id)]
+    transaction.on_commit(lambda: bump_generation(*generations))
+
+
+@receiver(post_delete, sender='core.CalendarFeed')
+def forget_deleted_feed(sender, instance, **kwargs):
+    forget_feed(instance.token)
+
+
+def _queue_renditions(field, widths):
+    def receiver(sender, instance, **kwargs):
+        image = getattr(instance, field)
+        if image and read_manifest(image.name) is None:
+            schedule_renditions(image.name, widths)
+    return receiver
+
+
+for model, field, widths in RENDITION_FIELDS:
+    post_save.connect(
+        _queue_renditions(field, widths), sender=model, weak=False, dispatch_uid=f'renditions_{model}_{field}'
+    )
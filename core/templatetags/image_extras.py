@@ -0,0 +1,44 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from core.images import read_manifest
+
+register = template.Library()
+
+
+def _srcset(storage, manifest, image_format):
+    return ', '.join(
+        f"{storage.url(rendition[image_format])} {rendition['width']}w" for rendition in manifest['renditions']
+    )
+
+
+@register.simple_tag
+def srcset(image, image_format='webp'):
+    """srcset value listing the 'webp' or 'jpeg' renditions of an image field ('' until they exist)"""
+    manifest = read_manifest(image.name, image.storage) if image else None
+    return _srcset(image.storage, manifest, image_format) if manifest else ''
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', **attrs):
+    """
+    <picture> offering the WebP renditions of an image field, with JPEG renditions as the
+    fallback, e.g. {% responsive_image venue.main_image venue.name sizes="(max-width: 768px) 100vw, 400px" class="card-img" %}.
+    Extra keyword arguments become <img> attributes. Renders a plain <img> of the original
+    while the renditions are being generated.
+    """
+    if not image:
+        return ''
+    attrs.setdefault('loading', 'lazy')
+    extra = format_html_join('', ' {}="{}"', ((name.replace('_', '-'), value) for name, value in attrs.items()))
+    manifest = read_manifest(image.name, image.storage)
+    if not manifest:
+        return format_html('<img src="{}" alt="{}"{}>', image.url, alt, extra)
+    fallback = manifest['renditions'][-1]
+    # display: contents keeps the <img> laid out as a direct child of the surrounding card
+    return format_html(
+        '<picture style="display: contents"><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        _srcset(image.storage, manifest, 'webp'), sizes,
+        image.storage.url(fallback['jpeg']), _srcset(image.storage, manifest, 'jpeg'), sizes, alt, extra,
+    )
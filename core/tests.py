@@ -1,3 +1,484 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.template import Context, Template
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from events.models import Event, EventBooking, EventComment, EventCommentLike
+from venues.models import Venue, VenueComment
+
+from .cache import GENERATION_KEY, cache_stats, get_generations
+from .calendar import ics_line, rotate_feed_token
+from .comments import load_comment_tree
+from .db import write_atomic
+from .images import generate_renditions, manifest_name, read_manifest
+from .models import CalendarFeed
+from .pagination import CursorPaginator
+
+
+class ListCacheGenerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create(username='organizer')
+
+    def create_event(self):
+        now = timezone.now()
+        return Event.objects.create(
+            title='Test Event', description='An event', organizer=self.organizer,
+            venue_name='Test Hall', venue_address='1 Test Street',
+            start_date=now + timedelta(days=30), end_date=now + timedelta(days=31),
+            contact_email='organizer@example.com',
+        )
+
+    def test_generation_is_bumped_when_the_write_commits(self):
+        before = get_generations(['events'])['events']
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_event()
+            # Not yet: a page built before the commit would still show the old rows
+            self.assertEqual(get_generations(['events'])['events'], before)
+
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_generations(['events'])['events'], before)
+
+    def test_generation_is_kept_when_the_write_rolls_back(self):
+        before = get_generations(['events'])['events']
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.create_event()
+                raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_generations(['events'])['events'], before)
+
+
+@override_settings(LIST_CACHE_TTL={'event_list': 120})
+class ListPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['generations'].clear()
+        self.organizer = User.objects.create(username='organizer')
+
+    def test_write_makes_the_next_request_miss_the_cache(self):
+        url = reverse('events:event_list')
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(cache_stats(['event_list'])['event_list'], {'hits': 1, 'misses': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            now = timezone.now()
+            Event.objects.create(
+                title='Fresh Event', description='New', organizer=self.organizer,
+                venue_name='Test Hall', venue_address='1 Test Street',
+                start_date=now + timedelta(days=3), end_date=now + timedelta(days=4),
+                contact_email='organizer@example.com',
+            )
+
+        response = self.client.get(url)
+        self.assertEqual(cache_stats(['event_list'])['event_list'], {'hits': 1, 'misses': 2})
+        self.assertContains(response, 'Fresh Event')
+
+    def test_generations_live_in_the_shared_cache(self):
+        generation = get_generations(['events'])['events']
+
+        # Another worker has its own 'default' cache but reads the same generation
+        cache.clear()
+        self.assertEqual(caches['generations'].get(GENERATION_KEY.format('events')), generation)
+        self.assertEqual(get_generations(['events'])['events'], generation)
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='commenter', is_superuser=True)
+        now = timezone.now()
+        self.event = Event.objects.create(
+            title='Test Event', description='An event', organizer=self.user,
+            venue_name='Test Hall', venue_address='1 Test Street',
+            start_date=now + timedelta(days=30), end_date=now + timedelta(days=31),
+            contact_email='organizer@example.com',
+        )
+        self.venue = Venue.objects.create(
+            name='Test Venue', description='A venue', manager=self.user, address='1 Test Street',
+            city='Dhaka', state='Dhaka', zipcode='1000', country='Bangladesh',
+            capacity=100, price_per_hour=Decimal('10.00'),
+        )
+        self.moment = now - timedelta(hours=1)
+
+    def event_comments(self, count, created_at=None):
+        comments = [EventComment.objects.create(event=self.event, user=self.user, comment=f'e{i}') for i in range(count)]
+        EventComment.objects.filter(pk__in=[c.pk for c in comments]).update(created_at=created_at or self.moment)
+        return EventComment.objects.all()
+
+    def walk(self, paginator):
+        """Every page from the first one following next_cursor, then back via previous_cursor"""
+        forward, page = [], paginator.get_page(None)
+        pages = [page]
+        while True:
+            forward.append([obj.comment for obj in page])
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_cursor)
+            pages.append(page)
+        backward = []
+        while page.has_previous():
+            page = paginator.get_page(page.previous_cursor)
+            backward.append([obj.comment for obj in page])
+        return forward, backward
+
+    def test_equal_timestamps_are_ordered_by_pk(self):
+        comments = self.event_comments(8)
+
+        forward, backward = self.walk(CursorPaginator(comments, 3, ['-created_at', '-pk']))
+
+        expected = [f'e{i}' for i in range(7, -1, -1)]
+        self.assertEqual(forward, [expected[0:3], expected[3:6], expected[6:8]])
+        self.assertEqual(backward, [expected[3:6], expected[0:3]])
+
+    def test_tampered_or_foreign_cursors_fall_back_to_the_first_page(self):
+        comments = self.event_comments(5)
+        paginator = CursorPaginator(comments, 2, ['-created_at', '-pk'])
+        first = [obj.pk for obj in paginator.get_page(None)]
+        token = paginator.get_page(None).next_cursor
+
+        tampered = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+        self.assertIsNone(paginator.decode_cursor(tampered))
+        self.assertEqual([obj.pk for obj in paginator.get_page(tampered)], first)
+        # Validly signed, but for a different ordering
+        other = CursorPaginator(comments, 2, ['-pk']).get_page(None).next_cursor
+        self.assertIsNone(paginator.decode_cursor(other))
+        self.assertEqual([obj.pk for obj in paginator.get_page('not-a-cursor')], first)
+
+    def test_sources_are_merged_in_one_order(self):
+        self.event_comments(3)
+        later = self.moment + timedelta(minutes=5)
+        venue_comments = [VenueComment.objects.create(venue=self.venue, user=self.user, comment=f'v{i}') for i in range(4)]
+        VenueComment.objects.filter(pk=venue_comments[0].pk).update(created_at=later)
+        VenueComment.objects.exclude(pk=venue_comments[0].pk).update(created_at=self.moment)
+
+        forward, backward = self.walk(CursorPaginator(
+            [EventComment.objects.all(), VenueComment.objects.all()], 2, ['-created_at', '-pk']
+        ))
+
+        merged = [comment for page in forward for comment in page]
+        self.assertEqual(merged[0], 'v0')
+        self.assertEqual(sorted(merged), ['e0', 'e1', 'e2', 'v0', 'v1', 'v2', 'v3'])
+        self.assertEqual(len(forward), 4)
+        self.assertEqual(backward[-1], forward[0])
+
+    def test_admin_comments_pages_cover_both_comment_tables(self):
+        self.event_comments(25)
+        for i in range(5):
+            VenueComment.objects.create(venue=self.venue, user=self.user, comment=f'v{i}')
+        self.client.force_login(self.user)
+        url = reverse('users:admin_comments_management')
+
+        seen, cursor = [], None
+        while True:
+            data = self.client.get(url, {'format': 'json', **({'cursor': cursor} if cursor else {})}).json()
+            seen.extend((row['type'], row['id']) for row in data['results'])
+            if not data['has_next']:
+                break
+            cursor = data['next_cursor']
+
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len(set(seen)), 30)
+        self.assertEqual(sum(1 for kind, _ in seen if kind == 'venue'), 5)
+
+
+class CommentRepliesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='commenter')
+        now = timezone.now()
+        self.event = Event.objects.create(
+            title='Test Event', description='An event', organizer=self.user,
+            venue_name='Test Hall', venue_address='1 Test Street',
+            start_date=now + timedelta(days=30), end_date=now + timedelta(days=31),
+            contact_email='organizer@example.com',
+        )
+        self.venue = Venue.objects.create(
+            name='Test Venue', description='A venue', manager=self.user, address='1 Test Street',
+            city='Dhaka', state='Dhaka', zipcode='1000', country='Bangladesh',
+            capacity=100, price_per_hour=Decimal('10.00'),
+        )
+        self.root = EventComment.objects.create(event=self.event, user=self.user, comment='Question')
+        reply = EventComment.objects.create(event=self.event, user=self.user, parent=self.root, comment='Answer')
+        EventComment.objects.create(event=self.event, user=self.user, parent=reply, comment='Thanks')
+        self.venue_root = VenueComment.objects.create(venue=self.venue, user=self.user, comment='Parking?')
+        VenueComment.objects.create(venue=self.venue, user=self.user, parent=self.venue_root, comment='Yes')
+
+    def replies(self, kind, comment):
+        return self.client.get(reverse('core:comment_replies', args=[kind, comment.pk]))
+
+    def test_replies_of_a_visible_thread_are_nested(self):
+        response = self.replies('event', self.root)
+
+        self.assertEqual(response.status_code, 200)
+        replies = response.json()['replies']
+        self.assertEqual([reply['text'] for reply in replies], ['Answer'])
+        self.assertEqual([reply['text'] for reply in replies[0]['replies']], ['Thanks'])
+        self.assertEqual(self.replies('venue', self.venue_root).json()['replies'][0]['text'], 'Yes')
+
+    def test_inactive_event_and_unlisted_venue_threads_are_not_found(self):
+        Event.objects.filter(pk=self.event.pk).update(is_active=False)
+        Venue.objects.filter(pk=self.venue.pk).update(is_available=False)
+
+        self.assertEqual(self.replies('event', self.root).status_code, 404)
+        self.assertEqual(self.replies('venue', self.venue_root).status_code, 404)
+
+
+class CommentTreeTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username='author')
+        self.liker = User.objects.create(username='liker')
+        now = timezone.now()
+        self.event = Event.objects.create(
+            title='Test Event', description='An event', organizer=self.author,
+            venue_name='Test Hall', venue_address='1 Test Street',
+            start_date=now + timedelta(days=30), end_date=now + timedelta(days=31),
+            contact_email='organizer@example.com',
+        )
+        self.comments = {}
+        for text, parent in [('A', None), ('B', 'A'), ('C', 'A'), ('D', 'B'), ('E', 'D'), ('F', None)]:
+            self.comments[text] = EventComment.objects.create(
+                event=self.event, user=self.author, comment=text, parent=self.comments.get(parent)
+            )
+        for text in ['B', 'E']:
+            EventCommentLike.objects.create(comment=self.comments[text], user=self.liker)
+        EventCommentLike.objects.create(comment=self.comments['B'], user=self.author)
+
+    def thread(self):
+        return EventComment.objects.filter(event=self.event)
+
+    def walk(self, comments):
+        for comment in comments:
+            yield comment
+            yield from self.walk(comment.children)
+
+    def test_tree_is_linked_with_depths_and_reply_counts(self):
+        roots = load_comment_tree(self.thread())
+
+        self.assertEqual([root.comment for root in roots], ['A', 'F'])
+        self.assertEqual(
+            [(comment.comment, comment.depth, comment.reply_count) for comment in self.walk(roots)],
+            [('A', 0, 4), ('B', 1, 2), ('D', 2, 1), ('E', 3, 0), ('C', 1, 0), ('F', 0, 0)],
+        )
+        self.assertEqual({comment.comment: comment.like_count for comment in self.walk(roots)}['B'], 2)
+
+    def test_like_state_costs_one_query_for_the_thread(self):
+        with self.assertNumQueries(2):
+            roots = load_comment_tree(self.thread(), user=self.liker)
+            liked = {comment.comment for comment in self.walk(roots) if comment.liked_by_user}
+        self.assertEqual(liked, {'B', 'E'})
+
+        with self.assertNumQueries(1):
+            roots = load_comment_tree(self.thread(), user=AnonymousUser())
+            self.assertFalse(any(comment.liked_by_user for comment in self.walk(roots)))
+
+    def test_max_depth_keeps_counts_and_root_id_loads_the_rest(self):
+        roots = load_comment_tree(self.thread(), max_depth=1)
+        comment_b = roots[0].children[0]
+        self.assertEqual((comment_b.children, comment_b.reply_count), ([], 2))
+
+        replies = load_comment_tree(self.thread(), root_id=comment_b.pk, user=self.liker)
+        self.assertEqual([(reply.comment, reply.depth) for reply in self.walk(replies)], [('D', 0), ('E', 1)])
+        self.assertTrue(replies[0].children[0].liked_by_user)
+
+    def test_replies_endpoint_reports_the_like_state(self):
+        self.client.force_login(self.liker)
+
+        response = self.client.get(reverse('core:comment_replies', args=['event', self.comments['D'].pk]))
+
+        reply = response.json()['replies'][0]
+        self.assertEqual((reply['text'], reply['like_count'], reply['liked']), ('E', 1, True))
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['generations'].clear()
+        self.user = User.objects.create(username='booker')
+        now = timezone.now()
+        self.event = Event.objects.create(
+            title='Jazz Night', description='Live music', organizer=self.user,
+            venue_name='Test Hall', venue_address='1 Test Street',
+            start_date=now + timedelta(days=30), end_date=now + timedelta(days=31),
+            contact_email='organizer@example.com',
+        )
+        self.booking = EventBooking.objects.create(event=self.event, user=self.user, status='confirmed')
+        self.feed = CalendarFeed.for_owner(self.user, 'bookings')
+
+    def get(self, token=None, **headers):
+        return self.client.get(reverse('core:calendar_feed', args=[token or self.feed.token]), headers=headers)
+
+    def body(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_feed_lists_confirmed_bookings(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertTrue(response['ETag'])
+        self.assertIn('Last-Modified', response)
+        body = self.body(response)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertIn(f'UID:event-{self.event.pk}@eventease\r\n', body)
+        self.assertIn('SUMMARY:Jazz Night\r\n', body)
+
+    def test_unchanged_feed_is_a_304_from_the_caches(self):
+        etag = self.get()['ETag']
+
+        # Only the generations are read (from the database cache); no feed rows
+        with self.assertNumQueries(1):
+            response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_a_committed_change_gives_a_new_etag(self):
+        etag = self.get()['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.status = 'cancelled'
+            self.booking.save()
+        response = self.get(if_none_match=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertNotIn('Jazz Night', self.body(response))
+
+    def test_unknown_and_reset_tokens_are_not_found(self):
+        self.assertEqual(self.get('missing').status_code, 404)
+
+        old_token = self.feed.token
+        self.get()
+        rotate_feed_token(self.feed)
+
+        self.assertEqual(self.get(old_token).status_code, 404)
+        self.assertEqual(self.get().status_code, 200)
+
+    def test_long_lines_are_folded_on_character_boundaries(self):
+        line = ics_line('SUMMARY', 'é' * 60)
+
+        pieces = line[:-2].split('\r\n ')
+        self.assertGreater(len(pieces), 1)
+        self.assertTrue(all(len(piece.encode()) <= 75 for piece in pieces))
+        self.assertEqual(''.join(pieces), 'SUMMARY:' + 'é' * 60)
+
+
+def image_bytes(width, height, image_format='PNG', mode='RGBA'):
+    buffer = BytesIO()
+    Image.new(mode, (width, height), (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30)).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_RENDITIONS_ASYNC=False)
+class RenditionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def store(self, name, content):
+        return default_storage.save(name, ContentFile(content))
+
+    def test_renditions_are_downscaled_copies(self):
+        name = self.store('venues/hall.png', image_bytes(1000, 500))
+
+        manifest = generate_renditions(name, [320, 640, 1280])
+
+        self.assertEqual((manifest['width'], manifest['height']), (1000, 500))
+        # No upscaling: 1280 is wider than the original
+        self.assertEqual([(r['width'], r['height']) for r in manifest['renditions']], [(320, 160), (640, 320)])
+        for rendition in manifest['renditions']:
+            for image_format, key in [('WEBP', 'webp'), ('JPEG', 'jpeg')]:
+                with default_storage.open(rendition[key]) as fileobj:
+                    image = Image.open(fileobj)
+                    self.assertEqual((image.format, image.width), (image_format, rendition['width']))
+        self.assertEqual(manifest['renditions'][0]['webp'], 'venues/hall.320w.webp')
+        self.assertTrue(default_storage.exists(manifest_name(name)))
+        cache.clear()
+        self.assertEqual(read_manifest(name), manifest)
+
+    def test_small_images_get_one_copy_and_other_files_none(self):
+        small = self.store('venues/icon.jpg', image_bytes(100, 40, 'JPEG', 'RGB'))
+        broken = self.store('venues/notes.jpg', b'not an image')
+
+        self.assertEqual([r['width'] for r in generate_renditions(small, [320, 640])['renditions']], [100])
+        with self.assertLogs('core.images', 'WARNING'):
+            self.assertIsNone(generate_renditions(broken, [320]))
+        self.assertIsNone(read_manifest(broken))
+
+    def test_uploads_get_renditions_after_commit(self):
+        organizer = User.objects.create(username='organizer')
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            event = Event.objects.create(
+                title='Test Event', description='An event', organizer=organizer,
+                venue_name='Test Hall', venue_address='1 Test Street',
+                start_date=now + timedelta(days=30), end_date=now + timedelta(days=31),
+                contact_email='organizer@example.com',
+                image=SimpleUploadedFile('poster.png', image_bytes(800, 600), content_type='image/png'),
+            )
+            self.assertIsNone(read_manifest(event.image.name))
+
+        cache.clear()
+        manifest = read_manifest(event.image.name)
+        self.assertEqual([r['width'] for r in manifest['renditions']], [320, 640])
+        html = Template('{% load image_extras %}{% responsive_image event.image "Poster" %}').render(
+            Context({'event': event})
+        )
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertIn('.640w.webp 640w', html)
+        self.assertIn('alt="Poster"', html)
+
+
+class WriteAtomicTests(TransactionTestCase):
+    def begins(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith('BEGIN')]
+
+    def test_outermost_block_takes_the_write_lock_on_sqlite(self):
+        default_mode = connection.transaction_mode
+        with CaptureQueriesContext(connection) as queries:
+            with write_atomic():
+                User.objects.create(username='writer')
+
+        expected = ['BEGIN IMMEDIATE'] if connection.vendor == 'sqlite' else []
+        self.assertEqual(self.begins(queries), expected)
+        self.assertEqual(connection.transaction_mode, default_mode)
+        self.assertTrue(User.objects.filter(username='writer').exists())
+
+    def test_other_transactions_stay_deferred(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                User.objects.create(username='writer')
+
+        self.assertNotIn('BEGIN IMMEDIATE', self.begins(queries))
+
+    def test_nested_block_is_a_savepoint(self):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                with self.assertRaises(ValueError):
+                    with write_atomic():
+                        User.objects.create(username='rolled-back')
+                        raise ValueError
+            User.objects.create(username='kept')
+
+        self.assertEqual(self.begins(queries), [])
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['kept'])
@@ -8,4 +8,8 @@ urlpatterns = [
     path('api/notification-count/', views.notification_count, name='notification_count'),
     path('notifications/mark-read/<int:notification_id>/', views.mark_notification_read, name='mark_notification_read'),
     path('notifications/mark-all-read/', views.mark_all_read, name='mark_all_read'),
+    path('comments/<str:kind>/<int:comment_id>/replies/', views.comment_replies, name='comment_replies'),
+    path('api/list-cache-stats/', views.list_cache_stats, name='list_cache_stats'),
+    path('calendar/', views.calendar_feeds, name='calendar_feeds'),
+    path('calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
 ]
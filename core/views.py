@@ -1,10 +1,12 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404, StreamingHttpResponse
 from django.contrib import messages
-from django.views.decorators.http import require_POST
-from .models import Notification
+from django.urls import reverse
+from django.views.decorators.http import condition, require_POST, require_safe
+from users.decorators import role_required
+from .models import Notification, CalendarFeed
 
 @login_required
 def notifications_list(request):
@@ -68,3 +70,79 @@ def create_notification(user, title, message, notification_type='system', **kwar
         notification_type=notification_type,
         **kwargs
     )
+
+def comment_replies(request, kind, comment_id):
+    """JSON reply subtree of a comment, for threads rendered with a depth limit"""
+    from .comments import COMMENT_THREADS, load_thread_replies, serialize_comment_tree
+    
+    if kind not in COMMENT_THREADS:
+        return JsonResponse({'error': 'Unknown comment type'}, status=404)
+    replies = load_thread_replies(kind, comment_id, user=request.user)
+    if replies is None:
+        return JsonResponse({'error': 'Comment not found'}, status=404)
+    return JsonResponse({'replies': serialize_comment_tree(replies, COMMENT_THREADS[kind][2])})
+
+@login_required
+@role_required(['admin'])
+def list_cache_stats(request):
+    """JSON hit/miss counters of the cached list pages; POST resets them"""
+    from django.conf import settings
+    from .cache import cache_stats, reset_cache_stats
+    
+    names = list(getattr(settings, 'LIST_CACHE_TTL', {}))
+    if request.method == 'POST':
+        reset_cache_stats(names)
+    stats = cache_stats(names)
+    for name, counts in stats.items():
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / lookups, 3) if lookups else None
+        counts['ttl'] = settings.LIST_CACHE_TTL[name]
+    return JsonResponse({'views': stats})
+
+
+@login_required
+def calendar_feeds(request):
+    """Subscription links of the user's calendar feeds; POST resets the link of one feed"""
+    from .calendar import rotate_feed_token, user_feeds
+    
+    if request.method == 'POST':
+        feed = get_object_or_404(CalendarFeed, pk=request.POST.get('feed'), owner=request.user)
+        rotate_feed_token(feed)
+        messages.success(request, f'The "{feed.get_kind_display()}" link was reset. Subscribe again with the new link.')
+        return redirect('core:calendar_feeds')
+    
+    feeds = user_feeds(request.user)
+    for feed in feeds:
+        feed.url = request.build_absolute_uri(reverse('core:calendar_feed', args=[feed.token]))
+        feed.webcal_url = 'webcal://' + feed.url.split('://', 1)[1]
+    return render(request, 'core/calendar_feeds.html', {'feeds': feeds})
+
+
+def _calendar_validators(request, token):
+    """Resolve the feed and its ETag/Last-Modified once per request (both condition() callbacks use them)"""
+    if not hasattr(request, 'calendar_feed'):
+        from .calendar import feed_validators, resolve_feed
+        request.calendar_feed = resolve_feed(token)
+        request.calendar_validators = feed_validators(request.calendar_feed) if request.calendar_feed else {}
+    return request.calendar_validators
+
+
+@require_safe
+@condition(
+    etag_func=lambda request, token: _calendar_validators(request, token).get('etag'),
+    last_modified_func=lambda request, token: _calendar_validators(request, token).get('last_modified'),
+)
+def calendar_feed(request, token):
+    """Streamed .ics feed for calendar apps, answered with 304 when unchanged; the token is the only credential"""
+    from .calendar import stream_feed
+    
+    if request.calendar_feed is None:
+        raise Http404('Unknown calendar feed')
+    response = StreamingHttpResponse(
+        stream_feed(request.calendar_feed, request.build_absolute_uri('/')),
+        content_type='text/calendar; charset=utf-8'
+    )
+    response['Content-Disposition'] = 'inline; filename="eventease.ics"'
+    # Clients must revalidate, which is what the ETag makes cheap
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'core',
     'notifications',
     'blog',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -86,6 +87,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Seconds a write waits for SQLite's lock; bookings take it up front (core.db.write_atomic)
+            'timeout': 20,
+        },
     }
 }
 
@@ -160,6 +165,51 @@ LOGOUT_REDIRECT_URL = '/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Minutes tickets stay reserved for a buyer once the booking page is opened
+TICKET_HOLD_MINUTES = 10
+
+# Cache
+# 'default' is per process. 'generations' holds the invalidation counters of cached list
+# pages, event snapshots and calendar feeds (core.cache) and must be shared by every worker
+# process, or a write would only invalidate the worker that handled it. Create its table
+# with `python manage.py createcachetable`; memcached/Redis work too.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'eventease',
+    },
+    'generations': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'eventease_cache_generations',
+        'OPTIONS': {
+            # One entry per list, event and calendar owner; culled ones restart at a fresh number
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
+# Seconds a cached list page stays valid (writes invalidate it earlier); 0 disables caching
+LIST_CACHE_TTL = {
+    'event_list': 120,
+    'venue_list': 300,
+}
+
+# Seconds an unchanged event_detail snapshot is kept (writes invalidate it immediately)
+EVENT_SNAPSHOT_TTL = 300
+
+# Seconds calendar feed tokens and ETag/Last-Modified validators are cached (writes invalidate validators immediately)
+CALENDAR_FEED_TTL = 3600
+
+# Background threads generating image renditions after uploads; set IMAGE_RENDITIONS_ASYNC = False to generate inline
+IMAGE_RENDITION_WORKERS = 2
+IMAGE_RENDITIONS_ASYNC = True
+# WebP/JPEG quality of renditions, and seconds their manifests are cached
+IMAGE_RENDITION_QUALITY = 80
+IMAGE_RENDITION_CACHE_TTL = 86400
+
+# Weight (in reviews) of the catalog-wide mean in the Bayesian venue rating used by sort=rating_weighted
+VENUE_RATING_PRIOR_WEIGHT = 5
+
 # SSL Commerz Gateway Configuration
 import os
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event, EventBooking, TicketCategory, BookingTicketItem
+from .models import Event, EventBooking, TicketCategory, BookingTicketItem, TicketHold, DailyRevenue
 
 
 class TicketCategoryInline(admin.TabularInline):
@@ -50,6 +50,38 @@ class TicketCategoryAdmin(admin.ModelAdmin):
     tickets_sold.short_description = 'Sold'
 
 
+@admin.register(TicketHold)
+class TicketHoldAdmin(admin.ModelAdmin):
+    list_display = ['user', 'ticket_category', 'quantity', 'created_at', 'expires_at']
+    list_filter = ['expires_at']
+    search_fields = ['user__username', 'ticket_category__name', 'ticket_category__event__title']
+    actions = ['release_holds']
+    
+    def has_delete_permission(self, request, obj=None):
+        # Plain deletes would leave the tickets counted as held; use the release action
+        return False
+    
+    def release_holds(self, request, queryset):
+        count = queryset.release()
+        self.message_user(request, f'{count} holds released.')
+    
+    release_holds.short_description = "Release selected holds"
+
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(admin.ModelAdmin):
+    list_display = ['day', 'event', 'ticket_category', 'bookings', 'tickets', 'revenue']
+    list_filter = ['day']
+    search_fields = ['event__title', 'organizer__username']
+    
+    def has_add_permission(self, request):
+        # Rows are maintained by booking writes and backfill_revenue_rollup
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 class BookingTicketItemInline(admin.TabularInline):
     model = BookingTicketItem
     extra = 0
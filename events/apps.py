@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
+    
+    def ready(self):
+        # Import signals to ensure they are registered
+        import events.signals
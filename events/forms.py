@@ -1,7 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from .models import Event, EventBooking, TicketCategory
+from .models import Event, EventBooking, TicketCategory, TicketHold
 from venues.models import Venue
 
 class EventForm(forms.ModelForm):
@@ -176,22 +176,30 @@ class EventBookingForm(forms.ModelForm):
             if hasattr(self.user, 'profile') and self.user.profile.phone:
                 self.fields['attendee_phone'].initial = self.user.profile.phone
         
+        # Tickets this user already holds are available to them on top of the free stock
+        self.held_quantities = {}
+        if self.event and self.user and self.user.is_authenticated:
+            self.held_quantities = dict(TicketHold.objects.filter(
+                user=self.user, ticket_category__event=self.event
+            ).values_list('ticket_category_id', 'quantity'))
+        
         # Add dynamic quantity fields for each ticket category
         if self.event and self.event.ticket_categories.exists():
             for category in self.event.ticket_categories.filter(quantity_available__gt=0):
                 field_name = f'quantity_{category.id}'
+                available = self.available_for(category)
                 self.fields[field_name] = forms.IntegerField(
                     min_value=0,
-                    max_value=min(6, category.tickets_available),  # Max 6 or available tickets
+                    max_value=min(6, available),  # Max 6 or available tickets
                     initial=0,
                     required=False,
                     widget=forms.NumberInput(attrs={
                         'class': 'quantity-input form-control',
                         'data-category-id': category.id,
                         'data-price': str(category.price),
-                        'data-max': min(6, category.tickets_available),
+                        'data-max': min(6, available),
                         'min': '0',
-                        'max': str(min(6, category.tickets_available))
+                        'max': str(min(6, available))
                     }),
                     label=f'{category.name} (${category.price})'
                 )
@@ -220,8 +228,9 @@ class EventBookingForm(forms.ModelForm):
                     has_tickets = True
                     
                     # Check availability
-                    if quantity > category.tickets_available:
-                        raise ValidationError(f'Only {category.tickets_available} tickets available for {category.name}')
+                    available = self.available_for(category)
+                    if quantity > available:
+                        raise ValidationError(f'Only {available} tickets available for {category.name}')
             
             # Validate total tickets for events with categories
             if total_tickets > 6:
@@ -235,6 +244,10 @@ class EventBookingForm(forms.ModelForm):
         
         return cleaned_data
     
+    def available_for(self, category):
+        """Tickets of a category this user can buy, counting their own hold"""
+        return category.tickets_available + self.held_quantities.get(category.id, 0)
+    
     def get_selected_tickets(self):
         """Get dictionary of selected ticket categories and quantities"""
         selected_tickets = {}
@@ -350,6 +363,25 @@ TicketCategoryFormSet = forms.formset_factory(
 )
 
 
+class EventImportUploadForm(forms.Form):
+    """Upload form for bulk event imports (see events.importer for the file layout)"""
+    file = forms.FileField(
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv,.json'}),
+        help_text='CSV or JSON file of events with their ticket categories'
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label='Only validate (do not create events)',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.json')):
+            raise ValidationError("Please upload a .csv or .json file.")
+        return upload
+
+
 class EventCommentForm(forms.Form):
     """Form for submitting comments and replies on event pages"""
     comment = forms.CharField(
@@ -0,0 +1,192 @@
+"""
+Bulk import of events with nested ticket categories from CSV or JSON.
+
+Every row is validated with the same rules as event_create (EventForm and
+TicketCategoryForm), then valid rows are written with bulk_create in batches
+inside one transaction. Invalid rows are reported by row number and skipped.
+
+JSON: a list of event objects (or {"events": [...]}), each with an optional
+"ticket_categories" list of {name, category_type, price, quantity_available,
+description}.
+
+CSV: one event per row with the EventForm field names as columns; ticket
+categories go in ticket_<n>_name, ticket_<n>_category_type, ticket_<n>_price,
+ticket_<n>_quantity_available and ticket_<n>_description columns (n = 1..5).
+"""
+import csv
+import io
+import json
+import re
+
+from django import forms
+from django.db import transaction
+
+from core.cache import bump_generation
+from search import index as search_index
+from venues.models import Venue
+from .forms import EventForm, TicketCategoryForm, TicketCategoryFormSet
+from .models import Event, TicketCategory
+
+IMPORT_BATCH_SIZE = 1000
+MAX_TICKET_CATEGORIES = TicketCategoryFormSet.max_num
+TICKET_COLUMN_RE = re.compile(r'^ticket_(\d+)_(\w+)$')
+FALSE_VALUES = {'', '0', 'false', 'no', 'off', 'n'}
+
+
+class VenueLookupField(forms.ModelChoiceField):
+    """ModelChoiceField resolving ids from preloaded venues instead of a query per row"""
+
+    def __init__(self, venues, **kwargs):
+        super().__init__(queryset=Venue.objects.none(), **kwargs)
+        self.venues = venues
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.venues[int(getattr(value, 'pk', value))]
+        except (KeyError, TypeError, ValueError):
+            raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class EventImportForm(EventForm):
+    """EventForm rules for one imported row"""
+
+    def __init__(self, *args, venues=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['venue'] = VenueLookupField(venues or {}, required=False)
+
+
+class ImportResult:
+    """Outcome of an import: number of events/categories created and per-row errors"""
+
+    def __init__(self):
+        self.events_created = 0
+        self.categories_created = 0
+        self.errors = []  # (row number, message)
+
+    @property
+    def rows_failed(self):
+        return len({row for row, _ in self.errors})
+
+
+def _boolean(value):
+    if isinstance(value, str):
+        return value.strip().lower() not in FALSE_VALUES
+    return bool(value)
+
+
+def read_rows(fileobj, file_format):
+    """Yield (row number, event dict with a 'ticket_categories' list) from a CSV or JSON file"""
+    if file_format == 'json':
+        data = json.load(fileobj)
+        if isinstance(data, dict):
+            data = data.get('events', [])
+        for number, row in enumerate(data, start=1):
+            yield number, row
+        return
+
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig')
+    # Line 1 is the header, so data rows start at 2
+    for number, raw in enumerate(csv.DictReader(fileobj), start=2):
+        row, tickets = {}, {}
+        for column, value in raw.items():
+            if column is None:
+                continue
+            match = TICKET_COLUMN_RE.match(column.strip())
+            if match:
+                tickets.setdefault(int(match.group(1)), {})[match.group(2)] = value
+            else:
+                row[column.strip()] = value
+        row['ticket_categories'] = [
+            tickets[n] for n in sorted(tickets) if any((value or '').strip() for value in tickets[n].values())
+        ]
+        yield number, row
+
+
+def _form_errors(form, prefix=''):
+    return [
+        f"{prefix}{'' if field == '__all__' else field + ': '}{message}"
+        for field, messages in form.errors.items() for message in messages
+    ]
+
+
+def validate_row(row, venues):
+    """(Event, [TicketCategory]) for a valid row, or a list of error messages"""
+    if not isinstance(row, dict):
+        return ['Each event must be an object.']
+    data = {key: value for key, value in row.items() if key != 'ticket_categories'}
+    data['is_free'] = _boolean(data.get('is_free', False))
+    form = EventImportForm(data=data, venues=venues)
+    errors = [] if form.is_valid() else _form_errors(form)
+
+    categories = []
+    rows = row.get('ticket_categories') or []
+    if len(rows) > MAX_TICKET_CATEGORIES:
+        errors.append(f'At most {MAX_TICKET_CATEGORIES} ticket categories are allowed.')
+    names = set()
+    for number, category_data in enumerate(rows[:MAX_TICKET_CATEGORIES], start=1):
+        if not isinstance(category_data, dict):
+            errors.append(f'Ticket category {number}: must be an object.')
+            continue
+        category_form = TicketCategoryForm(data={'category_type': 'general', **category_data})
+        if category_form.is_valid():
+            # Names are unique per event; a repeat would fail the whole import in bulk_create
+            name = ' '.join(category_form.cleaned_data['name'].split()).lower()
+            if name in names:
+                errors.append(f'Ticket category {number}: name: "{category_form.cleaned_data["name"]}" is used twice.')
+                continue
+            names.add(name)
+            categories.append(category_form.save(commit=False))
+        else:
+            errors.extend(_form_errors(category_form, prefix=f'Ticket category {number}: '))
+
+    if errors:
+        return errors
+    event = form.save(commit=False)
+    if categories:
+        # Same as event_create: events with ticket categories are paid events
+        event.is_free = False
+    return event, categories
+
+
+def _write_batch(batch, result):
+    events = Event.objects.bulk_create([event for event, _ in batch])
+    categories = []
+    for event, event_categories in batch:
+        for category in event_categories:
+            category.event = event
+            categories.append(category)
+    TicketCategory.objects.bulk_create(categories)
+    # bulk_create skips post_save, so index the new events for search here
+    search_index.index_instances(events)
+    result.events_created += len(events)
+    result.categories_created += len(categories)
+
+
+def import_events(fileobj, file_format, organizer, dry_run=False, batch_size=IMPORT_BATCH_SIZE):
+    """Validate and bulk-create the events of a CSV/JSON file for organizer; returns an ImportResult"""
+    result = ImportResult()
+    venues = Venue.objects.filter(is_available=True).in_bulk()
+    batch = []
+    with transaction.atomic():
+        for number, row in read_rows(fileobj, file_format):
+            validated = validate_row(row, venues)
+            if isinstance(validated, list):
+                result.errors.extend((number, message) for message in validated)
+                continue
+            validated[0].organizer = organizer
+            if dry_run:
+                result.events_created += 1
+                result.categories_created += len(validated[1])
+                continue
+            batch.append(validated)
+            if len(batch) >= batch_size:
+                _write_batch(batch, result)
+                batch = []
+        if batch:
+            _write_batch(batch, result)
+    if result.events_created and not dry_run:
+        bump_generation('events')
+    return result
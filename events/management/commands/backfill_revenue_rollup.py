@@ -0,0 +1,70 @@
+"""
+Management command to rebuild the DailyRevenue rollup from the sold bookings
+Usage: python manage.py backfill_revenue_rollup [--event ID ...]
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+
+from events.models import Event, EventBooking, BookingTicketItem, DailyRevenue, SOLD_BOOKING_STATUSES
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily revenue/ticket rollup used by the organizer revenue pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', dest='event_ids',
+                            help='Only rebuild the given event id (can be repeated)')
+
+    def handle(self, *args, **options):
+        bookings = EventBooking.objects.filter(status__in=SOLD_BOOKING_STATUSES)
+        if options['event_ids']:
+            bookings = bookings.filter(event_id__in=options['event_ids'])
+        items = BookingTicketItem.objects.filter(booking__in=bookings)
+
+        # (event, category, day) -> [bookings, tickets, revenue], filled from grouped queries
+        rows = defaultdict(lambda: [0, 0, Decimal('0')])
+        for event_id, day, total in (
+            bookings.annotate(day=TruncDate('booking_date'))
+            .values_list('event_id', 'day').annotate(total=Count('pk'))
+        ):
+            rows[event_id, None, day][0] += total
+        for event_id, day, tickets, revenue in (
+            bookings.filter(ticket_items__isnull=True).annotate(day=TruncDate('booking_date'))
+            .values_list('event_id', 'day').annotate(tickets=Sum('attendees_count'), revenue=Sum('total_amount'))
+        ):
+            rows[event_id, None, day][1:] = [tickets, revenue]
+        for event_id, category_id, day, tickets, revenue in (
+            items.annotate(day=TruncDate('booking__booking_date'))
+            .values_list('booking__event_id', 'ticket_category_id', 'day')
+            .annotate(
+                tickets=Sum('quantity'),
+                revenue=Sum(F('quantity') * F('price_per_ticket'), output_field=DecimalField()),
+            )
+        ):
+            rows[event_id, category_id, day][1:] = [tickets, revenue]
+
+        organizers = dict(Event.objects.filter(
+            pk__in={event_id for event_id, _, _ in rows}
+        ).values_list('pk', 'organizer_id'))
+
+        with transaction.atomic():
+            stale = DailyRevenue.objects.all()
+            if options['event_ids']:
+                stale = stale.filter(event_id__in=options['event_ids'])
+            stale.delete()
+            DailyRevenue.objects.bulk_create([
+                DailyRevenue(
+                    organizer_id=organizers[event_id], event_id=event_id, ticket_category_id=category_id,
+                    day=day, bookings=booking_count, tickets=tickets, revenue=revenue
+                )
+                for (event_id, category_id, day), (booking_count, tickets, revenue) in rows.items()
+            ], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rebuilt {len(rows)} daily revenue rows for {len(organizers)} events'
+        ))
@@ -0,0 +1,51 @@
+"""
+Management command to bulk-import events with ticket categories from a CSV or JSON file
+Usage: python manage.py import_events events.csv --organizer USERNAME [--format csv|json] [--dry-run] [--batch-size 1000]
+"""
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from events.importer import IMPORT_BATCH_SIZE, import_events
+
+
+class Command(BaseCommand):
+    help = 'Validate and bulk-create events (with nested ticket categories) from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file to import')
+        parser.add_argument('--organizer', required=True, help='Username that will own the imported events')
+        parser.add_argument('--format', choices=['csv', 'json'], help='File format (default: from the extension)')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate, do not create anything')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Events per bulk insert')
+        parser.add_argument('--max-errors', type=int, default=50, help='Row errors to print')
+
+    def handle(self, *args, **options):
+        try:
+            organizer = User.objects.get(username=options['organizer'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['organizer']}' does not exist")
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in ('csv', 'json'):
+            raise CommandError('Cannot tell the file format, pass --format csv or --format json')
+
+        started = time.monotonic()
+        mode = 'r' if file_format == 'json' else 'rb'
+        with open(options['path'], mode) as fileobj:
+            result = import_events(
+                fileobj, file_format, organizer,
+                dry_run=options['dry_run'], batch_size=options['batch_size']
+            )
+
+        for row, message in result.errors[:options['max_errors']]:
+            self.stderr.write(f'❌ Row {row}: {message}')
+        if len(result.errors) > options['max_errors']:
+            self.stderr.write(f'... and {len(result.errors) - options["max_errors"]} more errors')
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {verb} {result.events_created} events with {result.categories_created} ticket categories '
+            f'in {time.monotonic() - started:.1f}s ({result.rows_failed} rows rejected)'
+        ))
@@ -0,0 +1,70 @@
+"""
+Management command to repair drift in the materialized event/ticket counters
+Usage: python manage.py recount_event_counters [--event ID ...]
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from events.models import Event, EventBooking, TicketCategory, TicketHold, BookingTicketItem, SOLD_BOOKING_STATUSES
+
+
+class Command(BaseCommand):
+    help = 'Recompute Event and TicketCategory sold/held counters from bookings and holds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', dest='event_ids',
+                            help='Only recount the given event id (can be repeated)')
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        categories = TicketCategory.objects.all()
+        if options['event_ids']:
+            events = events.filter(pk__in=options['event_ids'])
+            categories = categories.filter(event_id__in=options['event_ids'])
+
+        sold_items = BookingTicketItem.objects.filter(booking__status__in=SOLD_BOOKING_STATUSES)
+
+        # One grouped query per counter instead of one aggregate per row
+        bookings_by_event = dict(
+            events.filter(bookings__status__in=SOLD_BOOKING_STATUSES)
+            .values_list('pk').annotate(total=Count('bookings'))
+        )
+        tickets_by_event = dict(
+            sold_items.values_list('booking__event_id').annotate(total=Sum('quantity'))
+        )
+        # Bookings without ticket items count their attendees as tickets
+        unitemized = EventBooking.objects.filter(status__in=SOLD_BOOKING_STATUSES, ticket_items__isnull=True)
+        for event_id, total in unitemized.values_list('event_id').annotate(total=Sum('attendees_count')).order_by():
+            tickets_by_event[event_id] = tickets_by_event.get(event_id, 0) + total
+        sold_by_category = dict(
+            sold_items.values_list('ticket_category_id').annotate(total=Sum('quantity'))
+        )
+        held_by_category = dict(
+            TicketHold.objects.values_list('ticket_category_id').annotate(total=Sum('quantity'))
+        )
+
+        fixed_events = []
+        for event in events.only('pk', 'sold_bookings_count', 'sold_tickets_count').iterator():
+            expected = (bookings_by_event.get(event.pk, 0), tickets_by_event.get(event.pk, 0))
+            if (event.sold_bookings_count, event.sold_tickets_count) != expected:
+                event.sold_bookings_count, event.sold_tickets_count = expected
+                fixed_events.append(event)
+
+        fixed_categories = []
+        for category in categories.only('pk', 'sold_count', 'held_count').iterator():
+            expected = (sold_by_category.get(category.pk, 0), held_by_category.get(category.pk, 0))
+            if (category.sold_count, category.held_count) != expected:
+                category.sold_count, category.held_count = expected
+                fixed_categories.append(category)
+
+        with transaction.atomic():
+            Event.objects.bulk_update(fixed_events, ['sold_bookings_count', 'sold_tickets_count'], batch_size=500)
+            TicketCategory.objects.bulk_update(fixed_categories, ['sold_count', 'held_count'], batch_size=500)
+
+        if not fixed_events and not fixed_categories:
+            self.stdout.write(self.style.SUCCESS('✅ All event counters are already accurate!'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Repaired counters on {len(fixed_events)} events and {len(fixed_categories)} ticket categories'
+            ))
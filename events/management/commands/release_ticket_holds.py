@@ -0,0 +1,26 @@
+"""
+Management command to give the tickets of expired checkout holds back to sale
+Usage: python manage.py release_ticket_holds [--interval SECONDS]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.models import TicketHold
+
+
+class Command(BaseCommand):
+    help = 'Release expired ticket holds in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and sweep every N seconds (default: sweep once)')
+
+    def handle(self, *args, **options):
+        while True:
+            released = TicketHold.objects.expired().release()
+            if released or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f'✅ Released {released} expired ticket holds'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:03
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+SOLD_BOOKING_STATUSES = ['confirmed', 'paid']
+
+
+def backfill_counters(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    TicketCategory = apps.get_model('events', 'TicketCategory')
+    BookingTicketItem = apps.get_model('events', 'BookingTicketItem')
+
+    sold_items = BookingTicketItem.objects.filter(booking__status__in=SOLD_BOOKING_STATUSES)
+    bookings_by_event = dict(
+        Event.objects.filter(bookings__status__in=SOLD_BOOKING_STATUSES)
+        .values_list('pk').annotate(total=Count('bookings'))
+    )
+    tickets_by_event = dict(sold_items.values_list('booking__event_id').annotate(total=Sum('quantity')))
+    sold_by_category = dict(sold_items.values_list('ticket_category_id').annotate(total=Sum('quantity')))
+
+    for event_id in set(bookings_by_event) | set(tickets_by_event):
+        Event.objects.filter(pk=event_id).update(
+            sold_bookings_count=bookings_by_event.get(event_id, 0),
+            sold_tickets_count=tickets_by_event.get(event_id, 0),
+        )
+    for category_id, total in sold_by_category.items():
+        TicketCategory.objects.filter(pk=category_id).update(sold_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_alter_eventcommentlike_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='sold_bookings_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='sold_tickets_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ticketcategory',
+            name='sold_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_rating_aggregates'),
+        ('venues', '0011_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', 'start_date', 'end_date'], name='event_active_dates_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_ticket_holds'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('bookings', models.IntegerField(default=0)),
+                ('tickets', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenue', to='events.event')),
+                ('organizer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenue', to=settings.AUTH_USER_MODEL)),
+                ('ticket_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenue', to='events.ticketcategory')),
+            ],
+            options={
+                'ordering': ['day'],
+                'indexes': [models.Index(fields=['organizer', 'day'], name='revenue_organizer_day_idx')],
+                'unique_together': {('event', 'ticket_category', 'day')},
+            },
+        ),
+    ]
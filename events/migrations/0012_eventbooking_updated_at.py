@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_booking_date(apps, schema_editor):
+    EventBooking = apps.get_model('events', 'EventBooking')
+    EventBooking.objects.update(updated_at=models.F('booking_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_daily_revenue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventbooking',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_booking_date, migrations.RunPython.noop),
+    ]
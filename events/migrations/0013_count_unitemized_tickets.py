@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:05
+
+from django.db import migrations
+from django.db.models import F, Sum
+
+
+SOLD_BOOKING_STATUSES = ['confirmed', 'paid']
+
+
+def count_unitemized_tickets(apps, schema_editor):
+    """Add the attendees of sold bookings without ticket items to sold_tickets_count"""
+    Event = apps.get_model('events', 'Event')
+    EventBooking = apps.get_model('events', 'EventBooking')
+
+    unitemized = EventBooking.objects.filter(status__in=SOLD_BOOKING_STATUSES, ticket_items__isnull=True)
+    for event_id, total in unitemized.values_list('event_id').annotate(total=Sum('attendees_count')).order_by():
+        Event.objects.filter(pk=event_id).update(sold_tickets_count=F('sold_tickets_count') + total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_eventbooking_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_unitemized_tickets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:20
+
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rebuild_duplicated_events(apps, schema_editor):
+    """
+    Racing first writes could create two event-level (NULL category) rows for a day, and
+    every later delta went to both, so their sums are wrong: rebuild those events' rollup
+    from their bookings before the new constraint is added.
+    """
+    DailyRevenue = apps.get_model('events', 'DailyRevenue')
+    event_ids = sorted(set(
+        DailyRevenue.objects.filter(ticket_category__isnull=True).values('event_id', 'day')
+        .annotate(rows=Count('pk')).filter(rows__gt=1).values_list('event_id', flat=True)
+    ))
+    if event_ids:
+        call_command('backfill_revenue_rollup', event_ids=event_ids, stdout=StringIO())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_count_unitemized_tickets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='dailyrevenue',
+            unique_together=set(),
+        ),
+        migrations.RunPython(rebuild_duplicated_events, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyrevenue',
+            constraint=models.UniqueConstraint(condition=models.Q(('ticket_category__isnull', False)), fields=('event', 'ticket_category', 'day'), name='revenue_event_category_day_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrevenue',
+            constraint=models.UniqueConstraint(condition=models.Q(('ticket_category__isnull', True)), fields=('event', 'day'), name='revenue_event_day_uniq'),
+        ),
+    ]
@@ -1,7 +1,130 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
+from datetime import timedelta
+from collections import defaultdict
+
+from core.cache import bump_generation
+from core.db import write_atomic
+
+# Booking statuses that hold a seat / count as sold tickets
+SOLD_BOOKING_STATUSES = ['confirmed', 'paid']
+
+# Cache generation of an event's cached snapshot (events.snapshots)
+EVENT_GENERATION = 'event:{}'
+
+
+def touch_event(event_id):
+    """Invalidate the cached snapshot of an event once the current transaction commits"""
+    if event_id:
+        transaction.on_commit(lambda: bump_generation(EVENT_GENERATION.format(event_id)))
+
+
+def adjust_counter(model, pk, **deltas):
+    """Apply +/- deltas to stored counter columns with a single UPDATE, never going below zero"""
+    updates = {
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items() if delta
+    }
+    if pk and updates:
+        model.objects.filter(pk=pk).update(**updates)
+        if model is Event:
+            touch_event(pk)
+
+
+class SoldOut(Exception):
+    """Raised when a booking needs more tickets or seats than are left"""
+
+
+def reserve_counter(model, pk, amount, limit_field, used_fields, **updates):
+    """
+    Apply updates to a row only if sum(used_fields) + amount stays within limit_field.
+    This is a single conditional UPDATE, so concurrent reservations cannot both pass
+    a stale availability check; returns False when nothing was reserved.
+    """
+    used = F(used_fields[0])
+    for field in used_fields[1:]:
+        used = used + F(field)
+    reserved = model.objects.filter(
+        pk=pk, **{f'{limit_field}__gte': used + amount}
+    ).update(**updates) == 1
+    if reserved and model is Event:
+        touch_event(pk)
+    return reserved
+
+
+# Columns that take tickets out of TicketCategory.quantity_available
+TICKET_USAGE_FIELDS = ['sold_count', 'held_count']
+
+
+def reserve_tickets(category_id, quantity, held=0):
+    """
+    Sell quantity tickets of a TicketCategory or raise SoldOut.
+    held is the size of the buyer's own hold being converted, which is given back at the same time.
+    """
+    if quantity <= 0:
+        return
+    reserved = reserve_counter(
+        TicketCategory, category_id, quantity - held, 'quantity_available', TICKET_USAGE_FIELDS,
+        sold_count=F('sold_count') + quantity,
+        held_count=Greatest(F('held_count') - held, 0),
+    )
+    if not reserved:
+        category = TicketCategory.objects.get(pk=category_id)
+        raise SoldOut(f'Only {category.tickets_available} tickets left for {category.name}.')
+
+
+class EventQuerySet(models.QuerySet):
+    """Database-side live/upcoming/completed classification for listings"""
+    
+    @staticmethod
+    def day_bounds(now=None):
+        """Start of today and of tomorrow - events are classified by calendar day"""
+        today_start = (now or timezone.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        return today_start, today_start + timedelta(days=1)
+    
+    def filter_status(self, status, now=None):
+        """Filter by 'live', 'upcoming' or 'completed' using plain range predicates"""
+        today_start, tomorrow_start = self.day_bounds(now)
+        if status == 'upcoming':
+            return self.filter(start_date__gte=tomorrow_start)
+        if status == 'live':
+            return self.filter(start_date__lt=tomorrow_start, end_date__gte=today_start)
+        if status == 'completed':
+            return self.filter(end_date__lt=today_start)
+        return self
+    
+    def with_status(self, now=None):
+        """Annotate computed_status and status_rank (0 live, 1 upcoming, 2 completed)"""
+        today_start, tomorrow_start = self.day_bounds(now)
+        return self.annotate(
+            status_rank=Case(
+                When(start_date__gte=tomorrow_start, then=Value(1)),
+                When(end_date__lt=today_start, then=Value(2)),
+                default=Value(0),
+                output_field=models.IntegerField(),
+            ),
+            computed_status=Case(
+                When(start_date__gte=tomorrow_start, then=Value('upcoming')),
+                When(end_date__lt=today_start, then=Value('completed')),
+                default=Value('live'),
+                output_field=models.CharField(),
+            ),
+        )
+    
+    def order_by_status(self, now=None):
+        """Live first, then upcoming (both soonest first), then completed (most recent first)"""
+        return self.with_status(now).order_by(
+            'status_rank',
+            Case(When(status_rank__lt=2, then=F('start_date'))).asc(),
+            Case(When(status_rank=2, then=F('start_date'))).desc(),
+            'pk',
+        )
+
 
 class Event(models.Model):
     EVENT_TYPE_CHOICES = [
@@ -51,8 +174,28 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Materialized counters, maintained by EventBooking/BookingTicketItem writes
+    sold_bookings_count = models.PositiveIntegerField(default=0, editable=False)
+    sold_tickets_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    # Persisted review aggregates, maintained by EventReview writes
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    organization_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    venue_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    value_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    
+    # Rating dimensions of EventReview that are aggregated above
+    RATING_FIELDS = ['rating', 'organization_rating', 'venue_rating', 'value_rating']
+    
+    objects = EventQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            # Covers the is_active filter plus live/upcoming/completed range predicates
+            models.Index(fields=['is_active', 'start_date', 'end_date'], name='event_active_dates_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -72,7 +215,12 @@ class Event(models.Model):
     
     @property
     def current_attendees(self):
-        return self.bookings.filter(status='confirmed').count()
+        """
+        Bookings holding a seat (SOLD_BOOKING_STATUSES), from the materialized counter.
+        'paid' is not a booking status anything sets, so in practice this is the
+        confirmed bookings, as before; attended/no-show bookings do not count.
+        """
+        return self.sold_bookings_count
     
     @property
     def available_spots(self):
@@ -82,18 +230,20 @@ class Event(models.Model):
     def is_full(self):
         return self.current_attendees >= self.max_attendees
     
+    def _rating_average(self, field):
+        if not self.rating_count:
+            return 0
+        return getattr(self, f'{field}_sum') / self.rating_count
+    
     @property
     def average_rating(self):
-        """Calculate average rating from all reviews"""
-        reviews = self.reviews.all()
-        if not reviews:
-            return 0
-        return sum([review.rating for review in reviews]) / len(reviews)
+        """Average overall rating from the persisted review aggregates"""
+        return self._rating_average('rating')
     
     @property
     def review_count(self):
         """Get total number of reviews"""
-        return self.reviews.count()
+        return self.rating_count
     
     @property
     def can_be_reviewed(self):
@@ -102,32 +252,46 @@ class Event(models.Model):
     
     @property
     def avg_organization_rating(self):
-        """Calculate average organization rating from all reviews"""
-        reviews = self.reviews.all()
-        if not reviews:
-            return 0
-        return sum([review.organization_rating for review in reviews]) / len(reviews)
+        """Average organization rating from the persisted review aggregates"""
+        return self._rating_average('organization_rating')
     
     @property
     def avg_venue_rating(self):
-        """Calculate average venue rating from all reviews"""
-        reviews = self.reviews.all()
-        if not reviews:
-            return 0
-        return sum([review.venue_rating for review in reviews]) / len(reviews)
+        """Average venue rating from the persisted review aggregates"""
+        return self._rating_average('venue_rating')
     
     @property
     def avg_value_rating(self):
-        """Calculate average value rating from all reviews"""
-        reviews = self.reviews.all()
-        if not reviews:
-            return 0
-        return sum([review.value_rating for review in reviews]) / len(reviews)
-    
-    def update_average_rating(self):
-        """Update cached average rating - can be used for optimization"""
-        # This method can be used to cache rating in a separate field if needed
-        pass
+        """Average value rating from the persisted review aggregates"""
+        return self._rating_average('value_rating')
+    
+    def update_average_rating(self, added=None, removed=None):
+        """
+        Update the persisted rating sums and count.
+        With added/removed ({field: value} dicts of a single review) the aggregate is
+        adjusted incrementally; without arguments it is recomputed from all reviews.
+        """
+        update_rating_aggregate(self, self.reviews, added=added, removed=removed)
+
+
+def update_rating_aggregate(obj, reviews, added=None, removed=None):
+    """Maintain <field>_sum/rating_count columns for obj (an Event or Venue) from its reviews"""
+    fields = obj.RATING_FIELDS
+    if added is None and removed is None:
+        totals = reviews.aggregate(
+            rating_count=models.Count('pk'),
+            **{f'{field}_sum': models.Sum(field) for field in fields}
+        )
+        values = {name: total or 0 for name, total in totals.items()}
+        type(obj).objects.filter(pk=obj.pk).update(**values)
+    else:
+        deltas = {'rating_count': (1 if added else 0) - (1 if removed else 0)}
+        for field in fields:
+            deltas[f'{field}_sum'] = (added or {}).get(field, 0) - (removed or {}).get(field, 0)
+        adjust_counter(type(obj), obj.pk, **deltas)
+    if obj._state.db:
+        # Keep loaded instances in step with the stored aggregate
+        obj.refresh_from_db(fields=['rating_count'] + [f'{field}_sum' for field in fields])
 
 
 class TicketCategory(models.Model):
@@ -153,6 +317,10 @@ class TicketCategory(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Materialized counters, maintained by EventBooking/BookingTicketItem writes and TicketHold
+    sold_count = models.PositiveIntegerField(default=0, editable=False)
+    held_count = models.PositiveIntegerField(default=0, editable=False)
+    
     class Meta:
         ordering = ['price']
         unique_together = ['event', 'name']
@@ -162,21 +330,98 @@ class TicketCategory(models.Model):
     
     @property
     def tickets_sold(self):
-        from django.db.models import Sum
-        return BookingTicketItem.objects.filter(
-            ticket_category=self,
-            booking__status__in=['confirmed', 'paid']
-        ).aggregate(total=Sum('quantity'))['total'] or 0
+        return self.sold_count
     
     @property
     def tickets_available(self):
-        return max(0, self.quantity_available - self.tickets_sold)
+        # Tickets in other buyers' active holds are not available either
+        return max(0, self.quantity_available - self.tickets_sold - self.held_count)
     
     @property
     def is_sold_out(self):
         return self.tickets_available <= 0
 
 
+class TicketHoldQuerySet(models.QuerySet):
+    """Bulk operations on ticket holds"""
+    
+    def expired(self, now=None):
+        return self.filter(expires_at__lte=now or timezone.now())
+    
+    def release(self):
+        """Delete these holds and give their tickets back with one UPDATE for all categories"""
+        with write_atomic():
+            rows = list(self.select_for_update().values_list('pk', 'ticket_category_id', 'quantity'))
+            if not rows:
+                return 0
+            released = defaultdict(int)
+            for _, category_id, quantity in rows:
+                released[category_id] += quantity
+            TicketHold.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+            for event_id in set(TicketCategory.objects.filter(pk__in=released).values_list('event_id', flat=True)):
+                touch_event(event_id)
+            TicketCategory.objects.filter(pk__in=released).update(held_count=Greatest(
+                F('held_count') - Case(
+                    *[When(pk=category_id, then=Value(quantity)) for category_id, quantity in released.items()],
+                    default=Value(0),
+                ),
+                0,
+            ))
+        return len(rows)
+    
+    def take(self, user_id, category_id):
+        """Remove a user's hold on a category (expired or not) and return its quantity"""
+        hold = self.filter(user_id=user_id, ticket_category_id=category_id).values_list('pk', 'quantity').first()
+        if hold and TicketHold.objects.filter(pk=hold[0]).delete()[0]:
+            return hold[1]
+        return 0
+
+
+class TicketHold(models.Model):
+    """Tickets set aside for a buyer while they check out; released when they expire"""
+    ticket_category = models.ForeignKey(TicketCategory, on_delete=models.CASCADE, related_name='holds')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ticket_holds')
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    objects = TicketHoldQuerySet.as_manager()
+    
+    class Meta:
+        unique_together = ['ticket_category', 'user']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.ticket_category.name} x{self.quantity} until {self.expires_at}"
+    
+    @classmethod
+    def place(cls, user, quantities, minutes=None):
+        """
+        Hold {category: quantity} for user for TICKET_HOLD_MINUTES, replacing their previous
+        holds on those categories. Returns the categories that could not be held.
+        """
+        expires_at = timezone.now() + timedelta(minutes=minutes or settings.TICKET_HOLD_MINUTES)
+        failed = []
+        for category, quantity in sorted(quantities.items(), key=lambda item: item[0].pk):
+            with write_atomic():
+                hold = cls.objects.select_for_update().filter(ticket_category=category, user=user).first()
+                delta = quantity - (hold.quantity if hold else 0)
+                if delta > 0 and not reserve_counter(
+                    TicketCategory, category.pk, delta, 'quantity_available', TICKET_USAGE_FIELDS,
+                    held_count=F('held_count') + delta,
+                ):
+                    failed.append(category)
+                    continue
+                if delta < 0:
+                    adjust_counter(TicketCategory, category.pk, held_count=delta)
+                if hold:
+                    cls.objects.filter(pk=hold.pk).update(quantity=quantity, expires_at=expires_at)
+                else:
+                    cls.objects.create(ticket_category=category, user=user, quantity=quantity, expires_at=expires_at)
+                if delta:
+                    touch_event(category.event_id)
+        return failed
+
+
 class EventBooking(models.Model):
     BOOKING_STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -189,6 +434,7 @@ class EventBooking(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='bookings')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_bookings')
     booking_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=20, choices=BOOKING_STATUS_CHOICES, default='pending')
     attendees_count = models.PositiveIntegerField(default=1)
     special_requests = models.TextField(blank=True, null=True)
@@ -208,6 +454,19 @@ class EventBooking(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.event.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted status so save() can apply counter deltas
+        loaded = dict(zip(field_names, values))
+        if loaded.get('status') is not models.DEFERRED:
+            instance._counted_status = loaded.get('status')
+        return instance
+    
+    @property
+    def is_sold(self):
+        return self.status in SOLD_BOOKING_STATUSES
+    
     @property
     def can_cancel(self):
         return self.status in ['pending', 'confirmed'] and self.event.start_date > timezone.now()
@@ -218,37 +477,123 @@ class EventBooking(models.Model):
         return self.ticket_items.aggregate(total=models.Sum('quantity'))['total'] or 0
     
     def save(self, *args, **kwargs):
-        # Update total_amount and attendees_count based on ticket items
-        super().save(*args, **kwargs)
-        self.update_totals()
+        with write_atomic():
+            if self.pk and not hasattr(self, '_counted_status'):
+                self._counted_status = EventBooking.objects.filter(
+                    pk=self.pk
+                ).values_list('status', flat=True).first()
+            was_sold = getattr(self, '_counted_status', None) in SOLD_BOOKING_STATUSES
+            
+            if (self._state.adding and self.amount == 0 and self.total_amount == 0
+                    and not getattr(self, '_priced', False)):
+                # New booking without explicit amounts - default to the event's ticket price
+                # (ticket items recompute the totals through update_totals when they are saved)
+                self.total_amount = self.amount = self.event.ticket_price or 0
+                if self.attendees_count == 0:
+                    self.attendees_count = 1
+            super().save(*args, **kwargs)
+            
+            if was_sold != self.is_sold:
+                self._apply_counter_delta(1 if self.is_sold else -1)
+            if self.status == 'cancelled' and getattr(self, '_counted_status', None) != 'cancelled':
+                # Hand back anything still held for this checkout
+                TicketHold.objects.filter(user_id=self.user_id, ticket_category__event_id=self.event_id).release()
+            self._counted_status = self.status
+    
+    def _apply_counter_delta(self, sign):
+        """
+        Add (sign=1) or remove (sign=-1) this booking's tickets from the stored counters.
+        Adding reserves inventory and raises SoldOut (rolling back the save) when a
+        ticket category or a category-less event has no room left.
+        """
+        # Fixed category order so concurrent bookings lock rows in the same sequence
+        items = self.ticket_items.order_by('ticket_category_id').values_list(
+            'ticket_category_id', 'quantity', 'price_per_ticket'
+        )
+        day = timezone.localdate(self.booking_date)
+        total_tickets = 0
+        for category_id, quantity, price in items:
+            if sign > 0:
+                reserve_tickets(category_id, quantity, held=TicketHold.objects.take(self.user_id, category_id))
+            else:
+                adjust_counter(TicketCategory, category_id, sold_count=-quantity)
+            DailyRevenue.record(self.event_id, day, category_id, tickets=sign * quantity, revenue=sign * quantity * price)
+            total_tickets += quantity
+        
+        if total_tickets:
+            DailyRevenue.record(self.event_id, day, bookings=sign)
+        else:
+            DailyRevenue.record(self.event_id, day, bookings=sign, tickets=sign * self.attendees_count,
+                                revenue=sign * self.total_amount)
+        if sign > 0 and not total_tickets:
+            # Events without ticket categories are limited by max_attendees
+            if not reserve_counter(Event, self.event_id, 1, 'max_attendees', ['sold_bookings_count'],
+                                   sold_bookings_count=F('sold_bookings_count') + 1,
+                                   sold_tickets_count=F('sold_tickets_count') + self.attendees_count):
+                raise SoldOut('This event is fully booked.')
+            return
+        adjust_counter(
+            Event, self.event_id,
+            sold_bookings_count=sign,
+            # A booking without ticket items counts its attendees as tickets
+            sold_tickets_count=sign * (total_tickets or self.attendees_count)
+        )
     
     def update_totals(self):
-        """Update total_amount and attendees_count based on ticket items"""
-        ticket_items = self.ticket_items.all()
-        
-        if ticket_items.exists():
-            # Event with ticket categories - calculate from ticket items
-            self.total_amount = sum(item.quantity * item.ticket_category.price for item in ticket_items)
-            self.attendees_count = sum(item.quantity for item in ticket_items)
-            self.amount = self.total_amount  # Keep amount in sync with total_amount
-            EventBooking.objects.filter(pk=self.pk).update(
-                total_amount=self.total_amount,
-                attendees_count=self.attendees_count,
-                amount=self.total_amount
-            )
+        """Recompute total_amount and attendees_count from the ticket items with one aggregate query"""
+        totals = self.ticket_items.aggregate(
+            amount=models.Sum(F('quantity') * F('price_per_ticket'), output_field=models.DecimalField()),
+            tickets=models.Sum('quantity'),
+        )
+        if totals['tickets'] is None:
+            # Event without ticket categories - keep the manually set amounts
+            return
+        self.total_amount = self.amount = totals['amount']  # Keep amount in sync with total_amount
+        self.attendees_count = totals['tickets']
+        EventBooking.objects.filter(pk=self.pk).update(
+            total_amount=self.total_amount,
+            attendees_count=self.attendees_count,
+            amount=self.total_amount,
+            updated_at=timezone.now()
+        )
+    
+    @classmethod
+    def create_with_items(cls, event, user, quantities, instance=None):
+        """
+        Create a booking with its {TicketCategory: quantity} items in one go.
+        Items are bulk-inserted and the totals computed once from the in-memory prices.
+        Free bookings are confirmed straight away, which reserves their tickets and may
+        raise SoldOut; paid bookings are left pending payment. instance can be an unsaved
+        booking carrying extra fields (e.g. from EventBookingForm.save(commit=False)).
+        """
+        booking = instance or cls()
+        booking.event, booking.user = event, user
+        items = [
+            BookingTicketItem(ticket_category=category, quantity=quantity, price_per_ticket=category.price)
+            for category, quantity in quantities.items() if quantity > 0
+        ]
+        if items:
+            booking.amount = booking.total_amount = sum(item.subtotal for item in items)
+            booking.attendees_count = sum(item.quantity for item in items)
         else:
-            # Event without ticket categories - don't override manually set amounts
-            # Only update if amounts are not already set
-            if self.amount == 0 and self.total_amount == 0:
-                self.total_amount = self.event.ticket_price or 0
-                self.amount = self.total_amount
-                if self.attendees_count == 0:
-                    self.attendees_count = 1
-                EventBooking.objects.filter(pk=self.pk).update(
-                    total_amount=self.total_amount,
-                    amount=self.total_amount,
-                    attendees_count=self.attendees_count
-                )
+            # Event without ticket categories - use default pricing
+            booking.amount = booking.total_amount = event.ticket_price or 0
+            booking.attendees_count = 1
+        # The totals are final (possibly 0 for free categories); save() must not re-default them
+        booking._priced = True
+        booking.status = booking.payment_status = 'pending'
+        
+        with write_atomic():
+            booking.save()
+            for item in items:
+                item.booking = booking
+            BookingTicketItem.objects.bulk_create(items)
+            
+            if event.is_free or booking.amount == 0:
+                booking.status = 'confirmed'
+                booking.payment_status = 'completed'
+                booking.save(update_fields=['status', 'payment_status'])
+        return booking
 
 
 class BookingTicketItem(models.Model):
@@ -268,13 +613,108 @@ class BookingTicketItem(models.Model):
     def subtotal(self):
         return self.quantity * self.price_per_ticket
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted category/quantity so save() can apply counter deltas
+        loaded = dict(zip(field_names, values))
+        if models.DEFERRED not in (loaded.get('ticket_category_id'), loaded.get('quantity')):
+            instance._counted = (loaded.get('ticket_category_id'), loaded.get('quantity'))
+        return instance
+    
     def save(self, *args, **kwargs):
         # Store the price at time of booking
         if not self.price_per_ticket:
             self.price_per_ticket = self.ticket_category.price
-        super().save(*args, **kwargs)
-        # Update booking totals after saving
-        self.booking.update_totals()
+        
+        with write_atomic():
+            if self.pk and not hasattr(self, '_counted'):
+                self._counted = BookingTicketItem.objects.filter(
+                    pk=self.pk
+                ).values_list('ticket_category_id', 'quantity').first()
+            old_category_id, old_quantity = getattr(self, '_counted', None) or (None, 0)
+            
+            super().save(*args, **kwargs)
+            
+            # Only items of sold bookings count towards the stored counters
+            if EventBooking.objects.filter(pk=self.booking_id, status__in=SOLD_BOOKING_STATUSES).exists():
+                same_category = old_category_id == self.ticket_category_id
+                if not same_category:
+                    adjust_counter(TicketCategory, old_category_id, sold_count=-old_quantity)
+                extra = self.quantity - (old_quantity if same_category else 0)
+                # Extra tickets on a sold booking must be reserved like a new sale
+                if extra > 0:
+                    reserve_tickets(self.ticket_category_id, extra)
+                else:
+                    adjust_counter(TicketCategory, self.ticket_category_id, sold_count=extra)
+                adjust_counter(Event, self.booking.event_id, sold_tickets_count=self.quantity - old_quantity)
+                
+                day = timezone.localdate(self.booking.booking_date)
+                if not same_category:
+                    DailyRevenue.record(self.booking.event_id, day, old_category_id, tickets=-old_quantity,
+                                        revenue=-old_quantity * self.price_per_ticket)
+                DailyRevenue.record(self.booking.event_id, day, self.ticket_category_id, tickets=extra,
+                                    revenue=extra * self.price_per_ticket)
+            self._counted = (self.ticket_category_id, self.quantity)
+            
+            # Update booking totals after saving
+            self.booking.update_totals()
+
+
+class DailyRevenue(models.Model):
+    """
+    Sold bookings, tickets and revenue per event, ticket category and booking day.
+    Rows with a category hold that category's tickets; the row without one holds the
+    day's booking count plus the tickets/revenue of bookings without ticket items.
+    Maintained incrementally by EventBooking/BookingTicketItem writes and rebuilt
+    by the backfill_revenue_rollup command.
+    """
+    organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_revenue')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='daily_revenue')
+    ticket_category = models.ForeignKey(TicketCategory, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_revenue')
+    day = models.DateField()
+    bookings = models.IntegerField(default=0)
+    tickets = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'ticket_category', 'day'], condition=models.Q(ticket_category__isnull=False),
+                name='revenue_event_category_day_uniq',
+            ),
+            # NULLs never collide in a unique index, so the event-level row needs its own constraint
+            models.UniqueConstraint(
+                fields=['event', 'day'], condition=models.Q(ticket_category__isnull=True),
+                name='revenue_event_day_uniq',
+            ),
+        ]
+        indexes = [models.Index(fields=['organizer', 'day'], name='revenue_organizer_day_idx')]
+        ordering = ['day']
+    
+    def __str__(self):
+        return f"{self.event} - {self.day}: {self.revenue}"
+    
+    @classmethod
+    def record(cls, event_id, day, ticket_category_id=None, bookings=0, tickets=0, revenue=0):
+        """Add deltas to the (event, category, day) row, creating it for the first sale"""
+        if not (bookings or tickets or revenue):
+            return
+        row = cls.objects.filter(event_id=event_id, ticket_category_id=ticket_category_id, day=day)
+        deltas = dict(bookings=F('bookings') + bookings, tickets=F('tickets') + tickets, revenue=F('revenue') + revenue)
+        if row.update(**deltas) or min(bookings, tickets, revenue) < 0:
+            # Removals never create rows (e.g. while an event and its rollup are being deleted)
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    organizer_id=Event.objects.values_list('organizer_id', flat=True).get(pk=event_id),
+                    event_id=event_id, ticket_category_id=ticket_category_id, day=day,
+                    bookings=bookings, tickets=tickets, revenue=revenue
+                )
+        except IntegrityError:
+            # Created concurrently - apply the deltas to that row instead
+            row.update(**deltas)
 
 
 class EventComment(models.Model):
@@ -303,6 +743,9 @@ class EventComment(models.Model):
     @property
     def like_count(self):
         """Return the number of likes for this comment"""
+        if hasattr(self, 'num_likes'):
+            # Annotated by core.comments.load_comment_tree
+            return self.num_likes
         return self.likes.count()
     
     def is_liked_by_user(self, user):
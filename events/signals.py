@@ -0,0 +1,64 @@
+"""
+Django signals keeping the materialized Event/TicketCategory counters and the
+DailyRevenue rollup in sync on deletes, and the cached event snapshots fresh
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    Event, EventBooking, TicketCategory, BookingTicketItem, DailyRevenue,
+    SOLD_BOOKING_STATUSES, adjust_counter, touch_event
+)
+
+
+@receiver(post_delete, sender=BookingTicketItem)
+def release_deleted_ticket_item(sender, instance, **kwargs):
+    """Remove a deleted ticket item from the counters if its booking was sold"""
+    category_id, quantity = getattr(instance, '_counted', None) or (instance.ticket_category_id, instance.quantity)
+    booking = EventBooking.objects.filter(
+        pk=instance.booking_id,
+        status__in=SOLD_BOOKING_STATUSES
+    ).only('event_id', 'booking_date').first()
+    if booking:
+        adjust_counter(TicketCategory, category_id, sold_count=-quantity)
+        adjust_counter(Event, booking.event_id, sold_tickets_count=-quantity)
+        DailyRevenue.record(
+            booking.event_id, timezone.localdate(booking.booking_date), category_id,
+            tickets=-quantity, revenue=-quantity * instance.price_per_ticket
+        )
+
+
+@receiver(pre_delete, sender=EventBooking)
+def remember_booking_items(sender, instance, **kwargs):
+    """Note whether a sold booking has ticket items before the cascade removes them"""
+    if getattr(instance, '_counted_status', instance.status) in SOLD_BOOKING_STATUSES:
+        instance._had_ticket_items = instance.ticket_items.exists()
+
+
+@receiver(post_delete, sender=EventBooking)
+def release_deleted_booking(sender, instance, **kwargs):
+    """Remove a deleted booking from the counters (its ticket items are released by cascade)"""
+    status = getattr(instance, '_counted_status', instance.status)
+    if status in SOLD_BOOKING_STATUSES:
+        # Itemized tickets were taken off the counters and rollup by release_deleted_ticket_item
+        itemized = getattr(instance, '_had_ticket_items', True)
+        adjust_counter(Event, instance.event_id, sold_bookings_count=-1,
+                       sold_tickets_count=0 if itemized else -instance.attendees_count)
+        DailyRevenue.record(
+            instance.event_id, timezone.localdate(instance.booking_date), bookings=-1,
+            tickets=0 if itemized else -instance.attendees_count,
+            revenue=0 if itemized else -instance.total_amount
+        )
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_event_snapshot(sender, instance, **kwargs):
+    touch_event(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=TicketCategory)
+@receiver([post_save, post_delete], sender='reviews.EventReview')
+def invalidate_parent_event_snapshot(sender, instance, **kwargs):
+    """Categories and reviews are part of their event's snapshot"""
+    touch_event(instance.event_id)
@@ -0,0 +1,47 @@
+"""
+Cached read model for event_detail.
+
+A snapshot bundles the parts of the page that are the same for every visitor: the
+event row (with organizer, profile and venue), its ticket categories with their
+sold/held counters, and the three most recent reviews. It is stored under the
+event's generation number, which is bumped after every committed write to the
+event, its categories, reviews or counters (events.models.touch_event). The
+generation lives in the cache shared by all worker processes (core.cache), so
+a write - a booking or hold changing availability included - is visible on the
+next request to any worker, even though snapshots themselves are cached per
+process. EVENT_SNAPSHOT_TTL only bounds how long unchanged snapshots - and
+related names such as the organizer's - are kept.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import get_generations
+from .models import Event, EVENT_GENERATION
+
+
+def build_event_snapshot(pk):
+    """Load the shared event_detail data from the database; None for missing or inactive events"""
+    event = Event.objects.select_related('organizer__profile', 'venue').filter(pk=pk, is_active=True).first()
+    if event is None:
+        return None
+    categories = list(event.ticket_categories.all())
+    return {
+        'event': event,
+        'categories': categories,
+        'active_categories': [category for category in categories if category.is_active],
+        'has_categories': bool(categories),
+        'recent_reviews': list(event.reviews.select_related('user').order_by('-created_at')[:3]),
+    }
+
+
+def get_event_snapshot(pk):
+    """The cached snapshot for the event's current generation, built on a miss"""
+    generation_name = EVENT_GENERATION.format(pk)
+    generation = get_generations([generation_name])[generation_name]
+    key = f'snapshot:event:{pk}:{generation}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_event_snapshot(pk)
+        if snapshot is not None:
+            cache.set(key, snapshot, getattr(settings, 'EVENT_SNAPSHOT_TTL', 300))
+    return snapshot
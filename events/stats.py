@@ -0,0 +1,101 @@
+"""
+Organizer dashboard statistics.
+
+All per-event booking and revenue figures for an organizer come from one grouped
+query with conditional aggregates; tickets sold are read from the materialized
+Event.sold_tickets_count. Totals and live/upcoming/completed counts are summed
+in Python from the same rows. Date-ranged figures come from the DailyRevenue
+rollup, so they cost O(days) rows rather than O(bookings).
+"""
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Event, DailyRevenue, SOLD_BOOKING_STATUSES
+
+
+def organizer_event_stats(user):
+    """
+    The organizer's events (newest first), each annotated with:
+    bookings_total, bookings_paid / revenue_paid (payment completed),
+    bookings_pending (payment pending) and bookings_sold / revenue_sold
+    (status confirmed). tickets_sold is the stored sold_tickets_count.
+    """
+    paid = Q(bookings__payment_status='completed')
+    sold = Q(bookings__status__in=SOLD_BOOKING_STATUSES)
+    return Event.objects.filter(organizer=user).annotate(
+        bookings_total=Count('bookings'),
+        bookings_paid=Count('bookings', filter=paid),
+        bookings_pending=Count('bookings', filter=Q(bookings__payment_status='pending')),
+        bookings_sold=Count('bookings', filter=sold),
+        revenue_paid=Sum('bookings__total_amount', filter=paid, default=Decimal('0')),
+        revenue_sold=Sum('bookings__total_amount', filter=sold, default=Decimal('0')),
+    ).order_by('-created_at')
+
+
+def organizer_totals(events, now=None):
+    """Sum the per-event stats of organizer_event_stats() rows into dashboard totals"""
+    now = now or timezone.now()
+    totals = {
+        'events': 0,
+        'upcoming_events': 0,
+        'live_events': 0,
+        'completed_events': 0,
+        'bookings_total': 0,
+        'bookings_paid': 0,
+        'bookings_pending': 0,
+        'bookings_sold': 0,
+        'revenue_paid': Decimal('0'),
+        'revenue_sold': Decimal('0'),
+        'tickets_sold': 0,
+    }
+    for event in events:
+        totals['events'] += 1
+        if event.start_date > now:
+            totals['upcoming_events'] += 1
+        elif event.end_date < now:
+            totals['completed_events'] += 1
+        else:
+            totals['live_events'] += 1
+        for field in ('bookings_total', 'bookings_paid', 'bookings_pending', 'bookings_sold',
+                      'revenue_paid', 'revenue_sold'):
+            totals[field] += getattr(event, field)
+        totals['tickets_sold'] += event.sold_tickets_count
+    return totals
+
+
+def date_range(request):
+    """(start, end) dates from the ?start=YYYY-MM-DD&end=YYYY-MM-DD query, None when missing or invalid"""
+    def parse(name):
+        try:
+            return parse_date(request.GET.get(name, ''))
+        except ValueError:
+            return None
+    return parse('start'), parse('end')
+
+
+def revenue_by_event(user, start=None, end=None):
+    """
+    {event_id: {'title', 'bookings', 'tickets', 'revenue'}} of sold bookings made
+    between start and end (inclusive, either may be None), read from DailyRevenue
+    """
+    rows = DailyRevenue.objects.filter(organizer=user)
+    if start:
+        rows = rows.filter(day__gte=start)
+    if end:
+        rows = rows.filter(day__lte=end)
+    return {
+        row['event_id']: {
+            'title': row['event__title'],
+            'bookings': row['total_bookings'],
+            'tickets': row['total_tickets'],
+            'revenue': row['total_revenue'],
+        }
+        for row in rows.values('event_id', 'event__title').annotate(
+            total_bookings=Sum('bookings'),
+            total_tickets=Sum('tickets'),
+            total_revenue=Sum('revenue'),
+        ).order_by()
+    }
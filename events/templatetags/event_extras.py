@@ -7,6 +7,9 @@ register = template.Library()
 def is_liked_by(comment, user):
     """Check if a comment is liked by a specific user"""
     if user.is_authenticated:
+        if hasattr(comment, 'liked_by_user'):
+            # Resolved for the whole thread by core.comments.resolve_liked
+            return comment.liked_by_user
         return comment.is_liked_by_user(user)
     return False
 
@@ -1,3 +1,633 @@
-from django.test import TestCase
+import csv
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import SkipTest
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import get_generations
+
+from .importer import import_events
+from .models import EVENT_GENERATION, Event, EventBooking, BookingTicketItem, DailyRevenue, TicketCategory, TicketHold, SoldOut
+from .snapshots import get_event_snapshot
+from .stats import organizer_event_stats, organizer_totals, revenue_by_event
+
+
+def make_event(organizer, **fields):
+    now = timezone.now()
+    defaults = {
+        'title': 'Test Event',
+        'description': 'An event',
+        'organizer': organizer,
+        'venue_name': 'Test Hall',
+        'venue_address': '1 Test Street',
+        'start_date': now + timedelta(days=30),
+        'end_date': now + timedelta(days=31),
+        'contact_email': 'organizer@example.com',
+    }
+    defaults.update(fields)
+    return Event.objects.create(**defaults)
+
+
+class SoldCounterTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        self.buyer = User.objects.create(username='buyer')
+        self.event = make_event(self.organizer, is_free=False, ticket_price=Decimal('20.00'))
+        self.general = TicketCategory.objects.create(event=self.event, name='General', price=Decimal('20.00'), quantity_available=10)
+        self.vip = TicketCategory.objects.create(event=self.event, name='VIP', price=Decimal('50.00'), quantity_available=5)
+
+    def assertCounters(self, bookings, tickets, general, vip):
+        self.event.refresh_from_db()
+        self.general.refresh_from_db()
+        self.vip.refresh_from_db()
+        self.assertEqual(
+            (self.event.sold_bookings_count, self.event.sold_tickets_count, self.general.sold_count, self.vip.sold_count),
+            (bookings, tickets, general, vip)
+        )
+
+    def test_pending_booking_is_not_counted_until_confirmed(self):
+        booking = EventBooking.create_with_items(self.event, self.buyer, {self.general: 2, self.vip: 1})
+        self.assertCounters(0, 0, 0, 0)
+
+        booking.status = 'confirmed'
+        booking.save()
+        self.assertCounters(1, 3, 2, 1)
+        self.assertEqual(self.event.current_attendees, 1)
+
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertCounters(0, 0, 0, 0)
+
+    def test_current_attendees_counts_confirmed_bookings(self):
+        event = make_event(self.organizer, max_attendees=3)
+        for number, status in enumerate(['pending', 'confirmed', 'confirmed', 'cancelled', 'attended', 'no_show']):
+            buyer = User.objects.create(username=f'attendee{number}')
+            EventBooking.objects.create(event=event, user=buyer, status=status)
+        event.refresh_from_db()
+
+        self.assertEqual(event.current_attendees, event.bookings.filter(status='confirmed').count())
+        self.assertEqual(event.current_attendees, 2)
+        self.assertEqual(event.available_spots, 1)
+        self.assertFalse(event.is_full)
+
+    def test_item_changes_on_a_sold_booking_move_the_counters(self):
+        booking = EventBooking.create_with_items(self.event, self.buyer, {self.general: 2})
+        booking.status = 'confirmed'
+        booking.save()
+
+        item = booking.ticket_items.get()
+        item.quantity = 4
+        item.save()
+        self.assertCounters(1, 4, 4, 0)
+
+        item.ticket_category = self.vip
+        item.save()
+        self.assertCounters(1, 4, 0, 4)
+
+        item.delete()
+        self.assertCounters(1, 0, 0, 0)
+
+    def test_deleting_a_sold_booking_releases_its_tickets(self):
+        booking = EventBooking.create_with_items(self.event, self.buyer, {self.general: 3})
+        booking.status = 'confirmed'
+        booking.save()
+
+        booking.delete()
+        self.assertCounters(0, 0, 0, 0)
+        self.assertEqual(self.general.tickets_available, 10)
+
+
+class TicketHoldTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        self.buyer = User.objects.create(username='buyer')
+        self.other = User.objects.create(username='other')
+        self.event = make_event(self.organizer)
+        self.category = TicketCategory.objects.create(event=self.event, name='General', price=Decimal('0.00'), quantity_available=5)
+
+    def test_held_tickets_are_not_available_to_other_buyers(self):
+        self.assertEqual(TicketHold.place(self.buyer, {self.category: 4}), [])
+        self.category.refresh_from_db()
+        self.assertEqual((self.category.held_count, self.category.tickets_available), (4, 1))
+
+        self.assertEqual(TicketHold.place(self.other, {self.category: 2}), [self.category])
+        with self.assertRaises(SoldOut):
+            EventBooking.create_with_items(self.event, self.other, {self.category: 2})
+
+    def test_placing_again_replaces_the_hold(self):
+        TicketHold.place(self.buyer, {self.category: 4})
+        TicketHold.place(self.buyer, {self.category: 1})
+
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.held_count, 1)
+        self.assertEqual(TicketHold.objects.get(user=self.buyer).quantity, 1)
+
+    def test_booking_converts_the_buyers_own_hold(self):
+        TicketHold.place(self.buyer, {self.category: 5})
+
+        EventBooking.create_with_items(self.event, self.buyer, {self.category: 5})
+
+        self.category.refresh_from_db()
+        self.assertEqual((self.category.sold_count, self.category.held_count), (5, 0))
+        self.assertFalse(TicketHold.objects.exists())
+
+    def test_expired_holds_are_released(self):
+        TicketHold.place(self.buyer, {self.category: 3})
+        TicketHold.place(self.other, {self.category: 1})
+        TicketHold.objects.filter(user=self.buyer).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        call_command('release_ticket_holds', stdout=StringIO())
+
+        self.category.refresh_from_db()
+        self.assertEqual((self.category.held_count, self.category.tickets_available), (1, 4))
+        self.assertEqual(list(TicketHold.objects.values_list('user__username', flat=True)), ['other'])
+
+    def test_cancelling_a_booking_releases_its_holds(self):
+        paid = make_event(self.organizer, title='Paid', is_free=False)
+        category = TicketCategory.objects.create(event=paid, name='General', price=Decimal('10.00'), quantity_available=5)
+        TicketHold.place(self.buyer, {category: 2})
+        booking = EventBooking.create_with_items(paid, self.buyer, {category: 2})
+        self.assertEqual(booking.status, 'pending')
+
+        booking.status = 'cancelled'
+        booking.save()
+
+        category.refresh_from_db()
+        self.assertEqual((category.sold_count, category.held_count), (0, 0))
+        self.assertFalse(TicketHold.objects.exists())
+
+
+class CreateWithItemsTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        self.buyer = User.objects.create(username='buyer')
+        self.event = make_event(self.organizer, is_free=False, ticket_price=Decimal('50.00'))
+
+    def test_items_set_amounts_and_leave_paid_booking_pending(self):
+        vip = TicketCategory.objects.create(event=self.event, name='VIP', price=Decimal('30.00'), quantity_available=10)
+        general = TicketCategory.objects.create(event=self.event, name='General', price=Decimal('12.50'), quantity_available=10)
+
+        booking = EventBooking.objects.get(
+            pk=EventBooking.create_with_items(self.event, self.buyer, {vip: 1, general: 2}).pk
+        )
+
+        self.assertEqual(booking.total_amount, Decimal('55.00'))
+        self.assertEqual(booking.amount, Decimal('55.00'))
+        self.assertEqual(booking.attendees_count, 3)
+        self.assertEqual(booking.total_tickets, 3)
+        self.assertEqual(booking.status, 'pending')
+
+    def test_zero_priced_categories_are_not_charged_the_event_ticket_price(self):
+        free = TicketCategory.objects.create(event=self.event, name='Guest', price=Decimal('0.00'), quantity_available=10)
+
+        booking = EventBooking.objects.get(
+            pk=EventBooking.create_with_items(self.event, self.buyer, {free: 2}).pk
+        )
+
+        self.assertEqual(booking.total_amount, Decimal('0.00'))
+        self.assertEqual(booking.amount, Decimal('0.00'))
+        self.assertEqual(booking.attendees_count, 2)
+        self.assertEqual(booking.status, 'confirmed')
+        self.assertEqual(booking.payment_status, 'completed')
+
+    def test_booking_without_categories_uses_event_ticket_price(self):
+        booking = EventBooking.create_with_items(self.event, self.buyer, {})
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.total_amount, Decimal('50.00'))
+        self.assertEqual(booking.attendees_count, 1)
+        self.assertEqual(booking.status, 'pending')
+
+
+class OrganizerTotalsTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        self.buyers = [User.objects.create(username=f'buyer{i}') for i in range(3)]
+
+    def test_tickets_sold_includes_events_without_categories(self):
+        plain = make_event(self.organizer, title='No categories', ticket_price=Decimal('0.00'))
+        ticketed = make_event(self.organizer, title='With categories', is_free=False)
+        general = TicketCategory.objects.create(event=ticketed, name='General', price=Decimal('0.00'), quantity_available=10)
+        EventBooking.objects.create(event=plain, user=self.buyers[0], attendees_count=3, status='confirmed')
+        cancelled = EventBooking.objects.create(event=plain, user=self.buyers[1], attendees_count=2, status='confirmed')
+        EventBooking.create_with_items(ticketed, self.buyers[2], {general: 4})
+
+        cancelled.status = 'cancelled'
+        cancelled.save()
+
+        plain.refresh_from_db()
+        self.assertEqual((plain.sold_bookings_count, plain.sold_tickets_count), (1, 3))
+        self.assertEqual(organizer_totals(organizer_event_stats(self.organizer))['tickets_sold'], 7)
+
+    def test_per_event_figures_come_from_one_grouped_query(self):
+        now = timezone.now()
+        upcoming = make_event(self.organizer, title='Upcoming')
+        live = make_event(self.organizer, title='Live', start_date=now - timedelta(hours=1), end_date=now + timedelta(hours=1))
+        make_event(self.organizer, title='Past', start_date=now - timedelta(days=3), end_date=now - timedelta(days=2))
+        make_event(User.objects.create(username='other'), title='Not mine')
+        for buyer, event, status, payment_status, amount in [
+            (self.buyers[0], upcoming, 'confirmed', 'completed', '30.00'),
+            (self.buyers[1], upcoming, 'pending', 'pending', '20.00'),
+            (self.buyers[2], upcoming, 'cancelled', 'failed', '50.00'),
+            (self.buyers[0], live, 'confirmed', 'completed', '15.50'),
+        ]:
+            EventBooking.objects.create(event=event, user=buyer, status=status, payment_status=payment_status,
+                                        total_amount=Decimal(amount))
+
+        with self.assertNumQueries(1):
+            events = {event.title: event for event in organizer_event_stats(self.organizer)}
+
+        self.assertEqual(set(events), {'Upcoming', 'Live', 'Past'})
+        first = events['Upcoming']
+        self.assertEqual(
+            (first.bookings_total, first.bookings_paid, first.bookings_pending, first.bookings_sold),
+            (3, 1, 1, 1),
+        )
+        self.assertEqual((first.revenue_paid, first.revenue_sold), (Decimal('30.00'), Decimal('30.00')))
+        self.assertEqual(events['Past'].revenue_sold, Decimal('0'))
+
+        totals = organizer_totals(events.values())
+        self.assertEqual(
+            (totals['events'], totals['upcoming_events'], totals['live_events'], totals['completed_events']),
+            (3, 1, 1, 1),
+        )
+        self.assertEqual((totals['bookings_total'], totals['revenue_paid']), (4, Decimal('45.50')))
+
+    def test_recount_matches_maintained_counters(self):
+        plain = make_event(self.organizer, title='No categories')
+        booking = EventBooking.objects.create(event=plain, user=self.buyers[0], attendees_count=2, status='confirmed')
+        Event.objects.filter(pk=plain.pk).update(sold_bookings_count=0, sold_tickets_count=0)
+
+        call_command('recount_event_counters', stdout=StringIO())
+
+        plain.refresh_from_db()
+        self.assertEqual((plain.sold_bookings_count, plain.sold_tickets_count), (1, 2))
+
+        booking.delete()
+        plain.refresh_from_db()
+        self.assertEqual((plain.sold_bookings_count, plain.sold_tickets_count), (0, 0))
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        self.buyers = [User.objects.create(username=f'buyer{i}') for i in range(3)]
+
+    def test_booking_more_tickets_than_left_raises_sold_out(self):
+        event = make_event(self.organizer)
+        category = TicketCategory.objects.create(event=event, name='General', price=Decimal('0.00'), quantity_available=3)
+        EventBooking.create_with_items(event, self.buyers[0], {category: 2})
+
+        with self.assertRaises(SoldOut):
+            EventBooking.create_with_items(event, self.buyers[1], {category: 2})
+
+        category.refresh_from_db()
+        self.assertEqual(category.sold_count, 2)
+        self.assertEqual(category.tickets_available, 1)
+        self.assertFalse(EventBooking.objects.filter(user=self.buyers[1]).exists())
+
+    def test_event_without_categories_is_limited_by_max_attendees(self):
+        event = make_event(self.organizer, max_attendees=1)
+        EventBooking.create_with_items(event, self.buyers[0], {})
+
+        with self.assertRaises(SoldOut):
+            EventBooking.create_with_items(event, self.buyers[1], {})
+
+        event.refresh_from_db()
+        self.assertEqual(event.sold_bookings_count, 1)
+        self.assertTrue(event.is_full)
+
+
+class DailyRevenueTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        self.buyers = [User.objects.create(username=f'buyer{i}') for i in range(3)]
+        self.event = make_event(self.organizer, is_free=False, ticket_price=Decimal('15.00'))
+        self.general = TicketCategory.objects.create(event=self.event, name='General', price=Decimal('20.00'), quantity_available=10)
+        self.plain = make_event(self.organizer, title='No categories', is_free=False, ticket_price=Decimal('15.00'))
+
+    def confirm(self, booking):
+        booking.status = 'confirmed'
+        booking.save()
+        return booking
+
+    def rollup(self):
+        return sorted(
+            DailyRevenue.objects.exclude(bookings=0, tickets=0, revenue=0)
+            .values_list('event_id', 'ticket_category_id', 'day', 'bookings', 'tickets', 'revenue'),
+            key=lambda row: (row[0], row[1] or 0, row[2])
+        )
+
+    def test_sold_bookings_are_rolled_up_by_event_category_and_day(self):
+        self.confirm(EventBooking.create_with_items(self.event, self.buyers[0], {self.general: 3}))
+        self.confirm(EventBooking.create_with_items(self.plain, self.buyers[0], {}))
+        EventBooking.create_with_items(self.event, self.buyers[1], {self.general: 1})  # pending, not sold
+
+        today = timezone.localdate()
+        self.assertEqual(self.rollup(), [
+            (self.event.pk, None, today, 1, 0, Decimal('0.00')),
+            (self.event.pk, self.general.pk, today, 0, 3, Decimal('60.00')),
+            (self.plain.pk, None, today, 1, 1, Decimal('15.00')),
+        ])
+        self.assertEqual(revenue_by_event(self.organizer, start=today, end=today)[self.event.pk], {
+            'title': self.event.title, 'bookings': 1, 'tickets': 3, 'revenue': Decimal('60.00'),
+        })
+        self.assertEqual(revenue_by_event(self.organizer, start=today + timedelta(days=1)), {})
+
+    def test_cancelled_and_deleted_bookings_are_taken_off(self):
+        cancelled = self.confirm(EventBooking.create_with_items(self.event, self.buyers[0], {self.general: 2}))
+        deleted = self.confirm(EventBooking.create_with_items(self.plain, self.buyers[1], {}))
+
+        cancelled.status = 'cancelled'
+        cancelled.save()
+        deleted.delete()
+
+        self.assertEqual(self.rollup(), [])
+
+    def test_event_level_rows_are_unique_per_day(self):
+        today = timezone.localdate()
+        DailyRevenue.record(self.plain.pk, today, bookings=1, tickets=1, revenue=Decimal('15.00'))
+        DailyRevenue.record(self.plain.pk, today, bookings=1, tickets=2, revenue=Decimal('30.00'))
+        self.assertEqual(self.rollup(), [(self.plain.pk, None, today, 2, 3, Decimal('45.00'))])
+
+        # What a racing first write would try: a second NULL-category row for the same day
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyRevenue.objects.create(organizer=self.organizer, event=self.plain, day=today, bookings=1)
+        DailyRevenue.objects.create(organizer=self.organizer, event=self.event, ticket_category=self.general, day=today)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyRevenue.objects.create(organizer=self.organizer, event=self.event, ticket_category=self.general, day=today)
+
+    def test_backfill_rebuilds_the_incremental_rollup(self):
+        self.confirm(EventBooking.create_with_items(self.event, self.buyers[0], {self.general: 3}))
+        second = self.confirm(EventBooking.create_with_items(self.event, self.buyers[1], {self.general: 1}))
+        self.confirm(EventBooking.create_with_items(self.plain, self.buyers[2], {}))
+        item = second.ticket_items.get()
+        item.quantity = 2
+        item.save()
+        incremental = self.rollup()
+
+        DailyRevenue.objects.all().delete()
+        call_command('backfill_revenue_rollup', stdout=StringIO())
+
+        self.assertEqual(self.rollup(), incremental)
+
+
+class EventImportTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        start = timezone.now() + timedelta(days=30)
+        self.dates = {
+            'start_date': start.strftime('%Y-%m-%d %H:%M'),
+            'end_date': (start + timedelta(hours=3)).strftime('%Y-%m-%d %H:%M'),
+        }
+
+    def row(self, title, **fields):
+        return {
+            'title': title, 'description': 'Imported', 'event_type': 'concert',
+            'venue_name': 'Hall', 'venue_address': '1 Test Street', 'max_attendees': 100,
+            'ticket_price': '0', 'is_free': True, 'contact_email': 'organizer@example.com',
+            **self.dates, **fields,
+        }
+
+    def import_json(self, rows, **options):
+        return import_events(StringIO(json.dumps(rows)), 'json', self.organizer, **options)
+
+    def test_valid_rows_are_created_with_their_categories(self):
+        result = self.import_json([
+            self.row('Free talk'),
+            self.row('Concert', ticket_categories=[
+                {'name': 'General', 'price': '20.00', 'quantity_available': 100},
+                {'name': 'VIP', 'category_type': 'vip', 'price': '80.00', 'quantity_available': 10},
+            ]),
+        ])
+
+        self.assertEqual((result.events_created, result.categories_created, result.errors), (2, 2, []))
+        concert = Event.objects.get(title='Concert')
+        self.assertEqual(concert.organizer, self.organizer)
+        self.assertFalse(concert.is_free)
+        self.assertEqual(
+            list(concert.ticket_categories.values_list('name', 'price')),
+            [('General', Decimal('20.00')), ('VIP', Decimal('80.00'))]
+        )
+
+    def test_csv_ticket_columns_become_categories(self):
+        header = 'title,description,event_type,is_free,venue_name,venue_address,start_date,end_date,max_attendees,ticket_price,contact_email,ticket_1_name,ticket_1_price,ticket_1_quantity_available'
+        line = f"CSV event,Imported,concert,no,Hall,1 Test Street,{self.dates['start_date']},{self.dates['end_date']},50,15,organizer@example.com,General,15,50"
+
+        result = import_events(StringIO(f'{header}\n{line}\n'), 'csv', self.organizer)
+
+        self.assertEqual((result.events_created, result.categories_created, result.errors), (1, 1, []))
+        self.assertEqual(TicketCategory.objects.get().event.title, 'CSV event')
+
+    def test_duplicate_category_names_are_a_row_error(self):
+        general = {'name': 'General', 'price': '20.00', 'quantity_available': 100}
+        result = self.import_json([
+            self.row('Fine'),
+            self.row('Same name', ticket_categories=[general, general]),
+            self.row('Same name, other case', ticket_categories=[general, {**general, 'name': ' general '}]),
+        ])
+
+        self.assertEqual(result.events_created, 1)
+        self.assertEqual([number for number, _ in result.errors], [2, 3])
+        self.assertTrue(all('used twice' in message for _, message in result.errors))
+        self.assertEqual(list(Event.objects.values_list('title', flat=True)), ['Fine'])
+        self.assertFalse(TicketCategory.objects.exists())
+
+    def test_invalid_rows_are_reported_and_dry_run_writes_nothing(self):
+        result = self.import_json([self.row('Valid'), self.row('', contact_email='not-an-email')], dry_run=True)
+
+        self.assertEqual((result.events_created, result.rows_failed), (1, 1))
+        self.assertTrue(all(number == 2 for number, _ in result.errors))
+        self.assertFalse(Event.objects.exists())
+
+
+class EventSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['generations'].clear()
+        self.organizer = User.objects.create(username='organizer')
+        self.buyer = User.objects.create(username='buyer')
+        self.event = make_event(self.organizer)
+        self.category = TicketCategory.objects.create(event=self.event, name='General', price=Decimal('0.00'), quantity_available=5)
+
+    def available(self):
+        return get_event_snapshot(self.event.pk)['categories'][0].tickets_available
+
+    def test_snapshot_is_cached_until_a_write_commits(self):
+        self.assertEqual(self.available(), 5)
+        with self.assertNumQueries(1):  # only the shared generation lookup
+            get_event_snapshot(self.event.pk)
+
+    def test_booking_and_hold_change_the_availability_shown(self):
+        self.assertEqual(self.available(), 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EventBooking.create_with_items(self.event, self.buyer, {self.category: 2})
+        self.assertEqual(self.available(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TicketHold.place(User.objects.create(username='other'), {self.category: 1})
+        self.assertEqual(self.available(), 2)
+
+    def test_stale_snapshot_left_in_a_worker_cache_is_not_served(self):
+        self.assertEqual(self.available(), 5)
+        generation = get_generations([EVENT_GENERATION.format(self.event.pk)])[EVENT_GENERATION.format(self.event.pk)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EventBooking.create_with_items(self.event, self.buyer, {self.category: 5})
+
+        # The old snapshot is still cached, as in a worker that did not handle the write
+        self.assertIsNotNone(cache.get(f'snapshot:event:{self.event.pk}:{generation}'))
+        self.assertEqual(self.available(), 0)
+
+    def test_deactivated_event_has_no_snapshot(self):
+        self.assertIsNotNone(get_event_snapshot(self.event.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.is_active = False
+            self.event.save()
+        self.assertIsNone(get_event_snapshot(self.event.pk))
+
+class AttendeeExportTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        self.event = make_event(self.organizer, is_free=False)
+        self.category = TicketCategory.objects.create(event=self.event, name='General', price=Decimal('0.00'), quantity_available=10)
+        names = ['Ada Lovelace', '=HYPERLINK("http://evil.example","x")', '+1+2', '-3', '@SUM(A1)']
+        for i, name in enumerate(names):
+            booking = EventBooking(attendee_name=name, attendee_email=f'guest{i}@example.com', attendee_phone='+8801700000000')
+            EventBooking.create_with_items(self.event, User.objects.create(username=f'guest{i}'), {self.category: 1}, instance=booking)
+        self.client.force_login(self.organizer)
+        self.url = reverse('events:event_attendees_export', kwargs={'pk': self.event.pk})
+
+    def test_csv_streams_every_booking_with_formulas_neutralized(self):
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        header, records = rows[0], [dict(zip(rows[0], row)) for row in rows[1:]]
+        self.assertEqual(header[:5], ['booking_id', 'booking_date', 'status', 'payment_status', 'attendee_name'])
+        self.assertEqual(len(records), 5)
+        self.assertEqual([record['attendee_name'] for record in records], [
+            'Ada Lovelace', '\'=HYPERLINK("http://evil.example","x")', "'+1+2", "'-3", "'@SUM(A1)",
+        ])
+        self.assertEqual(records[0]['attendee_phone'], "'+8801700000000")
+        self.assertEqual(records[0]['tickets'], 'General x1')
+        self.assertEqual(records[0]['total_amount'], '0.00')
+
+    def test_ndjson_keeps_values_as_entered(self):
+        response = self.client.get(self.url, {'format': 'ndjson'})
+
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[2]['attendee_name'], '+1+2')
+
+    def test_only_the_organizer_can_export(self):
+        self.client.force_login(User.objects.create(username='stranger'))
+
+        response = self.client.get(self.url)
+
+        self.assertRedirects(response, reverse('events:event_detail', kwargs={'pk': self.event.pk}), fetch_redirect_response=False)
+
+
+class EventStatusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['generations'].clear()
+        organizer = User.objects.create(username='organizer')
+        self.today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        day = timedelta(days=1)
+        for title, start, end in [
+            ('Ended last week', -8, -7),
+            ('Ended yesterday', -3, -1),
+            ('Running', -2, 2),
+            ('Later today', 0.9, 0.95),
+            ('Ends today', -1, 0.01),
+            ('Tomorrow', 1, 1.5),
+            ('Next month', 30, 31),
+        ]:
+            make_event(organizer, title=title, start_date=self.today + start * day, end_date=self.today + end * day)
+
+    def titles(self, queryset):
+        return [event.title for event in queryset]
+
+    def test_filter_matches_the_annotated_status(self):
+        annotated = {event.title: event.computed_status for event in Event.objects.with_status()}
+        for status in ['live', 'upcoming', 'completed']:
+            with self.subTest(status=status):
+                expected = {title for title, computed in annotated.items() if computed == status}
+                self.assertEqual(set(self.titles(Event.objects.filter_status(status))), expected)
+        self.assertEqual(annotated['Later today'], 'live')
+        self.assertEqual(annotated['Ended yesterday'], 'completed')
+        self.assertEqual(Event.objects.filter_status('').count(), 7)
+
+    def test_status_order(self):
+        self.assertEqual(self.titles(Event.objects.order_by_status()), [
+            'Running', 'Ends today', 'Later today', 'Tomorrow', 'Next month', 'Ended yesterday', 'Ended last week',
+        ])
+
+    def test_event_list_sorts_and_filters_by_status(self):
+        response = self.client.get(reverse('events:event_list'), {'sort': 'status'})
+        page = list(response.context['page_obj'])
+        self.assertEqual([event.computed_status for event in page], ['live'] * 3 + ['upcoming'] * 2 + ['completed'] * 2)
+
+        response = self.client.get(reverse('events:event_list'), {'status': 'upcoming', 'sort': 'date_asc'})
+        self.assertEqual(self.titles(response.context['page_obj']), ['Tomorrow', 'Next month'])
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    """
+    Parallel buyers of one ticket category must never oversell it.
+    Needs a test database threads can share: a file (DATABASES TEST NAME) on SQLite, or another backend.
+    """
+    tickets = 10
+    buyers = 24
+
+    @classmethod
+    def setUpClass(cls):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise SkipTest('threads cannot share an in-memory SQLite test database')
+        super().setUpClass()
+
+    def test_parallel_bookings_do_not_oversell(self):
+        organizer = User.objects.create(username='organizer')
+        buyers = [User.objects.create(username=f'buyer{i}') for i in range(self.buyers)]
+        event = make_event(organizer, is_free=True)
+        category = TicketCategory.objects.create(
+            event=event, name='General', price=Decimal('0.00'), quantity_available=self.tickets
+        )
+        # Release all buyers at once so their transactions really overlap
+        start = threading.Barrier(self.buyers)
+
+        def book(buyer):
+            try:
+                start.wait(timeout=10)
+                EventBooking.create_with_items(event, buyer, {category: 1})
+                return 'booked'
+            except SoldOut:
+                return 'sold_out'
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.buyers) as pool:
+            outcomes = list(pool.map(book, buyers))
+
+        category.refresh_from_db()
+        self.assertLessEqual(category.sold_count, category.quantity_available)
+        self.assertEqual(outcomes.count('booked'), self.tickets)
+        self.assertEqual(outcomes.count('sold_out'), self.buyers - self.tickets)
+        self.assertEqual(category.sold_count, self.tickets)
+        # The losers' bookings were rolled back along with their failed reservation
+        self.assertEqual(EventBooking.objects.filter(event=event).count(), self.tickets)
+        self.assertEqual(BookingTicketItem.objects.filter(ticket_category=category).count(), self.tickets)
@@ -10,6 +10,7 @@ urlpatterns = [
     
     # Event management (for event managers and admins)
     path('create/', views.event_create, name='event_create'),
+    path('import/', views.event_import, name='event_import'),
     path('<int:pk>/edit/', views.event_edit, name='event_edit'),
     path('<int:pk>/delete/', views.event_delete, name='event_delete'),
     
@@ -17,6 +18,7 @@ urlpatterns = [
     path('<int:pk>/book/', views.event_book, name='event_book'),
     path('my-events/', views.my_events, name='my_events'),
     path('booking/<int:pk>/cancel/', views.cancel_booking, name='cancel_booking'),
+    path('<int:pk>/attendees/export/', views.event_attendees_export, name='event_attendees_export'),
     
     # Event comments
     path('comment/<int:comment_id>/like/', views.comment_like_toggle, name='comment_like_toggle'),
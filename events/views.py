@@ -1,14 +1,19 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import JsonResponse
 from django.db import transaction
 from django.utils import timezone
-from .models import Event, EventBooking, TicketCategory, BookingTicketItem, EventComment, EventCommentLike
+from .models import Event, EventBooking, TicketCategory, EventComment, EventCommentLike, SoldOut, TicketHold, SOLD_BOOKING_STATUSES
 from .forms import EventForm, EventBookingForm, TicketCategoryFormSet, EventCommentForm
 from users.decorators import role_required
+from search import index as search_index
+from core.pagination import paginate, cursor_page_json
+from core.cache import cache_list_page
+from core.db import write_atomic
+from core.comments import load_comment_tree
 from notifications.helpers import create_event_booking_notification, create_event_registration_notification
 
 def home(request):
@@ -18,6 +23,7 @@ def home(request):
         'recent_events': recent_events
     })
 
+@cache_list_page('event_list', ['events'])
 def event_list(request):
     """List all active events with search, filtering, and sorting"""
     from django.utils import timezone
@@ -28,12 +34,7 @@ def event_list(request):
     # Search functionality
     search_query = request.GET.get('q', '')
     if search_query:
-        events = events.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(event_type__icontains=search_query) |
-            Q(venue_name__icontains=search_query)
-        )
+        events = search_index.search(events, search_query)
     
     # Filter by event type
     event_type = request.GET.get('type', '')
@@ -49,40 +50,17 @@ def event_list(request):
     
     # Filter by status
     status_filter = request.GET.get('status', '')
-    if status_filter == 'upcoming':
-        events = events.filter(start_date__gt=today)
-    elif status_filter == 'live':
-        events = events.filter(start_date__lte=today, end_date__gte=today)
-    elif status_filter == 'completed':
-        events = events.filter(end_date__lt=today)
+    events = events.filter_status(status_filter)
     
     # Sorting functionality
-    sort_by = request.GET.get('sort', '-created_at')
+    sort_by = request.GET.get('sort', 'relevance' if search_query else '-created_at')
     
     # Handle status-based sorting
+    ordering = None
     if sort_by == 'status':
-        # Custom sorting: Live first, then Upcoming, then Completed
-        events_list = list(events)
-        live_events = []
-        upcoming_events = []
-        completed_events = []
-        
-        for event in events_list:
-            if event.start_date.date() > today:
-                upcoming_events.append(event)
-            elif event.end_date.date() < today:
-                completed_events.append(event)
-            else:
-                live_events.append(event)
-        
-        # Sort each category by start date
-        live_events.sort(key=lambda x: x.start_date)
-        upcoming_events.sort(key=lambda x: x.start_date)
-        completed_events.sort(key=lambda x: x.start_date, reverse=True)
-        
-        # Combine in order: Live, Upcoming, Completed
-        sorted_events = live_events + upcoming_events + completed_events
-        events = sorted_events
+        # Live first, then Upcoming, then Completed - ordered in SQL so only one page is fetched
+        # (expression ordering, so this sort stays on offset pagination)
+        events = events.order_by_status()
     else:
         sort_options = {
             'date_asc': 'start_date',
@@ -95,25 +73,30 @@ def event_list(request):
             'oldest': 'created_at',
             'popular': '-max_attendees',  # Sort by capacity as popularity indicator
         }
-        
-        if sort_by in sort_options:
-            events = events.order_by(sort_options[sort_by])
-        else:
-            events = events.order_by('-created_at')
-    
-    # Pagination
-    paginator = Paginator(events, 12)  # Show 12 events per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Add status to each event for template
-    for event in page_obj:
-        if event.start_date.date() > today:
-            event.computed_status = 'upcoming'
-        elif event.end_date.date() < today:
-            event.computed_status = 'completed'
-        else:
-            event.computed_status = 'live'
+        if search_query:
+            sort_options['relevance'] = 'search_rank'
+        
+        sort_field = sort_options.get(sort_by, '-created_at')
+        # pk breaks ties so the ordering is unique for cursor pagination
+        ordering = [sort_field, '-pk' if sort_field.startswith('-') else 'pk']
+        events = events.with_status().order_by(*ordering)
+    
+    # Pagination (computed_status is annotated for the template); ?cursor= switches to keyset pages
+    page_obj = paginate(request, events, 12, ordering)
+    
+    if request.GET.get('format') == 'json' and ordering:
+        return cursor_page_json(page_obj, lambda event: {
+            'id': event.pk,
+            'title': event.title,
+            'event_type': event.event_type,
+            'start_date': event.start_date.isoformat(),
+            'end_date': event.end_date.isoformat(),
+            'venue_name': event.venue_name,
+            'is_free': event.is_free,
+            'ticket_price': str(event.ticket_price),
+            'status': event.computed_status,
+            'url': reverse('events:event_detail', args=[event.pk]),
+        })
     
     # Get event type choices for filter dropdown
     event_types = Event.EVENT_TYPE_CHOICES
@@ -121,6 +104,7 @@ def event_list(request):
     # Sort options for dropdown
     sort_choices = [
         ('status', 'Status (Live → Upcoming → Completed)'),
+        ('relevance', 'Best Match'),
         ('newest', 'Newest First'),
         ('oldest', 'Oldest First'),
         ('date_asc', 'Event Date (Earliest)'),
@@ -155,10 +139,16 @@ def event_list(request):
 
 def event_detail(request, pk):
     """Show event details and allow booking"""
+    from django.http import Http404
     from django.utils import timezone
-    from django.db.models import Sum
-    
-    event = get_object_or_404(Event, pk=pk, is_active=True)
+    from .snapshots import get_event_snapshot
+    
+    # Event, ticket categories and recent reviews from the cached read model;
+    # only the per-user bits below are queried live
+    snapshot = get_event_snapshot(pk)
+    if snapshot is None:
+        raise Http404('No Event matches the given query.')
+    event = snapshot['event']
     is_booked = False
     user_booking = None
     
@@ -167,20 +157,13 @@ def event_detail(request, pk):
         is_booked = user_booking is not None
     
     # Calculate total registered people (sum of all ticket quantities)
-    current_bookings = 0
-    if event.ticket_categories.exists():
+    has_categories = snapshot['has_categories']
+    if has_categories:
         # For events with ticket categories, sum all sold tickets
-        total_tickets_sold = BookingTicketItem.objects.filter(
-            booking__event=event,
-            booking__status__in=['confirmed', 'paid']
-        ).aggregate(total=Sum('quantity'))['total'] or 0
-        current_bookings = total_tickets_sold
+        current_bookings = event.sold_tickets_count
     else:
         # For events without categories, count bookings
-        current_bookings = EventBooking.objects.filter(
-            event=event, 
-            status__in=['confirmed', 'paid']
-        ).count()
+        current_bookings = event.sold_bookings_count
     
     # Check if event is full
     is_full = current_bookings >= event.max_attendees
@@ -191,8 +174,7 @@ def event_detail(request, pk):
         registration_closed = timezone.now() > event.registration_deadline
 
     # Get ticket categories for better template handling
-    has_categories = event.ticket_categories.exists()
-    active_categories = event.ticket_categories.filter(is_active=True)
+    active_categories = snapshot['active_categories']
     
     # Handle comment submission
     if request.method == 'POST' and request.user.is_authenticated:
@@ -216,46 +198,23 @@ def event_detail(request, pk):
     else:
         comment_form = EventCommentForm()
     
-    # Get all comments (top-level comments only, replies will be handled in template)
-    comments = EventComment.objects.filter(
-        event=event, 
-        parent=None
-    ).select_related('user', 'user__profile').prefetch_related(        
-        'likes',
-        'replies__user', 
-        'replies__user__profile',
-        'replies__likes',
-        'replies__replies__user',
-        'replies__replies__user__profile',
-        'replies__replies__likes',
-        'replies__replies__replies__user',
-        'replies__replies__replies__user__profile',
-        'replies__replies__replies__likes'
-    ).order_by('created_at')
+    # Whole comment thread in one query, linked into comment.children for the template
+    comments = load_comment_tree(EventComment.objects.filter(event=event), user=request.user)
     
     # Check if user can review this event
     user_can_review = False
     if request.user.is_authenticated and event.can_be_reviewed:
         # Check if user attended this event (has a confirmed booking)
-        user_attended = EventBooking.objects.filter(
-            event=event,
-            user=request.user,
-            status__in=['confirmed', 'paid']
-        ).exists()
+        user_attended = user_booking is not None and user_booking.is_sold
         
         # Check if user hasn't already reviewed this event
         from reviews.models import EventReview
-        already_reviewed = EventReview.objects.filter(
+        already_reviewed = user_attended and EventReview.objects.filter(
             event=event,
             user=request.user
         ).exists()
         
         user_can_review = user_attended and not already_reviewed
-    
-    # Get recent reviews for the event (show top 3)
-    recent_reviews = []
-    if hasattr(event, 'reviews'):
-        recent_reviews = event.reviews.select_related('user').order_by('-created_at')[:3]
 
     return render(request, 'events/event_detail.html', {
         'event': event,
@@ -265,11 +224,12 @@ def event_detail(request, pk):
         'current_bookings': current_bookings,  # Total tickets sold
         'registration_closed': registration_closed,
         'has_categories': has_categories,
+        'categories': snapshot['categories'],
         'active_categories': active_categories,
         'comments': comments,
         'comment_form': comment_form,
         'user_can_review': user_can_review,
-        'recent_reviews': recent_reviews,
+        'recent_reviews': snapshot['recent_reviews'],
     })
 
 
@@ -317,6 +277,36 @@ def event_create(request):
         'title': 'Create New Event'
     })
 
+@login_required
+@role_required(['admin', 'event_manager'])
+def event_import(request):
+    """Bulk-create events with ticket categories from an uploaded CSV/JSON file"""
+    from .forms import EventImportUploadForm
+    from .importer import import_events
+    
+    result = None
+    if request.method == 'POST':
+        form = EventImportUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            file_format = 'json' if upload.name.lower().endswith('.json') else 'csv'
+            dry_run = form.cleaned_data['dry_run']
+            result = import_events(upload, file_format, request.user, dry_run=dry_run)
+            if result.events_created:
+                verb = 'validated' if dry_run else 'imported'
+                messages.success(request, f'{result.events_created} events {verb} successfully!')
+            if result.errors:
+                messages.error(request, f'{result.rows_failed} rows were rejected - see the errors below.')
+    else:
+        form = EventImportUploadForm()
+    
+    return render(request, 'events/event_import.html', {
+        'form': form,
+        'result': result,
+        'errors': result.errors[:200] if result else [],
+    })
+
+
 @login_required
 @role_required(['admin', 'event_manager'])
 def event_edit(request, pk):
@@ -384,96 +374,62 @@ def event_book(request, pk):
     
     # Check if event is full (only for events without ticket categories)
     if not event.ticket_categories.exists():
-        current_attendees = EventBooking.objects.filter(
-            event=event, 
-            status__in=['confirmed', 'paid']
-        ).count()
-        if current_attendees >= event.max_attendees:
+        if event.is_full:
             messages.error(request, 'This event is fully booked.')
             return redirect('events:event_detail', pk=event.pk)
     
     if request.method == 'POST':
         form = EventBookingForm(request.POST, event=event, user=request.user)
         if form.is_valid():
-            with transaction.atomic():
-                # Create the booking
-                booking = form.save(commit=False)
-                booking.event = event
-                booking.user = request.user
-                booking.save()
-                
-                # Handle events with or without ticket categories
-                if event.ticket_categories.exists():
-                    # Get selected tickets and create BookingTicketItem instances
+            try:
+                with write_atomic():
+                    # Create the booking and its ticket items in one go (free bookings are confirmed)
                     selected_tickets = form.get_selected_tickets()
-                    total_amount = 0
-                    total_quantity = 0
+                    booking = EventBooking.create_with_items(
+                        event, request.user, selected_tickets, instance=form.save(commit=False)
+                    )
+                    if booking.status == 'pending':
+                        # Keep the tickets held while the buyer pays
+                        TicketHold.place(request.user, selected_tickets)
                     
-                    for category, quantity in selected_tickets.items():
-                        # Create ticket item
-                        ticket_item = BookingTicketItem.objects.create(
-                            booking=booking,
-                            ticket_category=category,
-                            quantity=quantity,
-                            price_per_ticket=category.price
+                    # Create notification for the user
+                    if event.is_free or booking.amount == 0:
+                        create_event_booking_notification(
+                            user=request.user,
+                            event_name=event.title,
+                            booking_id=booking.id
                         )
-                        total_amount += ticket_item.subtotal
-                        total_quantity += quantity
+                        messages.success(request, 'Event booked successfully!')
+                        return redirect('events:event_detail', pk=event.pk)
+                    else:
+                        create_event_booking_notification(
+                            user=request.user,
+                            event_name=event.title,
+                            booking_id=booking.id
+                        )
+                        messages.info(request, 'Booking created. Please complete payment to confirm.')
+                        return redirect('payments:payment_process', booking_id=booking.id)
                     
-                    # Update booking totals
-                    booking.amount = total_amount
-                    booking.total_amount = total_amount
-                    booking.attendees_count = total_quantity
-                else:
-                    # Event without ticket categories - use default pricing
-                    booking.amount = event.ticket_price
-                    booking.total_amount = event.ticket_price
-                    booking.attendees_count = 1
-                
-                # Set status based on payment
-                if event.is_free or booking.amount == 0:
-                    booking.status = 'confirmed'
-                    booking.payment_status = 'completed'
-                else:
-                    booking.status = 'pending'
-                    booking.payment_status = 'pending'
-                
-                booking.save()
-                
-                # Create notification for the user
-                if event.is_free or booking.amount == 0:
-                    create_event_booking_notification(
-                        user=request.user,
-                        event_name=event.title,
-                        booking_id=booking.id
-                    )
-                    messages.success(request, 'Event booked successfully!')
-                    return redirect('events:event_detail', pk=event.pk)
-                else:
-                    create_event_booking_notification(
-                        user=request.user,
-                        event_name=event.title,
-                        booking_id=booking.id
-                    )
-                    messages.info(request, 'Booking created. Please complete payment to confirm.')
-                    return redirect('payments:payment_process', booking_id=booking.id)
-                
-                # Create notification for event organizer
-                if event.organizer and event.organizer != request.user:
-                    # Count total registrations for this event
-                    total_registrations = EventBooking.objects.filter(event=event).count()
-                    create_event_registration_notification(
-                        event_manager=event.organizer,
-                        event_name=event.title,
-                        user_name=request.user.get_full_name() or request.user.username,
-                        total_registrations=total_registrations
-                    )
-                
-                # Redirect based on payment needs
-                if event.is_free or booking.amount == 0:
-                    return redirect('events:event_detail', pk=event.pk)
-                else:
-                    return redirect('payments:payment_process', booking_id=booking.id)
+                    # Create notification for event organizer
+                    if event.organizer and event.organizer != request.user:
+                        # Count total registrations for this event
+                        total_registrations = EventBooking.objects.filter(event=event).count()
+                        create_event_registration_notification(
+                            event_manager=event.organizer,
+                            event_name=event.title,
+                            user_name=request.user.get_full_name() or request.user.username,
+                            total_registrations=total_registrations
+                        )
+                    
+                    # Redirect based on payment needs
+                    if event.is_free or booking.amount == 0:
+                        return redirect('events:event_detail', pk=event.pk)
+                    else:
+                        return redirect('payments:payment_process', booking_id=booking.id)
+            except SoldOut as exc:
+                # Another buyer took the last tickets after the form was validated
+                messages.error(request, str(exc))
+                return redirect('events:event_detail', pk=event.pk)
         
         # If form is invalid, prepare context for re-rendering the form
         context = {
@@ -511,6 +467,14 @@ def event_book(request, pk):
                 except (ValueError, TypeError):
                     continue
         
+        if selected_quantities:
+            # Give back stale holds on this event, then set this buyer's tickets aside
+            # for the checkout so they are not sold under them while they fill the form
+            TicketHold.objects.expired().filter(ticket_category__event=event).release()
+            quantities = {category: line['quantity'] for category, line in selected_quantities.items()}
+            for category in TicketHold.place(request.user, quantities):
+                messages.warning(request, f'Not enough {category.name} tickets are left to reserve {quantities[category]} for you.')
+        
         # Initialize form with quantity data
         form = EventBookingForm(initial=initial_data, event=event, user=request.user)
         
@@ -530,9 +494,9 @@ def event_book(request, pk):
 @login_required
 def my_events(request):
     """Show user's event bookings and organized events with comprehensive dashboard stats"""
-    from django.db.models import Sum, Count
     from django.utils import timezone
     from venues.models import VenueBooking
+    from .stats import organizer_event_stats, organizer_totals
     
     # User's bookings
     bookings = EventBooking.objects.filter(user=request.user).order_by('-booking_date')
@@ -540,82 +504,42 @@ def my_events(request):
     # User's organized events (if they are event manager or admin)
     organized_events = []
     dashboard_stats = {}
+    detailed_data = {}
     user_role = request.user.profile.role
     
     if user_role in ['admin', 'event_manager']:
-        organized_events = Event.objects.filter(organizer=request.user).order_by('-created_at')
-        
-        # Calculate comprehensive dashboard statistics
+        # One grouped query for every event's bookings, revenue and tickets sold
+        organized_events = list(organizer_event_stats(request.user))
         now = timezone.now()
-        
-        # Total events created by this user
-        total_events_created = organized_events.count()
-        
-        # Event status counts
-        upcoming_events = organized_events.filter(start_date__gt=now).count()
-        live_events = organized_events.filter(start_date__lte=now, end_date__gte=now).count()
-        completed_events = organized_events.filter(end_date__lt=now).count()
-        
-        # Total bookings across all user's events (confirmed when payment is completed)
-        all_user_events = organized_events.all()
-        total_event_bookings = EventBooking.objects.filter(
-            event__in=all_user_events,
-            payment_status='completed'
-        ).count()
-        
-        # Total revenue from event bookings
-        event_revenue = EventBooking.objects.filter(
-            event__in=all_user_events,
-            payment_status='completed'
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
+        totals = organizer_totals(organized_events, now)
         
         # Total venue bookings made by this user (from system venues)
-        total_venue_bookings = VenueBooking.objects.filter(
+        venue_bookings = VenueBooking.objects.filter(
             user=request.user,
             status__in=['confirmed', 'completed']
-        ).count()
-        
-        # Calculate total tickets sold across all events
-        total_tickets_sold = 0
-        for event in all_user_events:
-            if event.ticket_categories.exists():
-                # Events with categories - sum ticket quantities
-                tickets = BookingTicketItem.objects.filter(
-                    booking__event=event,
-                    booking__status__in=['confirmed', 'paid']
-                ).aggregate(total=Sum('quantity'))['total'] or 0
-            else:
-                # Events without categories - sum attendee counts
-                tickets = EventBooking.objects.filter(
-                    event=event,
-                    status__in=['confirmed', 'paid']
-                ).aggregate(total=Sum('attendees_count'))['total'] or 0
-            total_tickets_sold += tickets
+        )
         
         dashboard_stats = {
-            'total_events_created': total_events_created,
-            'total_event_bookings': total_event_bookings,
-            'total_revenue': event_revenue,
-            'total_venue_bookings': total_venue_bookings,
-            'upcoming_events': upcoming_events,
-            'live_events': live_events,
-            'completed_events': completed_events,
-            'total_tickets_sold': total_tickets_sold,
+            'total_events_created': totals['events'],
+            'total_event_bookings': totals['bookings_paid'],
+            'total_revenue': totals['revenue_paid'],
+            'total_venue_bookings': venue_bookings.count(),
+            'upcoming_events': totals['upcoming_events'],
+            'live_events': totals['live_events'],
+            'completed_events': totals['completed_events'],
+            'total_tickets_sold': totals['tickets_sold'],
         }
         
         # Detailed data for modals
         detailed_data = {
-            'upcoming_events_list': organized_events.filter(start_date__gt=now)[:5],
-            'live_events_list': organized_events.filter(start_date__lte=now, end_date__gte=now)[:5],
-            'completed_events_list': organized_events.filter(end_date__lt=now)[:5],
+            'upcoming_events_list': [e for e in organized_events if e.start_date > now][:5],
+            'live_events_list': [e for e in organized_events if e.start_date <= now <= e.end_date][:5],
+            'completed_events_list': [e for e in organized_events if e.end_date < now][:5],
             'recent_bookings': EventBooking.objects.filter(
-                event__in=all_user_events,
-                status__in=['confirmed', 'paid']
-            ).order_by('-booking_date')[:5],
-            'venue_bookings_list': VenueBooking.objects.filter(
-                user=request.user,
-                status__in=['confirmed', 'completed']
-            )[:5] if VenueBooking.objects.filter(user=request.user).exists() else [],
+                event__organizer=request.user,
+                status__in=SOLD_BOOKING_STATUSES
+            ).select_related('event', 'user').order_by('-booking_date')[:5],
+            'venue_bookings_list': venue_bookings.select_related('venue')[:5],
         }
     
     return render(request, 'events/my_events.html', {
@@ -728,6 +652,8 @@ def events_completed_detail(request):
 @login_required
 def event_bookings_detail(request):
     """Detailed view of all event bookings"""
+    from .stats import organizer_event_stats, organizer_totals
+    
     if request.user.profile.role != 'event_manager':
         return redirect('events:event_list')
     
@@ -736,19 +662,17 @@ def event_bookings_detail(request):
         event__organizer=request.user
     ).select_related('event', 'user').order_by('-booking_date')
     
-    # Calculate statistics based on payment status
-    total_bookings = bookings.count()
-    confirmed_bookings = bookings.filter(payment_status='completed')
-    pending_bookings = bookings.filter(payment_status='pending')
-    total_revenue = sum(booking.total_amount for booking in confirmed_bookings)
+    # Statistics based on payment status, from the grouped per-event stats
+    totals = organizer_totals(organizer_event_stats(request.user))
+    total_revenue = totals['revenue_paid']
     
     context = {
         'bookings': bookings,
-        'total_bookings': total_bookings,
-        'confirmed_count': confirmed_bookings.count(),
-        'pending_count': pending_bookings.count(),
+        'total_bookings': totals['bookings_total'],
+        'confirmed_count': totals['bookings_paid'],
+        'pending_count': totals['bookings_pending'],
         'total_revenue': total_revenue,
-        'avg_booking_value': total_revenue / confirmed_bookings.count() if confirmed_bookings.count() > 0 else 0,
+        'avg_booking_value': total_revenue / totals['bookings_paid'] if totals['bookings_paid'] > 0 else 0,
     }
     
     return render(request, 'events/event_bookings_detail.html', context)
@@ -757,23 +681,21 @@ def event_bookings_detail(request):
 @login_required
 def revenue_detail(request):
     """Detailed view of revenue analytics"""
+    from .stats import date_range, revenue_by_event as rollup_by_event
+    
     if request.user.profile.role != 'event_manager':
         return redirect('events:event_list')
     
-    # Get confirmed bookings
-    bookings = EventBooking.objects.filter(
-        event__organizer=request.user,
-        status='confirmed'
-    ).select_related('event')
+    # Per-event totals from the daily revenue rollup, optionally limited to a date range
+    start, end = date_range(request)
+    rollup = [data for data in rollup_by_event(request.user, start, end).values() if data['bookings'] > 0]
     
     # Revenue by event
     revenue_by_event = {}
-    for booking in bookings:
-        event_title = booking.event.title
-        if event_title not in revenue_by_event:
-            revenue_by_event[event_title] = {'amount': 0, 'bookings': 0, 'avg_per_booking': 0}
-        revenue_by_event[event_title]['amount'] += booking.total_amount
-        revenue_by_event[event_title]['bookings'] += 1
+    for event_data in rollup:
+        data = revenue_by_event.setdefault(event_data['title'], {'amount': 0, 'bookings': 0, 'avg_per_booking': 0})
+        data['amount'] += event_data['revenue']
+        data['bookings'] += event_data['bookings']
     
     # Calculate average per booking for each event
     for event_title, data in revenue_by_event.items():
@@ -783,15 +705,26 @@ def revenue_detail(request):
     # Sort by revenue
     revenue_by_event = dict(sorted(revenue_by_event.items(), key=lambda x: x[1]['amount'], reverse=True))
     
-    total_revenue = sum(booking.total_amount for booking in bookings)
-    total_bookings = bookings.count()
+    total_revenue = sum(data['revenue'] for data in rollup)
+    total_bookings = sum(data['bookings'] for data in rollup)
+    
+    recent_payments = EventBooking.objects.filter(
+        event__organizer=request.user,
+        status__in=SOLD_BOOKING_STATUSES
+    ).select_related('event', 'user').order_by('-booking_date')
+    if start:
+        recent_payments = recent_payments.filter(booking_date__date__gte=start)
+    if end:
+        recent_payments = recent_payments.filter(booking_date__date__lte=end)
     
     context = {
         'total_revenue': total_revenue,
         'total_bookings': total_bookings,
         'avg_per_booking': total_revenue / total_bookings if total_bookings > 0 else 0,
         'revenue_by_event': revenue_by_event,
-        'recent_payments': bookings.order_by('-booking_date')[:10],
+        'recent_payments': recent_payments[:10],
+        'start_date': start,
+        'end_date': end,
     }
     
     return render(request, 'events/revenue_detail.html', context)
@@ -836,45 +769,67 @@ def venue_bookings_detail(request):
 @login_required
 def tickets_sold_detail(request):
     """Detailed view of tickets sold analytics"""
+    from .stats import date_range, revenue_by_event
+    
     if request.user.profile.role != 'event_manager':
         return redirect('events:event_list')
     
-    events = Event.objects.filter(organizer=request.user).prefetch_related('bookings')
+    events = list(Event.objects.filter(organizer=request.user).order_by('-created_at'))
+    start, end = date_range(request)
+    rollup = revenue_by_event(request.user, start, end)
     
     tickets_data = []
-    total_tickets = 0
-    total_revenue = 0
-    
     for event in events:
-        confirmed_bookings = event.bookings.filter(status='confirmed')
-        event_tickets = confirmed_bookings.count()
-        event_revenue = sum(booking.total_amount for booking in confirmed_bookings)
-        
+        data = rollup.get(event.pk, {'tickets': 0, 'revenue': 0})
         tickets_data.append({
             'event': event,
-            'tickets_sold': event_tickets,
-            'revenue': event_revenue,
-            'avg_ticket_price': event_revenue / event_tickets if event_tickets > 0 else 0,
+            'tickets_sold': data['tickets'],
+            'revenue': data['revenue'],
+            'avg_ticket_price': data['revenue'] / data['tickets'] if data['tickets'] > 0 else 0,
         })
-        
-        total_tickets += event_tickets
-        total_revenue += event_revenue
     
     # Sort by tickets sold
     tickets_data.sort(key=lambda x: x['tickets_sold'], reverse=True)
     
+    total_tickets = sum(data['tickets_sold'] for data in tickets_data)
+    total_revenue = sum(data['revenue'] for data in tickets_data)
+    
     context = {
         'tickets_data': tickets_data,
         'total_tickets': total_tickets,
         'total_revenue': total_revenue,
         'avg_ticket_price': total_revenue / total_tickets if total_tickets > 0 else 0,
-        'total_events': events.count(),
-        'avg_tickets_per_event': total_tickets / events.count() if events.count() > 0 else 0,
+        'total_events': len(events),
+        'avg_tickets_per_event': total_tickets / len(events) if events else 0,
+        'start_date': start,
+        'end_date': end,
     }
     
     return render(request, 'events/tickets_sold_detail.html', context)
 
 
+@login_required
+def event_attendees_export(request, pk):
+    """Stream every booking of an event as CSV (default) or NDJSON (?format=ndjson) for check-in systems"""
+    from django.http import StreamingHttpResponse
+    from .exports import attendee_bookings, stream_csv, stream_ndjson
+    
+    event = get_object_or_404(Event, pk=pk)
+    if request.user != event.organizer and not request.user.profile.role == 'admin':
+        messages.error(request, 'You can only export attendees of events you created.')
+        return redirect('events:event_detail', pk=event.pk)
+    
+    bookings = attendee_bookings(event, status=request.GET.get('status') or None)
+    if request.GET.get('format') == 'ndjson':
+        response = StreamingHttpResponse(stream_ndjson(bookings), content_type='application/x-ndjson')
+        extension = 'ndjson'
+    else:
+        response = StreamingHttpResponse(stream_csv(bookings), content_type='text/csv')
+        extension = 'csv'
+    response['Content-Disposition'] = f'attachment; filename="event_{event.pk}_attendees.{extension}"'
+    return response
+
+
 @login_required
 def cancel_booking(request, pk):
     """Cancel an event booking"""
@@ -29,6 +29,9 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notif_user_created_idx'),
+        ]
         
     def __str__(self):
         return f"{self.user.username} - {self.title}"
@@ -1,22 +1,35 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db.models import Count, Q
 from django.http import JsonResponse
 from django.contrib import messages
 from django.views.decorators.http import require_POST
+from core.pagination import paginate, cursor_page_json
 from .models import Notification
 
 @login_required
 def notification_list(request):
     """Display user's notifications with pagination"""
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-    total_count = notifications.count()
-    unread_count = notifications.filter(is_read=False).count()
+    notifications = Notification.objects.filter(user=request.user)
+    counts = notifications.aggregate(
+        total=Count('pk'),
+        unread=Count('pk', filter=Q(is_read=False)),
+    )
+    total_count, unread_count = counts['total'], counts['unread']
+    
+    # Keyset pagination (10 per page) so older pages cost the same as the newest;
+    # legacy ?page= links still get offset pages
+    page_obj = paginate(request, notifications, 10, ['-created_at', '-pk'], cursor_default=True)
     
-    # Pagination
-    paginator = Paginator(notifications, 10)  # Show 10 notifications per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if request.GET.get('format') == 'json':
+        return cursor_page_json(page_obj, lambda notification: {
+            'id': notification.pk,
+            'title': notification.title,
+            'message': notification.message,
+            'notification_type': notification.notification_type,
+            'is_read': notification.is_read,
+            'created_at': notification.created_at.isoformat(),
+        })
     
     context = {
         'notifications': page_obj,
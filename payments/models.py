@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
-from events.models import EventBooking
+from core.db import write_atomic
+from events.models import EventBooking, SoldOut
 
 class Payment(models.Model):
     """Payment model for event bookings"""
@@ -54,17 +55,27 @@ class Payment(models.Model):
         return f"Payment #{self.id} - {self.booking.event.title} - ${self.amount}"
         
     def mark_as_paid(self):
-        """Mark payment as completed and update booking status"""
+        """
+        Mark payment as completed and update booking status.
+        Returns False (and fails the payment) if the tickets sold out before it cleared.
+        """
         from django.utils import timezone
         
-        self.payment_status = 'completed'
-        self.paid_at = timezone.now()
-        self.save()
-        
-        # Update booking status
-        self.booking.payment_status = 'completed'
-        self.booking.status = 'confirmed'
-        self.booking.save()
+        try:
+            with write_atomic():
+                self.payment_status = 'completed'
+                self.paid_at = timezone.now()
+                self.save()
+                
+                # Update booking status - reserves the tickets, or raises SoldOut
+                self.booking.payment_status = 'completed'
+                self.booking.status = 'confirmed'
+                self.booking.save()
+        except SoldOut as exc:
+            self.paid_at = None
+            self.booking.refresh_from_db()
+            self.mark_as_failed(f"Sold out before payment cleared, refund required: {exc}")
+            return False
         
         return True
         
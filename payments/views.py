@@ -10,7 +10,7 @@ from django.urls import reverse
 import requests
 import hashlib
 import uuid
-from events.models import EventBooking
+from events.models import EventBooking, SoldOut
 from .models import Payment
 
 @login_required
@@ -27,7 +27,11 @@ def payment_process(request, booking_id):
     if booking.amount == 0:
         booking.payment_status = 'completed'
         booking.status = 'confirmed'
-        booking.save()
+        try:
+            booking.save()
+        except SoldOut as exc:
+            messages.error(request, str(exc))
+            return redirect('events:event_detail', pk=booking.event.pk)
         messages.success(request, 'Registration confirmed for free event!')
         return redirect('events:event_detail', pk=booking.event.pk)
     
@@ -62,7 +66,9 @@ def payment_process(request, booking_id):
             payment.payment_method = payment_method
             payment.transaction_id = f"TXN_{uuid.uuid4().hex[:12].upper()}"
             payment.payment_gateway = "mock_gateway"
-            payment.mark_as_paid()
+            if not payment.mark_as_paid():
+                messages.error(request, 'Sorry, the tickets sold out before your payment cleared. Your payment will be refunded.')
+                return redirect('events:event_detail', pk=booking.event.pk)
             
             messages.success(request, f'Payment successful! Your booking is confirmed. Transaction ID: {payment.transaction_id}')
             return redirect('events:event_detail', pk=booking.event.pk)
@@ -128,7 +134,8 @@ def quick_pay(request, booking_id):
     payment.payment_method = 'cash'
     payment.transaction_id = f"QUICK_{uuid.uuid4().hex[:8].upper()}"
     payment.payment_gateway = "manual"
-    payment.mark_as_paid()
+    if not payment.mark_as_paid():
+        return JsonResponse({'success': False, 'message': 'Tickets sold out before the payment cleared'})
     
     return JsonResponse({
         'success': True, 
@@ -336,7 +343,9 @@ def ssl_success(request):
                     # Update payment status
                     payment.bank_transaction_id = bank_tran_id
                     payment.gateway_response = validation_result
-                    payment.mark_as_paid()
+                    if not payment.mark_as_paid():
+                        messages.error(request, 'Sorry, the tickets sold out before your payment cleared. Your payment will be refunded.')
+                        return redirect('events:event_detail', pk=booking.event.pk)
                     
                     messages.success(request, f'Payment successful! Transaction ID: {bank_tran_id}')
                     return redirect('events:event_detail', pk=booking.event.pk)
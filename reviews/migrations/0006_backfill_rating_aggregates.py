@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+EVENT_RATING_FIELDS = ['rating', 'organization_rating', 'venue_rating', 'value_rating']
+VENUE_RATING_FIELDS = ['rating', 'ambience_rating', 'service_rating', 'cleanliness_rating', 'value_rating']
+
+
+def backfill(apps, schema_editor):
+    targets = [
+        ('EventReview', 'events', 'Event', 'event_id', EVENT_RATING_FIELDS),
+        ('VenueReview', 'venues', 'Venue', 'venue_id', VENUE_RATING_FIELDS),
+    ]
+    for review_name, app_label, parent_name, parent_attname, fields in targets:
+        Review = apps.get_model('reviews', review_name)
+        Parent = apps.get_model(app_label, parent_name)
+        rows = Review.objects.values(parent_attname).annotate(
+            rating_count=Count('pk'),
+            **{f'{field}_sum': Sum(field) for field in fields}
+        )
+        for row in rows:
+            parent_id = row.pop(parent_attname)
+            Parent.objects.filter(pk=parent_id).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_venuereview'),
+        ('events', '0008_rating_aggregates'),
+        ('venues', '0011_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,52 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from events.models import Event
+from venues.models import Venue
+
+def rating_snapshot(review, field_names, values):
+    """Return (parent_id, ratings) as persisted, or None when some of those fields were deferred"""
+    loaded = dict(zip(field_names, values))
+    names = [review.PARENT_FIELD + '_id'] + review.RATING_FIELDS
+    if any(loaded.get(name, models.DEFERRED) is models.DEFERRED for name in names):
+        return None
+    return loaded[names[0]], {field: loaded[field] for field in review.RATING_FIELDS}
+
+
+class RatingAggregateMixin:
+    """Keeps the rating sums/count on the reviewed object (PARENT_FIELD) in sync on save"""
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted_ratings = rating_snapshot(instance, field_names, values)
+        return instance
+    
+    def ratings_dict(self):
+        """Rating values that are aggregated on the reviewed object"""
+        return {field: getattr(self, field) for field in self.RATING_FIELDS}
+    
+    def save(self, *args, **kwargs):
+        self.full_clean()
+        is_new = self._state.adding
+        counted = getattr(self, '_counted_ratings', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            parent = getattr(self, self.PARENT_FIELD)
+            if is_new:
+                parent.update_average_rating(added=self.ratings_dict())
+            elif counted is None:
+                # Previous values unknown - fall back to a full recount
+                parent.update_average_rating()
+            elif counted[0] == parent.pk:
+                parent.update_average_rating(added=self.ratings_dict(), removed=counted[1])
+            else:
+                type(parent)(pk=counted[0]).update_average_rating(removed=counted[1])
+                parent.update_average_rating(added=self.ratings_dict())
+            self._counted_ratings = (parent.pk, self.ratings_dict())
+
 
 class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='service_reviews')
@@ -39,7 +83,7 @@ class Review(models.Model):
         return range(self.rating + 1, 6)
 
 
-class EventReview(models.Model):
+class EventReview(RatingAggregateMixin, models.Model):
     """Model for event reviews - only users who registered for the event can review after it's completed"""
     
     event = models.ForeignKey('events.Event', on_delete=models.CASCADE, related_name='reviews')
@@ -79,6 +123,9 @@ class EventReview(models.Model):
         ordering = ['-created_at']
         unique_together = ['event', 'user']  # One review per user per event
     
+    PARENT_FIELD = 'event'
+    RATING_FIELDS = Event.RATING_FIELDS
+    
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} - {self.event.title} ({self.rating}★)"
     
@@ -108,12 +155,6 @@ class EventReview(models.Model):
         if not booking_exists:
             raise ValidationError("You can only review events you have registered for and attended.")
     
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
-        # Update event's cached rating
-        self.event.update_average_rating()
-    
     @property
     def star_display(self):
         """Returns dict for displaying stars in templates"""
@@ -132,7 +173,7 @@ class EventReview(models.Model):
         }
 
 
-class VenueReview(models.Model):
+class VenueReview(RatingAggregateMixin, models.Model):
     """Model for venue reviews - users can review venues after events they attended at those venues"""
     
     venue = models.ForeignKey('venues.Venue', on_delete=models.CASCADE, related_name='reviews')
@@ -175,6 +216,9 @@ class VenueReview(models.Model):
         ordering = ['-created_at']
         unique_together = ['venue', 'user']  # One review per user per venue
     
+    PARENT_FIELD = 'venue'
+    RATING_FIELDS = Venue.RATING_FIELDS
+    
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} - {self.venue.name} ({self.rating}★)"
     
@@ -198,12 +242,6 @@ class VenueReview(models.Model):
         if not has_booked_venue:
             raise ValidationError("You can only review venues that you have booked and where your booking has been completed.")
     
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
-        # Update venue's cached rating
-        self.venue.update_average_rating()
-    
     @property
     def star_display(self):
         """Returns dict for displaying stars in templates"""
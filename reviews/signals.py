@@ -0,0 +1,23 @@
+"""
+Django signals keeping the persisted Event/Venue rating aggregates in sync on deletes
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from events.models import Event
+from venues.models import Venue
+from .models import EventReview, VenueReview
+
+
+@receiver(post_delete, sender=EventReview)
+def remove_deleted_event_review(sender, instance, **kwargs):
+    """Take a deleted review out of its event's rating aggregate"""
+    event_id, ratings = getattr(instance, '_counted_ratings', None) or (instance.event_id, instance.ratings_dict())
+    Event(pk=event_id).update_average_rating(removed=ratings)
+
+
+@receiver(post_delete, sender=VenueReview)
+def remove_deleted_venue_review(sender, instance, **kwargs):
+    """Take a deleted review out of its venue's rating aggregate"""
+    venue_id, ratings = getattr(instance, '_counted_ratings', None) or (instance.venue_id, instance.ratings_dict())
+    Venue(pk=venue_id).update_average_rating(removed=ratings)
@@ -1,3 +1,110 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+
+from events.models import Event, EventBooking
+from venues.models import Venue, VenueBooking
+
+from .models import EventReview, VenueReview
+
+backfill_migration = import_module('reviews.migrations.0006_backfill_rating_aggregates')
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer')
+        now = timezone.now()
+        self.event = Event.objects.create(
+            title='Past Event', description='An event', organizer=self.organizer,
+            venue_name='Test Hall', venue_address='1 Test Street',
+            start_date=now - timedelta(days=3), end_date=now - timedelta(days=2),
+            contact_email='organizer@example.com',
+        )
+        self.venue = Venue.objects.create(
+            name='Test Venue', description='A venue', manager=self.organizer, address='1 Test Street',
+            city='Dhaka', state='Dhaka', zipcode='1000', country='Bangladesh', capacity=100, price_per_hour=10,
+        )
+
+    def reviewer(self, username):
+        user = User.objects.create(username=username)
+        EventBooking.objects.create(event=self.event, user=user, status='confirmed')
+        # One past day per reviewer, so the completed bookings do not overlap
+        end = timezone.now() - timedelta(days=user.pk)
+        VenueBooking.objects.create(
+            venue=self.venue, user=user, event_title='Party', event_description='A party',
+            start_date=end - timedelta(hours=2), end_date=end,
+            total_amount=10, contact_email='booker@example.com', contact_phone='0123456789', status='completed',
+        )
+        return user
+
+    def review_event(self, user, rating, organization=3, venue=3, value=3):
+        return EventReview.objects.create(
+            event=self.event, user=user, title='Review', rating=rating,
+            organization_rating=organization, venue_rating=venue, value_rating=value,
+        )
+
+    def review_venue(self, user, rating):
+        return VenueReview.objects.create(
+            venue=self.venue, user=user, title='Review', rating=rating,
+            ambience_rating=rating, service_rating=4, cleanliness_rating=5, value_rating=2,
+        )
+
+    def assertEventAverages(self, count, rating, organization):
+        event = Event.objects.get(pk=self.event.pk)
+        self.assertEqual((event.review_count, event.average_rating, event.avg_organization_rating),
+                         (count, rating, organization))
+
+    def test_reviews_update_the_event_aggregate(self):
+        first = self.review_event(self.reviewer('first'), 5, organization=4)
+        self.review_event(self.reviewer('second'), 2, organization=1)
+        self.assertEventAverages(2, 3.5, 2.5)
+
+        first.rating = 3
+        first.save()
+        self.assertEventAverages(2, 2.5, 2.5)
+
+        first.delete()
+        self.assertEventAverages(1, 2, 1)
+
+    def test_deferred_review_save_recounts(self):
+        self.review_event(self.reviewer('first'), 5)
+        review = EventReview.objects.only('pk', 'title').get()
+        EventReview.objects.filter(pk=review.pk).update(rating=1)
+
+        review.title = 'Changed my mind'
+        review.save()
+        self.assertEventAverages(1, 1, 3)
+
+    def test_no_reviews_average_zero(self):
+        self.assertEventAverages(0, 0, 0)
+        self.assertEqual(self.venue.category_averages['cleanliness'], 0)
+
+    def test_venue_aggregate_and_category_averages(self):
+        self.review_venue(self.reviewer('first'), 5)
+        second = self.review_venue(self.reviewer('second'), 3)
+
+        venue = Venue.objects.get(pk=self.venue.pk)
+        self.assertEqual((venue.review_count, venue.average_rating), (2, 4))
+        self.assertEqual(venue.category_averages['ambience'], 4)
+        self.assertEqual(venue.category_averages['cleanliness'], 5)
+
+        second.delete()
+        venue.refresh_from_db()
+        self.assertEqual((venue.review_count, venue.average_rating), (1, 5))
+
+    def test_backfill_migration_restores_the_aggregates(self):
+        self.review_event(self.reviewer('first'), 5, organization=4)
+        self.review_event(self.reviewer('second'), 2, organization=1)
+        self.review_venue(self.reviewer('third'), 4)
+        Event.objects.update(rating_count=0, rating_sum=0, organization_rating_sum=0)
+        Venue.objects.update(rating_count=0, rating_sum=0)
+
+        backfill_migration.backfill(apps, None)
 
-# Create your tests here.
+        self.assertEventAverages(2, 3.5, 2.5)
+        venue = Venue.objects.get(pk=self.venue.pk)
+        self.assertEqual((venue.review_count, venue.average_rating), (1, 4))
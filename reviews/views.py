@@ -151,14 +151,11 @@ def event_reviews(request, event_id):
     event = get_object_or_404(Event, id=event_id)
     reviews = EventReview.objects.filter(event=event).select_related('user', 'user__profile')
     
-    # Calculate average ratings
-    if reviews:
-        average_rating = sum([r.rating for r in reviews]) / len(reviews)
-        avg_organization = sum([r.organization_rating for r in reviews]) / len(reviews)
-        avg_venue = sum([r.venue_rating for r in reviews]) / len(reviews)
-        avg_value = sum([r.value_rating for r in reviews]) / len(reviews)
-    else:
-        average_rating = avg_organization = avg_venue = avg_value = 0
+    # Average ratings come from the event's persisted aggregates
+    average_rating = event.average_rating
+    avg_organization = event.avg_organization_rating
+    avg_venue = event.avg_venue_rating
+    avg_value = event.avg_value_rating
     
     # Check if current user can review this event
     user_can_review_event = False
@@ -256,24 +253,13 @@ def venue_reviews(request, venue_id):
     
     reviews = VenueReview.objects.filter(venue=venue).select_related('user').order_by('-created_at')
     
-    # Calculate average ratings
-    if reviews.exists():
-        from django.db.models import Avg
-        ratings = reviews.aggregate(
-            avg_overall=Avg('rating'),
-            avg_ambience=Avg('ambience_rating'),
-            avg_service=Avg('service_rating'),
-            avg_cleanliness=Avg('cleanliness_rating'),
-            avg_value=Avg('value_rating'),
-        )
-        average_rating = ratings['avg_overall'] or 0
-        avg_ambience = ratings['avg_ambience'] or 0
-        avg_service = ratings['avg_service'] or 0
-        avg_cleanliness = ratings['avg_cleanliness'] or 0
-        avg_value = ratings['avg_value'] or 0
-    else:
-        average_rating = 0
-        avg_ambience = avg_service = avg_cleanliness = avg_value = 0
+    # Average ratings come from the venue's persisted aggregates
+    average_rating = venue.average_rating
+    category_averages = venue.category_averages
+    avg_ambience = category_averages['ambience']
+    avg_service = category_averages['service']
+    avg_cleanliness = category_averages['cleanliness']
+    avg_value = category_averages['value']
     
     # Check if current user can review this venue
     user_can_review_venue = False
@@ -0,0 +1,157 @@
+"""
+Full-text search over events and venues backed by SQLite FTS5 virtual tables.
+
+Each indexed model gets its own FTS5 table whose rowid is the model's primary key,
+so matches can be joined back to the model table without an intermediate id list.
+On databases without FTS5 the helpers fall back to the original icontains filters.
+
+Matching is by word, not substring. The list pages used to filter on
+field__icontains=<whole query>; FTS5 instead requires every word of the query
+to start a word of the row (prefix AND). So "conf hall" now finds "Conference
+Hall" and words may appear in any order or field, but text inside a word no
+longer matches: "fest" does not find "Oktoberfest".
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# model label -> (FTS5 table, indexed fields, bm25 column weights)
+SEARCH_INDEXES = {
+    'events.Event': ('search_event_fts', ['title', 'description', 'event_type', 'venue_name'], [10.0, 1.0, 2.0, 4.0]),
+    'venues.Venue': ('search_venue_fts', ['name', 'description', 'venue_type', 'address', 'city'], [10.0, 1.0, 2.0, 2.0, 4.0]),
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _index_for(model):
+    return SEARCH_INDEXES.get(model._meta.label)
+
+
+def is_available():
+    """FTS5 tables are only created on SQLite"""
+    return connection.vendor == 'sqlite'
+
+
+def create_table_sql(table, fields):
+    columns = ', '.join(fields)
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        f"{columns}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+
+
+def build_match_query(text):
+    """
+    Turn free user input into a safe FTS5 MATCH expression.
+    Every word must match (implicit AND) and is treated as a prefix, so "conf hall"
+    finds "Conference Hall". Returns '' when the input has no searchable words.
+    """
+    tokens = TOKEN_RE.findall(text.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _row_values(instance, fields):
+    return [str(getattr(instance, field) or '') for field in fields]
+
+
+def index_instance(instance):
+    """Insert or refresh a single object in its FTS table"""
+    spec = _index_for(type(instance))
+    if not spec or not is_available():
+        return
+    table, fields, _ = spec
+    placeholders = ', '.join(['%s'] * (len(fields) + 1))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+        cursor.execute(
+            f"INSERT INTO {table} (rowid, {', '.join(fields)}) VALUES ({placeholders})",
+            [instance.pk] + _row_values(instance, fields)
+        )
+
+
+def index_instances(instances):
+    """Add freshly bulk-created objects of one model to its FTS table with a single executemany"""
+    instances = list(instances)
+    if not instances or not is_available():
+        return
+    spec = _index_for(type(instances[0]))
+    if not spec:
+        return
+    table, fields, _ = spec
+    placeholders = ', '.join(['%s'] * (len(fields) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} (rowid, {', '.join(fields)}) VALUES ({placeholders})",
+            [[instance.pk] + _row_values(instance, fields) for instance in instances]
+        )
+
+
+def remove_instance(model, pk):
+    """Drop a single object from its FTS table"""
+    spec = _index_for(model)
+    if not spec or not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {spec[0]} WHERE rowid = %s", [pk])
+
+
+def rebuild(model, batch_size=1000):
+    """Rebuild the FTS table of a model from scratch; returns the number of rows indexed"""
+    table, fields, _ = _index_for(model)
+    placeholders = ', '.join(['%s'] * (len(fields) + 1))
+    insert_sql = f"INSERT INTO {table} (rowid, {', '.join(fields)}) VALUES ({placeholders})"
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(create_table_sql(table, fields))
+        cursor.execute(f"DELETE FROM {table}")
+        batch = []
+        for row in model.objects.order_by().values_list('pk', *fields).iterator(chunk_size=batch_size):
+            batch.append([row[0]] + [str(value or '') for value in row[1:]])
+            if len(batch) >= batch_size:
+                cursor.executemany(insert_sql, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+            total += len(batch)
+        # Merge the b-tree segments written by the bulk load
+        cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+    return total
+
+
+def search(queryset, text):
+    """
+    Restrict a queryset of an indexed model to objects matching `text`, annotated
+    with `search_rank` (lower is better, as with FTS5 bm25) for relevance ordering.
+    Words match as prefixes of indexed words (see the module docstring), not as substrings.
+    """
+    model = queryset.model
+    table, fields, weights = _index_for(model)
+    
+    if not is_available():
+        # Fallback for databases without FTS5
+        return queryset.filter(
+            reduce(or_, [Q(**{f'{field}__icontains': text}) for field in fields])
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    
+    pk_column = f'{model._meta.db_table}.{model._meta.pk.column}'
+    weight_args = ', '.join(str(weight) for weight in weights)
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])
+    ).annotate(
+        search_rank=RawSQL(
+            f"SELECT bm25({table}, {weight_args}) FROM {table} "
+            f"WHERE {table} MATCH %s AND rowid = {pk_column}",
+            [match],
+            output_field=FloatField()
+        )
+    )
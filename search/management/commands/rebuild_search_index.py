@@ -0,0 +1,26 @@
+"""
+Management command to rebuild the full-text search index
+Usage: python manage.py rebuild_search_index [--model events.Event]
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from search.index import SEARCH_INDEXES, is_available, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FTS5 search tables for events and venues'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', choices=list(SEARCH_INDEXES),
+                            help='Only rebuild the index of this model (can be repeated)')
+
+    def handle(self, *args, **options):
+        if not is_available():
+            raise CommandError('Full-text search requires SQLite with FTS5.')
+
+        for label in options['models'] or SEARCH_INDEXES:
+            with transaction.atomic():
+                total = rebuild(apps.get_model(label))
+            self.stdout.write(self.style.SUCCESS(f'✅ Indexed {total} {label} rows'))
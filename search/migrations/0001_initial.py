@@ -0,0 +1,30 @@
+from django.db import migrations
+
+from search.index import SEARCH_INDEXES, create_table_sql, rebuild
+
+
+def create_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for label, (table, fields, _) in SEARCH_INDEXES.items():
+        schema_editor.execute(create_table_sql(table, fields))
+        rebuild(apps.get_model(label))
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, _, _ in SEARCH_INDEXES.values():
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_rating_aggregates'),
+        ('venues', '0011_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,26 @@
+"""
+Django signals keeping the FTS5 search tables in sync with Event and Venue
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from events.models import Event
+from venues.models import Venue
+from .index import SEARCH_INDEXES, index_instance, remove_instance
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Venue)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    """Re-index an event/venue when one of its searchable fields may have changed"""
+    indexed_fields = SEARCH_INDEXES[sender._meta.label][1]
+    if update_fields is not None and not set(update_fields) & set(indexed_fields):
+        return
+    index_instance(instance)
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Venue)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Drop a deleted event/venue from the search index"""
+    remove_instance(sender, instance.pk)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import Event
+from venues.models import Venue
+
+from .index import SEARCH_INDEXES, build_match_query, is_available, search
+
+
+def make_event(organizer, **fields):
+    now = timezone.now()
+    defaults = {
+        'title': 'Test Event',
+        'description': 'An event',
+        'organizer': organizer,
+        'venue_name': 'Test Hall',
+        'venue_address': '1 Test Street',
+        'start_date': now + timedelta(days=30),
+        'end_date': now + timedelta(days=31),
+        'contact_email': 'organizer@example.com',
+    }
+    defaults.update(fields)
+    return Event.objects.create(**defaults)
+
+
+def found(text, queryset=None):
+    queryset = Event.objects.all() if queryset is None else queryset
+    return set(search(queryset, text).values_list('title', flat=True))
+
+
+class MatchQueryTests(TestCase):
+    def test_words_become_quoted_prefixes(self):
+        self.assertEqual(build_match_query('Conf  HALL'), '"conf"* "hall"*')
+        # FTS5 operators and quotes in user input are not passed through
+        self.assertEqual(build_match_query('a" OR title:b*'), '"a"* "or"* "title"* "b"*')
+        self.assertEqual(build_match_query(' -- '), '')
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        if not is_available():
+            self.skipTest('full-text search needs SQLite FTS5')
+        self.organizer = User.objects.create(username='organizer')
+
+    def test_saved_events_are_indexed(self):
+        make_event(self.organizer, title='Annual Conference Hall Meetup')
+        make_event(self.organizer, title='Oktoberfest', description='Beer and music')
+
+        self.assertEqual(found('conf hall'), {'Annual Conference Hall Meetup'})
+        self.assertEqual(found('HALL annual'), {'Annual Conference Hall Meetup'})
+        self.assertEqual(found('beer'), {'Oktoberfest'})
+        self.assertEqual(found('conference beer'), set())
+
+    def test_words_match_as_prefixes_not_substrings(self):
+        make_event(self.organizer, title='Oktoberfest')
+
+        self.assertEqual(found('oktober'), {'Oktoberfest'})
+        self.assertEqual(found('fest'), set())
+
+    def test_updates_replace_the_indexed_text(self):
+        event = make_event(self.organizer, title='Jazz Night')
+        event.title = 'Blues Night'
+        event.save()
+
+        self.assertEqual(found('blues'), {'Blues Night'})
+        self.assertEqual(found('jazz'), set())
+
+        event.title = 'Soul Night'
+        event.save(update_fields=['title'])
+        self.assertEqual(found('soul'), {'Soul Night'})
+
+    def test_deleted_events_leave_the_index(self):
+        event = make_event(self.organizer, title='Jazz Night')
+        pk = event.pk
+        event.delete()
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM search_event_fts WHERE rowid = %s', [pk])
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(found('jazz'), set())
+
+    def test_title_matches_rank_first(self):
+        make_event(self.organizer, title='Food Market', description='Street food and jazz')
+        make_event(self.organizer, title='Jazz Night', description='Live music')
+
+        ranked = search(Event.objects.all(), 'jazz').order_by('search_rank')
+        self.assertEqual([event.title for event in ranked], ['Jazz Night', 'Food Market'])
+
+    def test_rebuild_command_restores_the_index(self):
+        make_event(self.organizer, title='Jazz Night')
+        make_event(self.organizer, title='Blues Night')
+        Venue.objects.create(
+            name='Night Club', description='A venue', manager=self.organizer, address='1 Test Street',
+            city='Dhaka', state='Dhaka', zipcode='1000', country='Bangladesh', capacity=100, price_per_hour=10,
+        )
+        with connection.cursor() as cursor:
+            for table, _, _ in SEARCH_INDEXES.values():
+                cursor.execute(f'DELETE FROM {table}')
+        self.assertEqual(found('night'), set())
+
+        out = StringIO()
+        call_command('rebuild_search_index', '--model', 'events.Event', stdout=out)
+
+        self.assertIn('Indexed 2 events.Event rows', out.getvalue())
+        self.assertNotIn('venues.Venue', out.getvalue())
+        self.assertEqual(found('night'), {'Jazz Night', 'Blues Night'})
+        # Only the requested model was rebuilt
+        self.assertEqual(search(Venue.objects.all(), 'night').count(), 0)
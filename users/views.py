@@ -872,6 +872,7 @@ def admin_comments_management(request):
     from events.models import EventComment
     from venues.models import VenueComment
     from django.db.models import Q
+    from core.pagination import CursorPaginator, cursor_page_json
     
     # Get search query if provided
     search_query = request.GET.get('search', '')
@@ -899,51 +900,48 @@ def admin_comments_management(request):
             Q(user__last_name__icontains=search_query)
         )
     
-    # Combine comments with type indicators
-    all_comments = []
-    
+    # Page through both comment tables by (created_at, id) - only one page of each is read
+    sources = []
     if comment_type in ['all', 'event']:
-        for comment in event_comments.order_by('-created_at'):
-            all_comments.append({
-                'id': comment.id,
-                'type': 'event',
-                'content_name': comment.event.title,
-                'content_id': comment.event.id,
-                'user': comment.user,
-                'comment': comment.comment,
-                'created_at': comment.created_at,
-                'has_image': bool(comment.image),
-                'image': comment.image,
-                'image_url': comment.image.url if comment.image else None,
-                'is_reply': comment.parent is not None,
-                'parent_id': comment.parent.id if comment.parent else None,
-            })
-    
+        sources.append(event_comments)
     if comment_type in ['all', 'venue']:
-        for comment in venue_comments.order_by('-created_at'):
-            all_comments.append({
-                'id': comment.id,
-                'type': 'venue',
-                'content_name': comment.venue.name,
-                'content_id': comment.venue.id,
-                'user': comment.user,
-                'comment': comment.comment,
-                'created_at': comment.created_at,
-                'has_image': bool(comment.image),
-                'image': comment.image,
-                'image_url': comment.image.url if comment.image else None,
-                'is_reply': comment.parent is not None,
-                'parent_id': comment.parent.id if comment.parent else None,
-            })
-    
-    # Sort all comments by creation date
-    all_comments.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(all_comments, 20)  # Show 20 comments per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        sources.append(venue_comments)
+    paginator = CursorPaginator(sources, 20, ['-created_at', '-pk'])  # Show 20 comments per page
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    
+    def comment_row(comment):
+        is_event = isinstance(comment, EventComment)
+        content = comment.event if is_event else comment.venue
+        return {
+            'id': comment.id,
+            'type': 'event' if is_event else 'venue',
+            'content_name': content.title if is_event else content.name,
+            'content_id': content.id,
+            'user': comment.user,
+            'comment': comment.comment,
+            'created_at': comment.created_at,
+            'has_image': bool(comment.image),
+            'image': comment.image,
+            'image_url': comment.image.url if comment.image else None,
+            'is_reply': comment.parent_id is not None,
+            'parent_id': comment.parent_id,
+        }
+    
+    page_obj.object_list = [comment_row(comment) for comment in page_obj.object_list]
+    
+    if request.GET.get('format') == 'json':
+        return cursor_page_json(page_obj, lambda row: {
+            'id': row['id'],
+            'type': row['type'],
+            'content_name': row['content_name'],
+            'content_id': row['content_id'],
+            'user': row['user'].username,
+            'comment': row['comment'],
+            'created_at': row['created_at'].isoformat(),
+            'image_url': row['image_url'],
+            'is_reply': row['is_reply'],
+            'parent_id': row['parent_id'],
+        })
     
     # Statistics
     total_event_comments = EventComment.objects.count()
@@ -0,0 +1,54 @@
+"""
+In-memory venue availability for bulk calendar queries.
+
+Single bookings are checked in SQL (VenueBooking.conflicts, repeated under a lock
+when a booking is confirmed). Pages asking many questions about the same venues -
+which venues are free for a slot, which days of a month are busy - load the
+blocking bookings of the window once and answer from VenueCalendar objects.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import accumulate
+
+from .models import VenueBooking, BLOCKING_BOOKING_STATUSES
+
+
+class VenueCalendar:
+    """
+    Static interval index over one venue's bookings: the intervals sorted by start
+    plus a running maximum of their ends, so an overlap query binary-searches both
+    bounds and only scans intervals that can intersect it (O(log n + k)).
+    """
+    
+    def __init__(self, intervals=()):
+        # (start, end, booking id) tuples
+        self.intervals = sorted(intervals)
+        self.starts = [start for start, _, _ in self.intervals]
+        self.max_ends = list(accumulate((end for _, end, _ in self.intervals), max))
+    
+    def __len__(self):
+        return len(self.intervals)
+    
+    def _candidates(self, start, end):
+        stop = bisect_left(self.starts, end)  # intervals starting before end
+        first = bisect_right(self.max_ends, start, 0, stop)  # everything before first ends by start
+        return (interval for interval in self.intervals[first:stop] if interval[1] > start)
+    
+    def overlapping(self, start, end):
+        """(start, end, booking id) of the bookings intersecting [start, end)"""
+        return list(self._candidates(start, end))
+    
+    def is_free(self, start, end):
+        return next(self._candidates(start, end), None) is None
+
+
+def venue_calendars(venue_ids, start, end, statuses=BLOCKING_BOOKING_STATUSES):
+    """{venue id: VenueCalendar} of the bookings overlapping [start, end), loaded with one query"""
+    venue_ids = list(venue_ids)
+    intervals = defaultdict(list)
+    bookings = VenueBooking.objects.filter(
+        venue_id__in=venue_ids, status__in=statuses
+    ).overlapping(start, end).values_list('venue_id', 'start_date', 'end_date', 'pk')
+    for venue_id, booking_start, booking_end, pk in bookings:
+        intervals[venue_id].append((booking_start, booking_end, pk))
+    return {venue_id: VenueCalendar(intervals[venue_id]) for venue_id in venue_ids}
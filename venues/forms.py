@@ -1,7 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from .models import Venue, VenueBooking, VenueImage
+from datetime import time
+from .models import Venue, VenueBooking, VenueImage, AMENITIES
 
 class MultipleFileInput(forms.ClearableFileInput):
     allow_multiple_selected = True
@@ -32,7 +33,7 @@ class VenueForm(forms.ModelForm):
         model = Venue
         fields = [
             'name', 'description', 'venue_type', 'address', 'city', 'state', 
-            'zipcode', 'capacity', 'price_per_hour', 'price_per_day',
+            'zipcode', 'latitude', 'longitude', 'capacity', 'price_per_hour', 'price_per_day',
             'has_parking', 'has_wifi', 'has_catering', 'has_av_equipment',
             'has_air_conditioning', 'has_accessibility',
             'contact_email', 'contact_phone', 'website', 'main_image', 'is_available'
@@ -67,6 +68,16 @@ class VenueForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'ZIP Code'
             }),
+            'latitude': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'step': 'any',
+                'placeholder': 'e.g. 40.7128'
+            }),
+            'longitude': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'step': 'any',
+                'placeholder': 'e.g. -74.0060'
+            }),
             'country': forms.TextInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'Country'
@@ -143,6 +154,16 @@ class VenueForm(forms.ModelForm):
         if not price_per_hour and not price_per_day:
             raise ValidationError("Please provide either hourly rate or daily rate (or both).")
         
+        latitude = cleaned_data.get('latitude')
+        longitude = cleaned_data.get('longitude')
+        if (latitude is None) != (longitude is None):
+            raise ValidationError("Please provide both latitude and longitude, or leave both empty.")
+        
+        # A moved venue with untouched coordinates is geocoded again from its new address on save
+        address_changed = {'address', 'city', 'state', 'zipcode'} & set(self.changed_data)
+        if self.instance.pk and address_changed and not {'latitude', 'longitude'} & set(self.changed_data):
+            cleaned_data['latitude'] = cleaned_data['longitude'] = None
+        
         return cleaned_data
     
     def clean_images(self):
@@ -222,19 +243,13 @@ class VenueBookingForm(forms.ModelForm):
             if start_date >= end_date:
                 raise ValidationError("End date must be after start date.")
         
-        # Check for conflicting bookings
+        # Check for conflicting bookings (indexed overlap query; confirmation re-checks under a lock)
         if start_date and end_date and self.venue:
-            conflicting_bookings = VenueBooking.objects.filter(
-                venue=self.venue,
-                status__in=['confirmed', 'completed']
-            ).exclude(pk=self.instance.pk if self.instance else None)
-            
-            for booking in conflicting_bookings:
-                # Check for time overlap
-                if (start_date < booking.end_date and end_date > booking.start_date):
-                    raise ValidationError(
-                        f"This time slot conflicts with an existing booking."
-                    )
+            conflicts = VenueBooking.objects.filter(venue=self.venue).blocking().overlapping(start_date, end_date)
+            if self.instance.pk:
+                conflicts = conflicts.exclude(pk=self.instance.pk)
+            if conflicts.exists():
+                raise ValidationError("This time slot conflicts with an existing booking.")
         
         return cleaned_data
 
@@ -277,18 +292,7 @@ class VenueSearchForm(forms.Form):
     )
     
     amenities = forms.MultipleChoiceField(
-        choices=[
-            ('WiFi', 'WiFi'),
-            ('Parking', 'Parking'),
-            ('Air Conditioning', 'Air Conditioning'),
-            ('Sound System', 'Sound System'),
-            ('Projector', 'Projector'),
-            ('Catering', 'Catering'),
-            ('Kitchen', 'Kitchen'),
-            ('Bar', 'Bar'),
-            ('Stage', 'Stage'),
-            ('Dance Floor', 'Dance Floor'),
-        ],
+        choices=[(key, label) for _, key, label in AMENITIES],
         required=False,
         widget=forms.CheckboxSelectMultiple(attrs={
             'class': 'form-check-input'
@@ -296,6 +300,137 @@ class VenueSearchForm(forms.Form):
     )
 
 
+# datetime-local values, with or without seconds, and the same with a space
+WINDOW_INPUT_FORMATS = ['%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M']
+
+
+class VenueAvailabilityForm(forms.Form):
+    """Time window (plus optional filters) for the available-venues search"""
+    
+    SORT_CHOICES = [
+        ('price_asc', 'Price (Low to High)'),
+        ('price_desc', 'Price (High to Low)'),
+        ('capacity_asc', 'Capacity (Small to Large)'),
+        ('capacity_desc', 'Capacity (Large to Small)'),
+    ]
+    
+    start = forms.DateTimeField(input_formats=WINDOW_INPUT_FORMATS)
+    end = forms.DateTimeField(input_formats=WINDOW_INPUT_FORMATS)
+    min_capacity = forms.IntegerField(required=False, min_value=1)
+    type = forms.ChoiceField(choices=[('', 'All Types')] + Venue.VENUE_TYPE_CHOICES, required=False)
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('start')
+        end = cleaned_data.get('end')
+        if start and end and start >= end:
+            raise ValidationError("End date must be after start date.")
+        return cleaned_data
+
+
+class WindowListField(forms.Field):
+    """Repeated 'start/end' values (e.g. ?window=2026-11-01T10:00/2026-11-01T14:00) as (start, end) pairs"""
+    
+    widget = forms.MultipleHiddenInput
+    
+    def __init__(self, *, max_windows, **kwargs):
+        self.max_windows = max_windows
+        super().__init__(**kwargs)
+    
+    def to_python(self, value):
+        bound = forms.DateTimeField(input_formats=WINDOW_INPUT_FORMATS)
+        windows = []
+        for item in value or []:
+            start, separator, end = item.partition('/')
+            if not separator:
+                raise ValidationError(f'"{item}" is not a start/end window.')
+            start, end = bound.clean(start), bound.clean(end)
+            if start >= end:
+                raise ValidationError(f'"{item}" ends before it starts.')
+            windows.append((start, end))
+        if len(windows) > self.max_windows:
+            raise ValidationError(f'At most {self.max_windows} windows can be quoted at once.')
+        return windows
+
+
+class VenueQuoteForm(forms.Form):
+    """Venues and candidate time windows to price against each other"""
+    
+    MAX_VENUES = 50
+    MAX_WINDOWS = 100
+    
+    venue = forms.ModelMultipleChoiceField(queryset=Venue.objects.filter(is_available=True))
+    window = WindowListField(max_windows=MAX_WINDOWS)
+    
+    def clean_venue(self):
+        venues = self.cleaned_data['venue']
+        if len(venues) > self.MAX_VENUES:
+            raise ValidationError(f'At most {self.MAX_VENUES} venues can be quoted at once.')
+        return venues
+
+
+class VenuePriceCalendarForm(forms.Form):
+    """Month (YYYY-MM) and optional daily time slot of a venue's price calendar"""
+    
+    month = forms.DateField(input_formats=['%Y-%m'])
+    start_time = forms.TimeField(required=False)
+    end_time = forms.TimeField(required=False)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+        # Without an end time the slot runs to midnight
+        if end_time is not None and end_time <= (start_time or time(0)):
+            raise ValidationError("End time must be after start time.")
+        return cleaned_data
+
+
+class VenueNearbyForm(forms.Form):
+    """A point and radius (km), or a bounding box, for the venues-near-me search"""
+    
+    DEFAULT_RADIUS_KM = 25
+    MAX_RADIUS_KM = 500
+    RADIUS_CHOICES = [5, 10, 25, 50, 100]
+    
+    lat = forms.FloatField(required=False, min_value=-90, max_value=90)
+    lng = forms.FloatField(required=False, min_value=-180, max_value=180)
+    radius = forms.FloatField(required=False, min_value=0.1, max_value=MAX_RADIUS_KM)
+    min_lat = forms.FloatField(required=False, min_value=-90, max_value=90)
+    min_lng = forms.FloatField(required=False, min_value=-180, max_value=180)
+    max_lat = forms.FloatField(required=False, min_value=-90, max_value=90)
+    max_lng = forms.FloatField(required=False, min_value=-180, max_value=180)
+    
+    BBOX_FIELDS = ['min_lat', 'min_lng', 'max_lat', 'max_lng']
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        bbox = [cleaned_data.get(name) for name in self.BBOX_FIELDS]
+        if all(value is not None for value in bbox):
+            if bbox[0] > bbox[2]:
+                raise ValidationError("min_lat must not be greater than max_lat.")
+            cleaned_data['bbox'] = bbox
+        elif any(value is not None for value in bbox):
+            raise ValidationError("A bounding box needs min_lat, min_lng, max_lat and max_lng.")
+        elif cleaned_data.get('lat') is None or cleaned_data.get('lng') is None:
+            raise ValidationError("Please provide lat and lng, or a bounding box.")
+        else:
+            cleaned_data['bbox'] = None
+        if cleaned_data.get('radius') is None:
+            cleaned_data['radius'] = self.DEFAULT_RADIUS_KM
+        return cleaned_data
+    
+    def filter(self, venues):
+        """venues narrowed to the requested area, annotated with distance (km); call when valid"""
+        data = self.cleaned_data
+        if data['bbox']:
+            return venues.within_bbox(*data['bbox'])
+        return venues.near(data['lat'], data['lng'], data['radius'])
+
+
 class VenueCommentForm(forms.Form):
     """Form for submitting comments and replies on venue pages"""
     comment = forms.CharField(
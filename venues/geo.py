@@ -0,0 +1,149 @@
+"""
+Proximity search for venues without a spatial database.
+
+Venues store latitude/longitude plus their geohash. A geohash names a lat/lng
+cell and every prefix names the enclosing cell, so "venues in this cell" is a
+plain range scan on the indexed geohash column. A radius or bounding-box query
+is answered by covering the box with a handful of cells at a suitable
+precision (indexed prefix scans), then filtering the candidates exactly with
+the haversine distance, which is also what results are sorted by.
+
+Coordinates come from the venue form or, without network access, from the
+offline GeocodeEntry table (see the import_geocodes/geocode_venues commands).
+"""
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Sorts after every geohash character, so prefix + RANGE_END bounds a prefix scan
+RANGE_END = '{'
+GEOHASH_PRECISION = 9  # ~5 m cells
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+# Most cells used to cover a search box; fewer, larger cells beyond that
+MAX_COVER_CELLS = 24
+
+# Country names venues are entered with -> ISO code used by the geocoding table
+COUNTRY_ALIASES = {
+    'usa': 'us', 'united states': 'us', 'united states of america': 'us', 'america': 'us',
+    'uk': 'gb', 'united kingdom': 'gb', 'great britain': 'gb', 'england': 'gb',
+    'bangladesh': 'bd', 'india': 'in', 'canada': 'ca', 'australia': 'au',
+    'germany': 'de', 'france': 'fr',
+}
+
+
+def normalize_place(value):
+    return ' '.join(str(value or '').split()).lower()
+
+
+def normalize_country(value):
+    value = normalize_place(value)
+    return COUNTRY_ALIASES.get(value, value)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, use_lng = [], 0, 0, True
+    while len(chars) < precision:
+        span, value = (lng_range, longitude) if use_lng else (lat_range, latitude)
+        middle = (span[0] + span[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            span[0] = middle
+        else:
+            span[1] = middle
+        use_lng = not use_lng
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def radius_box(latitude, longitude, radius_km):
+    """(min_lat, min_lng, max_lat, max_lng) enclosing the circle; longitudes may pass +/-180"""
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    dlng = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+    return (max(-90.0, latitude - dlat), longitude - dlng, min(90.0, latitude + dlat), longitude + dlng)
+
+
+def _split_antimeridian(box):
+    min_lat, min_lng, max_lat, max_lng = box
+    if max_lng - min_lng >= 360:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    if min_lng < -180:
+        return [(min_lat, min_lng + 360, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+    if max_lng > 180:
+        return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng - 360)]
+    return [box]
+
+
+def _cells(box, precision):
+    height, width = cell_size(precision)
+    min_lat, min_lng, max_lat, max_lng = box
+    cells = set()
+    row = math.floor((min_lat + 90) / height)
+    while row * height - 90 <= max_lat and row * height < 180:
+        column = math.floor((min_lng + 180) / width)
+        while column * width - 180 <= max_lng and column * width < 360:
+            cells.add(encode_geohash(row * height - 90 + height / 2, column * width - 180 + width / 2, precision))
+            column += 1
+        row += 1
+    return cells
+
+
+def cover_cells(box):
+    """The geohash prefixes of the smallest cells covering box with at most MAX_COVER_CELLS cells"""
+    boxes = _split_antimeridian(box)
+    cells = {''}
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(precision)
+        # Estimate first so tiny cells are never enumerated for a huge box
+        estimate = sum(
+            ((b[2] - b[0]) / height + 2) * ((b[3] - b[1]) / width + 2) for b in boxes
+        )
+        if estimate > MAX_COVER_CELLS * 4:
+            break
+        candidate = set().union(*(_cells(b, precision) for b in boxes))
+        if len(candidate) > MAX_COVER_CELLS:
+            break
+        cells = candidate
+    return sorted(cells)
+
+
+def cells_q(cells):
+    """Q matching venues whose geohash starts with any of the cells, as index range scans"""
+    if cells == ['']:
+        return Q(geohash__gt='')
+    query = Q(pk__in=[])
+    for cell in cells:
+        query |= Q(geohash__gte=cell, geohash__lt=cell + RANGE_END)
+    return query
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_expression(latitude, longitude):
+    """Haversine distance in km from (latitude, longitude) to each row, as a database expression"""
+    lat1 = math.radians(latitude)
+    a = (
+        Power(Sin((Radians(F('latitude')) - Value(lat1)) / 2), 2)
+        + Value(math.cos(lat1)) * Cos(Radians(F('latitude')))
+        * Power(Sin((Radians(F('longitude')) - Value(math.radians(longitude))) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)), output_field=FloatField())
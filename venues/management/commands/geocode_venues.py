@@ -0,0 +1,29 @@
+"""
+Management command to fill in venue coordinates from the offline geocoding table
+Usage: python manage.py geocode_venues [--all]
+"""
+from django.core.management.base import BaseCommand
+
+from venues.models import Venue
+
+
+class Command(BaseCommand):
+    help = 'Look up coordinates (and geohash) of venues without them in the geocoding table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-geocode venues that already have coordinates')
+
+    def handle(self, *args, **options):
+        venues = Venue.objects.all() if options['all'] else Venue.objects.filter(latitude__isnull=True)
+        located = missing = 0
+        for venue in venues.iterator():
+            if options['all']:
+                venue.latitude = venue.longitude = None
+            # save() geocodes venues without coordinates
+            venue.save(update_fields=['latitude', 'longitude'])
+            if venue.latitude is None:
+                missing += 1
+            else:
+                located += 1
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Located {located} venues ({missing} not found in the geocoding table)'))
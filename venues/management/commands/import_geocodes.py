@@ -0,0 +1,70 @@
+"""
+Management command to load the offline geocoding table used for venue coordinates
+Usage: python manage.py import_geocodes places.csv [--geonames] [--clear] [--batch-size 5000]
+
+CSV files have a header row with country,state,city,zipcode,latitude,longitude
+(state, city or zipcode may be empty). With --geonames the file is a GeoNames
+postal code dump (e.g. US.txt from download.geonames.org/export/zip/).
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from venues.geo import normalize_country, normalize_place
+from venues.models import GeocodeEntry
+
+
+def _csv_rows(fileobj):
+    for row in csv.DictReader(fileobj):
+        yield row.get('country'), row.get('state'), row.get('city'), row.get('zipcode'), row['latitude'], row['longitude']
+
+
+def _geonames_rows(fileobj):
+    # country code, postal code, place name, admin name1 (state), ..., latitude, longitude, accuracy
+    for row in csv.reader(fileobj, delimiter='\t'):
+        yield row[0], row[3], row[2], row[1], row[9], row[10]
+
+
+class Command(BaseCommand):
+    help = 'Import postal code / city coordinates for offline venue geocoding'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (or GeoNames TSV) file to import')
+        parser.add_argument('--geonames', action='store_true', help='The file is a GeoNames postal code dump')
+        parser.add_argument('--clear', action='store_true', help='Delete existing entries first')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Entries per bulk insert')
+
+    def handle(self, *args, **options):
+        reader = _geonames_rows if options['geonames'] else _csv_rows
+        created = skipped = 0
+        batch = []
+        with open(options['path'], newline='', encoding='utf-8') as fileobj, transaction.atomic():
+            if options['clear']:
+                GeocodeEntry.objects.all().delete()
+            try:
+                for country, state, city, zipcode, latitude, longitude in reader(fileobj):
+                    try:
+                        latitude, longitude = float(latitude), float(longitude)
+                    except (TypeError, ValueError):
+                        skipped += 1
+                        continue
+                    if not country or not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+                        skipped += 1
+                        continue
+                    # bulk_create skips GeocodeEntry.save(), so normalize here
+                    batch.append(GeocodeEntry(
+                        country=normalize_country(country), state=normalize_place(state),
+                        city=normalize_place(city), zipcode=normalize_place(zipcode),
+                        latitude=latitude, longitude=longitude,
+                    ))
+                    if len(batch) >= options['batch_size']:
+                        GeocodeEntry.objects.bulk_create(batch)
+                        created += len(batch)
+                        batch = []
+            except (KeyError, IndexError) as exc:
+                raise CommandError(f'Unexpected file layout: missing column {exc}')
+            GeocodeEntry.objects.bulk_create(batch)
+            created += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Imported {created} geocode entries ({skipped} rows skipped)'))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0010_add_comment_likes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='ambience_rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='cleanliness_rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='service_rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='value_rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_booking_date(apps, schema_editor):
+    VenueBooking = apps.get_model('venues', 'VenueBooking')
+    VenueBooking.objects.update(updated_at=models.F('booking_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0011_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venuebooking',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_booking_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0012_venuebooking_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='venuebooking',
+            index=models.Index(fields=['venue', 'status', 'end_date', 'start_date'], name='venuebooking_overlap_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+AMENITY_FIELDS = ['has_parking', 'has_wifi', 'has_catering', 'has_av_equipment', 'has_air_conditioning', 'has_accessibility']
+
+
+def fill_amenity_mask(apps, schema_editor):
+    Venue = apps.get_model('venues', 'Venue')
+    for position, field in enumerate(AMENITY_FIELDS):
+        Venue.objects.filter(**{field: True}).update(amenity_mask=models.F('amenity_mask') + (1 << position))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0013_venuebooking_overlap_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='amenity_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(fields=['amenity_mask', 'is_available'], name='venue_amenities_idx'),
+        ),
+        migrations.RunPython(fill_amenity_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:49
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Cast
+
+
+def fill_rating_avg(apps, schema_editor):
+    Venue = apps.get_model('venues', 'Venue')
+    Venue.objects.filter(rating_count__gt=0).update(
+        rating_avg=Cast('rating_sum', models.FloatField()) / models.F('rating_count')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0014_venue_amenity_mask'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-rating_avg', '-rating_count', '-id'], name='venue_available_rating_idx'),
+        ),
+        migrations.RunPython(fill_rating_avg, migrations.RunPython.noop),
+    ]
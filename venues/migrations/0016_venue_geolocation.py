@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:54
+
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0015_venue_rating_avg'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(max_length=100)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('zipcode', models.CharField(blank=True, max_length=20)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(fields=['geohash'], name='venue_geohash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='geocodeentry',
+            index=models.Index(fields=['country', 'zipcode'], name='geocode_zipcode_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='geocodeentry',
+            index=models.Index(fields=['country', 'city', 'state'], name='geocode_city_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_venue_manager(apps, schema_editor):
+    Venue = apps.get_model('venues', 'Venue')
+    VenueBooking = apps.get_model('venues', 'VenueBooking')
+    VenueBooking.objects.update(venue_manager_id=models.Subquery(
+        Venue.objects.filter(pk=models.OuterRef('venue_id')).values('manager_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0016_venue_geolocation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venuebooking',
+            name='venue_manager',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(fill_venue_manager, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='venuebooking',
+            index=models.Index(fields=['venue_manager', 'status', '-booking_date', '-id'], name='venuebooking_mgr_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venuebooking',
+            index=models.Index(fields=['venue_manager', '-booking_date', '-id'], name='venuebooking_mgr_date_idx'),
+        ),
+    ]
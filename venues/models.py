@@ -1,6 +1,157 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Case, Exists, F, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import Cast
 from django.contrib.auth.models import User
 from django.urls import reverse
+from core.cache import get_generations
+from core.db import write_atomic
+from events.models import update_rating_aggregate
+from .geo import (
+    cells_q, cover_cells, distance_expression, encode_geohash, normalize_country, normalize_place, radius_box,
+)
+
+# Booking statuses that occupy the venue for their time slot
+BLOCKING_BOOKING_STATUSES = ['confirmed', 'completed']
+
+
+# Amenity flags as (boolean field, filter key, label); the position is the bit in Venue.amenity_mask
+AMENITIES = [
+    ('has_parking', 'parking', 'Parking'),
+    ('has_wifi', 'wifi', 'WiFi'),
+    ('has_catering', 'catering', 'Catering'),
+    ('has_av_equipment', 'av_equipment', 'A/V Equipment'),
+    ('has_air_conditioning', 'air_conditioning', 'Air Conditioning'),
+    ('has_accessibility', 'accessibility', 'Accessibility'),
+]
+AMENITY_BITS = {field: 1 << position for position, (field, _, _) in enumerate(AMENITIES)}
+# Filter keys and labels (as used by the old filter links) -> bit
+AMENITY_LOOKUP = {
+    name.lower(): 1 << position
+    for position, (_, key, label) in enumerate(AMENITIES) for name in (key, label)
+}
+ALL_AMENITIES_MASK = (1 << len(AMENITIES)) - 1
+# amenities_list for every possible mask, computed once
+AMENITY_LISTS = [
+    tuple(label for position, (_, _, label) in enumerate(AMENITIES) if mask & (1 << position))
+    for mask in range(ALL_AMENITIES_MASK + 1)
+]
+
+
+def amenity_mask(names):
+    """Bitmask of amenity filter keys/labels; unknown names are ignored"""
+    mask = 0
+    for name in names:
+        mask |= AMENITY_LOOKUP.get(str(name).strip().lower(), 0)
+    return mask
+
+
+# rating_avg as computed from the stored sums
+RATING_AVG = Case(
+    When(rating_count=0, then=Value(0.0)),
+    default=Cast('rating_sum', models.FloatField()) / F('rating_count'),
+    output_field=models.FloatField(),
+)
+
+
+def rating_prior():
+    """
+    (mean, weight) of the Bayesian venue score: the mean rating over all venue reviews
+    and settings.VENUE_RATING_PRIOR_WEIGHT. Cached until a venue or review changes.
+    """
+    generation = get_generations(['venues'])['venues']
+    key = f'venues:rating_prior:{generation}'
+    mean = cache.get(key)
+    if mean is None:
+        totals = Venue.objects.aggregate(ratings=Sum('rating_sum'), reviews=Sum('rating_count'))
+        mean = totals['ratings'] / totals['reviews'] if totals['reviews'] else 0.0
+        cache.set(key, mean, 3600)
+    return mean, getattr(settings, 'VENUE_RATING_PRIOR_WEIGHT', 5)
+
+
+class VenueUnavailable(Exception):
+    """Raised when a booking would occupy a time slot the venue is already booked for"""
+
+
+class VenueQuerySet(models.QuerySet):
+    def with_amenities(self, mask):
+        """
+        Venues having every amenity in mask. A B-tree index cannot answer a bitwise AND,
+        but with six amenities a mask has at most 64 supersets, so the predicate is an
+        IN list the amenity_mask index resolves directly.
+        """
+        if not mask:
+            return self
+        return self.filter(amenity_mask__in=[
+            candidate for candidate in range(ALL_AMENITIES_MASK + 1) if candidate & mask == mask
+        ])
+    
+    def with_rating_score(self):
+        """
+        Annotate rating_score, the Bayesian average (C*m + rating_sum) / (C + rating_count)
+        with m, C from rating_prior(), so two 5-star reviews do not outrank hundreds of 4.8s
+        """
+        mean, weight = rating_prior()
+        return self.annotate(rating_score=models.ExpressionWrapper(
+            (Value(float(weight * mean)) + F('rating_sum')) / (Value(float(weight)) + F('rating_count')),
+            output_field=models.FloatField(),
+        ))
+    
+    def near(self, latitude, longitude, radius_km):
+        """
+        Venues within radius_km of the point, annotated with their distance (km).
+        The geohash cells covering the circle's bounding box are range scans on the
+        geohash index; only those candidates get the exact haversine test.
+        """
+        box = radius_box(latitude, longitude, radius_km)
+        return self.filter(cells_q(cover_cells(box)), latitude__range=(box[0], box[2])).annotate(
+            distance=distance_expression(latitude, longitude)
+        ).filter(distance__lte=radius_km)
+    
+    def within_bbox(self, min_lat, min_lng, max_lat, max_lng):
+        """
+        Venues inside the box, annotated with their distance (km) from its centre.
+        min_lng > max_lng means the box crosses the antimeridian.
+        """
+        if min_lng > max_lng:
+            max_lng += 360
+        longitude = Q(longitude__range=(min_lng, max_lng))
+        if max_lng > 180:
+            longitude = Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360)
+        centre_lng = (min_lng + max_lng) / 2
+        centre_lng = centre_lng - 360 if centre_lng > 180 else centre_lng
+        return self.filter(
+            cells_q(cover_cells((min_lat, min_lng, max_lat, max_lng))), longitude,
+            latitude__range=(min_lat, max_lat),
+        ).annotate(distance=distance_expression((min_lat + max_lat) / 2, centre_lng))
+    
+    def available_between(self, start, end):
+        """Venues without a blocking booking overlapping [start, end), as one NOT EXISTS anti-join"""
+        busy = VenueBooking.objects.filter(venue=OuterRef('pk')).blocking().overlapping(start, end)
+        return self.filter(~Exists(busy))
+    
+    def with_window_price(self, start, end):
+        """
+        Annotate window_price_sort, the unrounded cost of booking [start, end) with the
+        rule of venues.pricing, to order and cursor-paginate by. The database computes it
+        in floating point on SQLite, so the price shown comes from pricing.set_window_prices.
+        """
+        from .pricing import SECONDS_PER_HOUR, window_days, window_seconds
+        seconds = window_seconds(start, end)
+        hours = seconds / SECONDS_PER_HOUR
+        days = window_days(seconds)
+        return self.annotate(window_price_sort=Case(
+            When(price_per_hour__gt=0, then=F('price_per_hour') * Value(hours)),
+            When(price_per_day__isnull=False, then=F('price_per_day') * Value(Decimal(days))),
+            default=Value(Decimal('0.00')),
+            output_field=models.FloatField(),
+        ))
+
 
 class Venue(models.Model):
     VENUE_TYPE_CHOICES = [
@@ -29,6 +180,11 @@ class Venue(models.Model):
     zipcode = models.CharField(max_length=10)
     country = models.CharField(max_length=100, default='USA')
     
+    # Coordinates (entered, or looked up in GeocodeEntry by save()) and their geohash for proximity search
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False)
+    
     capacity = models.PositiveIntegerField()
     price_per_hour = models.DecimalField(max_digits=10, decimal_places=2)
     price_per_day = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -41,6 +197,9 @@ class Venue(models.Model):
     has_air_conditioning = models.BooleanField(default=False)
     has_accessibility = models.BooleanField(default=False)
     
+    # The amenity booleans above as one integer (bits in AMENITIES order), kept in sync by save()
+    amenity_mask = models.PositiveSmallIntegerField(default=0, editable=False)
+    
     # Contact Information
     contact_email = models.EmailField()
     contact_phone = models.CharField(max_length=15)
@@ -61,63 +220,145 @@ class Venue(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Persisted review aggregates, maintained by VenueReview writes
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    ambience_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    service_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    cleanliness_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    value_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    # rating_sum / rating_count, stored so venue lists can sort by rating with an index
+    rating_avg = models.FloatField(default=0, editable=False)
+    
+    # Rating dimensions of VenueReview that are aggregated above
+    RATING_FIELDS = ['rating', 'ambience_rating', 'service_rating', 'cleanliness_rating', 'value_rating']
+    # Fields whose change means the coordinates (and geohash) must be recomputed
+    LOCATION_FIELDS = {'address', 'city', 'state', 'zipcode', 'country', 'latitude', 'longitude'}
+    
+    objects = VenueQuerySet.as_manager()
+    
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Serves venue_list's sort=rating: walked in order for the listed (available) venues
+            models.Index(
+                fields=['-rating_avg', '-rating_count', '-id'], condition=Q(is_available=True),
+                name='venue_available_rating_idx'
+            ),
+            models.Index(fields=['amenity_mask', 'is_available'], name='venue_amenities_idx'),
+            # Serves near()/within_bbox(): each covering cell is a range scan on the geohash prefix
+            # (not a partial index - SQLite only ORs the scans together on a plain one)
+            models.Index(fields=['geohash'], name='venue_geohash_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        self.amenity_mask = sum(bit for field, bit in AMENITY_BITS.items() if getattr(self, field))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and AMENITY_BITS.keys() & set(update_fields):
+            kwargs['update_fields'] = update_fields = set(update_fields) | {'amenity_mask'}
+        if update_fields is None or self.LOCATION_FIELDS & set(update_fields):
+            if self.latitude is None or self.longitude is None:
+                self.latitude, self.longitude = GeocodeEntry.lookup(
+                    self.country, self.state, self.city, self.zipcode
+                ) or (None, None)
+            self.geohash = '' if self.latitude is None else encode_geohash(self.latitude, self.longitude)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'latitude', 'longitude', 'geohash'}
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding and (update_fields is None or 'manager' in update_fields):
+            # Keep the manager copied onto the bookings in step (a no-op unless the manager changed)
+            self.bookings.exclude(venue_manager_id=self.manager_id).update(venue_manager_id=self.manager_id)
+    
     def get_absolute_url(self):
         return reverse('venues:venue_detail', kwargs={'pk': self.pk})
     
     @property
     def amenities_list(self):
-        amenities = []
-        if self.has_parking:
-            amenities.append('Parking')
-        if self.has_wifi:
-            amenities.append('WiFi')
-        if self.has_catering:
-            amenities.append('Catering')
-        if self.has_av_equipment:
-            amenities.append('A/V Equipment')
-        if self.has_air_conditioning:
-            amenities.append('Air Conditioning')
-        if self.has_accessibility:
-            amenities.append('Accessibility')
-        return amenities
+        return list(AMENITY_LISTS[self.amenity_mask])
+    
+    def _rating_average(self, field):
+        if not self.rating_count:
+            return 0
+        return getattr(self, f'{field}_sum') / self.rating_count
     
     @property
     def average_rating(self):
         """Return the average rating for this venue"""
-        reviews = self.reviews.all()
-        if reviews.exists():
-            return reviews.aggregate(models.Avg('rating'))['rating__avg'] or 0
-        return 0
+        return self._rating_average('rating')
     
     @property
     def review_count(self):
         """Return the total number of reviews for this venue"""
-        return self.reviews.count()
+        return self.rating_count
     
     @property
     def category_averages(self):
         """Return average ratings for each category"""
-        reviews = self.reviews.all()
-        if reviews.exists():
-            return {
-                'ambience': reviews.aggregate(models.Avg('ambience_rating'))['ambience_rating__avg'] or 0,
-                'service': reviews.aggregate(models.Avg('service_rating'))['service_rating__avg'] or 0,
-                'cleanliness': reviews.aggregate(models.Avg('cleanliness_rating'))['cleanliness_rating__avg'] or 0,
-                'value': reviews.aggregate(models.Avg('value_rating'))['value_rating__avg'] or 0,
-            }
-        return {'ambience': 0, 'service': 0, 'cleanliness': 0, 'value': 0}
-    
-    def update_average_rating(self):
-        """Update cached rating fields if needed (currently using properties)"""
-        # This method exists for consistency with Event model
-        # Currently using properties for real-time calculation
-        pass
+        return {
+            'ambience': self._rating_average('ambience_rating'),
+            'service': self._rating_average('service_rating'),
+            'cleanliness': self._rating_average('cleanliness_rating'),
+            'value': self._rating_average('value_rating'),
+        }
+    
+    def update_average_rating(self, added=None, removed=None):
+        """
+        Update the persisted rating sums and count.
+        With added/removed ({field: value} dicts of a single review) the aggregate is
+        adjusted incrementally; without arguments it is recomputed from all reviews.
+        """
+        update_rating_aggregate(self, self.reviews, added=added, removed=removed)
+        # A second UPDATE, since the first one's expressions only see the old sums
+        Venue.objects.filter(pk=self.pk).update(rating_avg=RATING_AVG)
+        if self._state.db:
+            self.refresh_from_db(fields=['rating_avg'])
+
+class GeocodeEntry(models.Model):
+    """
+    Offline geocoding table: coordinates of a postal code or a city, loaded with the
+    import_geocodes command. Place names are stored normalized (see venues.geo).
+    """
+    country = models.CharField(max_length=100)
+    state = models.CharField(max_length=100, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    zipcode = models.CharField(max_length=20, blank=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['country', 'zipcode'], name='geocode_zipcode_idx'),
+            models.Index(fields=['country', 'city', 'state'], name='geocode_city_idx'),
+        ]
+    
+    def __str__(self):
+        return ', '.join(part for part in [self.zipcode, self.city, self.state, self.country] if part)
+    
+    def save(self, *args, **kwargs):
+        self.country = normalize_country(self.country)
+        self.state, self.city, self.zipcode = map(normalize_place, (self.state, self.city, self.zipcode))
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def lookup(cls, country, state, city, zipcode):
+        """(latitude, longitude) by postal code, else by city and state, else by city alone; or None"""
+        country = normalize_country(country)
+        state, city, zipcode = map(normalize_place, (state, city, zipcode))
+        attempts = []
+        if zipcode:
+            attempts.append({'zipcode': zipcode})
+        if city:
+            attempts += [{'city': city, 'state': state}, {'city': city}]
+        for attempt in attempts:
+            coordinates = cls.objects.filter(country=country, **attempt).values_list('latitude', 'longitude').first()
+            if coordinates:
+                return coordinates
+        return None
+
 
 class VenueImage(models.Model):
     """Model for storing multiple images for each venue"""
@@ -133,6 +374,19 @@ class VenueImage(models.Model):
     def __str__(self):
         return f"{self.venue.name} - Image {self.id}"
 
+class VenueBookingQuerySet(models.QuerySet):
+    def blocking(self):
+        return self.filter(status__in=BLOCKING_BOOKING_STATUSES)
+    
+    def overlapping(self, start, end):
+        """Bookings whose [start_date, end_date) intersects [start, end)"""
+        return self.filter(start_date__lt=end, end_date__gt=start)
+    
+    def managed_by(self, user):
+        """Bookings of the venues user manages (by the copied venue_manager, so the dashboard indexes apply)"""
+        return self.filter(venue_manager=user)
+
+
 class VenueBooking(models.Model):
     BOOKING_STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -157,6 +411,7 @@ class VenueBooking(models.Model):
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     booking_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     status = models.CharField(max_length=20, choices=BOOKING_STATUS_CHOICES, default='pending')
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -167,12 +422,76 @@ class VenueBooking(models.Model):
     
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='pending')
     
+    # The venue's manager, copied here by save() (and by Venue.save() when it changes)
+    # so a manager's bookings can be filtered and paged by index without a join
+    venue_manager = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+', null=True, editable=False, db_index=False
+    )
+    
+    objects = VenueBookingQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-booking_date']
+        indexes = [
+            # Serves the overlap check: equality on venue/status, then a range on end_date. New requests
+            # are for future slots, so end_date > start skips the venue's whole booking history.
+            models.Index(fields=['venue', 'status', 'end_date', 'start_date'], name='venuebooking_overlap_idx'),
+            # Serve the manager dashboard tabs: a manager's bookings (with a status, or all) newest first,
+            # walked in index order by the keyset pages and used by the grouped stats query
+            models.Index(fields=['venue_manager', 'status', '-booking_date', '-id'], name='venuebooking_mgr_status_idx'),
+            models.Index(fields=['venue_manager', '-booking_date', '-id'], name='venuebooking_mgr_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.venue.name} - {self.event_title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted slot so save() only re-checks availability when it changes
+        loaded = dict(zip(field_names, values))
+        if models.DEFERRED not in (loaded.get('status'), loaded.get('start_date'), loaded.get('end_date')):
+            instance._checked_slot = (loaded.get('status'), loaded.get('start_date'), loaded.get('end_date'))
+        instance._loaded_venue_id = loaded.get('venue_id')
+        return instance
+    
+    @property
+    def is_blocking(self):
+        return self.status in BLOCKING_BOOKING_STATUSES
+    
+    def conflicts(self):
+        """Other bookings occupying any part of this booking's time slot"""
+        return VenueBooking.objects.filter(venue_id=self.venue_id).blocking().overlapping(
+            self.start_date, self.end_date
+        ).exclude(pk=self.pk)
+    
+    def clean(self):
+        # Lets model forms (e.g. the admin) report a conflict instead of failing in save()
+        if self.is_blocking and self.venue_id and self.start_date and self.end_date and self.conflicts().exists():
+            raise ValidationError('This time slot conflicts with an existing booking.')
+    
+    def save(self, *args, **kwargs):
+        """
+        Save the booking; confirming it (or moving a confirmed booking) re-checks the
+        slot with the venue row locked, so two overlapping requests cannot both be
+        confirmed. Raises VenueUnavailable, rolling back the save, on a conflict.
+        """
+        if self.venue_manager_id is None or self.venue_id != getattr(self, '_loaded_venue_id', None):
+            self.venue_manager_id = self.venue.manager_id
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'venue_manager'}
+        slot = (self.status, self.start_date, self.end_date)
+        if self.is_blocking and getattr(self, '_checked_slot', None) != slot:
+            with write_atomic():
+                # Serializes confirmations per venue (on SQLite, write_atomic takes the database write lock)
+                list(Venue.objects.select_for_update().filter(pk=self.venue_id).values_list('pk', flat=True))
+                if self.conflicts().exists():
+                    raise VenueUnavailable('This time slot conflicts with an existing booking.')
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._checked_slot = slot
+    
     def get_payment_status_display(self):
         return dict(self.PAYMENT_STATUS_CHOICES).get(self.payment_status, self.payment_status)
 
@@ -203,6 +522,9 @@ class VenueComment(models.Model):
     @property
     def like_count(self):
         """Return the number of likes for this comment"""
+        if hasattr(self, 'num_likes'):
+            # Annotated by core.comments.load_comment_tree
+            return self.num_likes
         return self.likes.count()
     
     def is_liked_by_user(self, user):
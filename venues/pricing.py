@@ -0,0 +1,126 @@
+"""
+Venue price quotes.
+
+The booking rule (venue_book): a venue with an hourly rate costs that rate times
+the exact length of the booking; otherwise its daily rate times the number of
+whole days, at least one. Amounts are Decimal throughout and rounded to cents
+once, at the end.
+
+quote() prices many candidate windows for many venues in one call: the durations
+are worked out once per window and reused for every venue, and availability comes
+from the venues' calendars loaded with a single query (venues.availability).
+price_calendar() builds on it for a month view with one window per day.
+"""
+import calendar as month_calendar
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .availability import venue_calendars
+
+CENT = Decimal('0.01')
+SECONDS_PER_HOUR = Decimal(3600)
+SECONDS_PER_DAY = 86400
+
+
+def window_seconds(start, end):
+    """Exact length of [start, end) in seconds, as a Decimal"""
+    duration = end - start
+    return Decimal(duration.days * SECONDS_PER_DAY + duration.seconds) + Decimal(duration.microseconds) / 10 ** 6
+
+
+def window_days(seconds):
+    """Whole days charged at the daily rate: at least one"""
+    return max(1, int(seconds // SECONDS_PER_DAY))
+
+
+def price(price_per_hour, price_per_day, seconds, days):
+    if price_per_hour:
+        return (price_per_hour * seconds / SECONDS_PER_HOUR).quantize(CENT)
+    if price_per_day:
+        return (price_per_day * days).quantize(CENT)
+    return Decimal('0.00')
+
+
+def window_price(venue, start, end):
+    """What booking venue for [start, end) costs"""
+    seconds = window_seconds(start, end)
+    return price(venue.price_per_hour, venue.price_per_day, seconds, window_days(seconds))
+
+
+def set_window_prices(venues, start, end):
+    """
+    Set window_price, what booking [start, end) costs, on each venue of a list page.
+    Lists sort by the SQL annotation of VenueQuerySet.with_window_price; the price
+    itself is worked out here so it matches quotes and bookings to the cent.
+    """
+    seconds = window_seconds(start, end)
+    days = window_days(seconds)
+    for venue in venues:
+        venue.window_price = price(venue.price_per_hour, venue.price_per_day, seconds, days)
+    return venues
+
+
+def quote(venues, windows, calendars=None):
+    """
+    Price every (start, end) window for every venue and tell whether it can be booked:
+    the venue is listed, the window has not started and no confirmed booking overlaps it.
+    Returns {venue id: [{'start', 'end', 'price', 'available'}, ...]} in window order.
+    calendars ({venue id: VenueCalendar} covering the windows) is loaded when not given.
+    """
+    venues = list(venues)
+    windows = [(start, end, window_seconds(start, end)) for start, end in windows]
+    if calendars is None and windows:
+        calendars = venue_calendars(
+            [venue.pk for venue in venues], min(start for start, _, _ in windows), max(end for _, end, _ in windows)
+        )
+    now = timezone.now()
+    quotes = {}
+    for venue in venues:
+        calendar = calendars[venue.pk] if windows else None
+        quotes[venue.pk] = [{
+            'start': start,
+            'end': end,
+            'price': price(venue.price_per_hour, venue.price_per_day, seconds, window_days(seconds)),
+            'available': venue.is_available and start > now and calendar.is_free(start, end),
+        } for start, end, seconds in windows]
+    return quotes
+
+
+def _busy_seconds(calendar, start, end):
+    """Seconds of [start, end) covered by the calendar's bookings (overlaps counted once)"""
+    busy, covered_until = 0, start
+    for booking_start, booking_end, _ in calendar.overlapping(start, end):
+        booking_start, booking_end = max(booking_start, covered_until), min(booking_end, end)
+        if booking_end > booking_start:
+            busy += (booking_end - booking_start).total_seconds()
+            covered_until = booking_end
+    return busy
+
+
+def price_calendar(venue, year, month, start_time=None, end_time=None):
+    """
+    One entry per day of the month: the price and availability of booking the venue
+    that day (the whole day, or start_time-end_time in the current time zone) and the
+    share of that window already booked, for a price/availability heatmap.
+    """
+    zone = timezone.get_current_timezone()
+    start_time = start_time or time(0)
+    days = range(1, month_calendar.monthrange(year, month)[1] + 1)
+    windows = []
+    for day in days:
+        day = date(year, month, day)
+        start = timezone.make_aware(datetime.combine(day, start_time), zone)
+        if end_time:
+            end = timezone.make_aware(datetime.combine(day, end_time), zone)
+        else:
+            end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time(0)), zone)
+        windows.append((start, end))
+    calendars = venue_calendars([venue.pk], windows[0][0], windows[-1][1])
+    entries = quote([venue], windows, calendars)[venue.pk]
+    for day, entry in zip(days, entries):
+        length = (entry['end'] - entry['start']).total_seconds()
+        entry['date'] = date(year, month, day)
+        entry['booked_share'] = round(_busy_seconds(calendars[venue.pk], entry['start'], entry['end']) / length, 4)
+    return entries
@@ -0,0 +1,60 @@
+"""
+Booking statistics for the venue dashboards (my_venues, my_bookings).
+
+BookingStats reads the counts and revenue of a set of bookings with a single
+query grouped by venue and status, instead of one count query per status tab
+and summing total_amount over every booking in Python.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from .models import VenueBooking, BLOCKING_BOOKING_STATUSES
+
+CENT = Decimal('0.01')
+
+
+def _venue_totals():
+    return {'total_bookings': 0, 'pending_bookings': 0, 'total_revenue': Decimal('0.00')}
+
+
+class BookingStats:
+    """
+    Booking counts per status and per venue, and revenue (the amounts of confirmed
+    and completed bookings), of the bookings queryset
+    """
+
+    def __init__(self, bookings):
+        self.by_status = {status: 0 for status, _ in VenueBooking.BOOKING_STATUS_CHOICES}
+        self.by_venue = {}
+        self.total_count = 0
+        self.revenue = Decimal('0.00')
+        rows = bookings.order_by().values('venue_id', 'status').annotate(
+            count=Count('pk'), amount=Sum('total_amount')
+        )
+        for row in rows:
+            venue = self.by_venue.setdefault(row['venue_id'], _venue_totals())
+            venue['total_bookings'] += row['count']
+            self.by_status[row['status']] = self.by_status.get(row['status'], 0) + row['count']
+            self.total_count += row['count']
+            if row['status'] == 'pending':
+                venue['pending_bookings'] += row['count']
+            if row['status'] in BLOCKING_BOOKING_STATUSES:
+                # SQLite sums decimals as floats; the amounts themselves have cents
+                amount = (row['amount'] or Decimal(0)).quantize(CENT)
+                venue['total_revenue'] += amount
+                self.revenue += amount
+
+    def count(self, status):
+        return self.by_status.get(status, 0)
+
+    def venue(self, venue_id):
+        """{'total_bookings', 'pending_bookings', 'total_revenue'} of one venue"""
+        return self.by_venue.get(venue_id, _venue_totals())
+
+    def tab_counts(self):
+        """The *_count context variables of the booking status tabs"""
+        return {
+            'total_count': self.total_count,
+            **{f'{status}_count': count for status, count in self.by_status.items()},
+        }
@@ -1,3 +1,469 @@
-from django.test import TestCase
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .availability import VenueCalendar, venue_calendars
+from .geo import EARTH_RADIUS_KM, encode_geohash
+from .pricing import price_calendar, quote, window_price
+from .stats import BookingStats
+from .models import (
+    ALL_AMENITIES_MASK, AMENITY_BITS, RATING_AVG, Venue, VenueBooking, VenueUnavailable, amenity_mask, rating_prior,
+)
+
+
+def make_user(username, role='basic_user'):
+    user = User.objects.create(username=username)
+    user.profile.role = role
+    user.profile.save()
+    return user
+
+
+def make_venue(manager, **fields):
+    defaults = {
+        'name': 'Test Venue',
+        'description': 'A venue',
+        'manager': manager,
+        'address': '1 Test Street',
+        'city': 'Dhaka',
+        'state': 'Dhaka',
+        'zipcode': '1000',
+        'country': 'Bangladesh',
+        'capacity': 100,
+        'price_per_hour': Decimal('10.00'),
+    }
+    defaults.update(fields)
+    return Venue.objects.create(**defaults)
+
+
+def make_booking(venue, user, start, end, status='pending', **fields):
+    defaults = {
+        'event_title': 'Test Booking',
+        'event_description': 'A booking',
+        'total_amount': Decimal('100.00'),
+        'contact_email': 'booker@example.com',
+        'contact_phone': '0123456789',
+    }
+    defaults.update(fields)
+    return VenueBooking.objects.create(venue=venue, user=user, start_date=start, end_date=end, status=status, **defaults)
+
+
+class ManagerBookingsPaginationTests(TestCase):
+    def setUp(self):
+        self.manager = make_user('manager', role='venue_manager')
+        self.booker = make_user('booker')
+        venue = make_venue(self.manager)
+        start = timezone.now() + timedelta(days=10)
+        for day in range(25):
+            make_booking(venue, self.booker, start + timedelta(days=day), start + timedelta(days=day, hours=2))
+        self.client.force_login(self.manager)
+        self.url = reverse('venues:my_bookings')
+
+    def test_default_pages_use_cursor_links(self):
+        response = self.client.get(self.url)
+
+        page = response.context['page_obj']
+        self.assertTrue(page.is_cursor)
+        self.assertEqual(len(page), 20)
+        self.assertContains(response, '?cursor=')
+        self.assertNotContains(response, 'Page 1 of')
+
+    def test_page_parameter_gets_offset_links(self):
+        response = self.client.get(self.url, {'page': 2})
+
+        page = response.context['page_obj']
+        self.assertFalse(getattr(page, 'is_cursor', False))
+        self.assertEqual(len(page), 5)
+        self.assertContains(response, 'Page 2 of 2')
+        self.assertContains(response, '?page=1')
+        self.assertNotContains(response, 'cursor=')
+
+
+class VenueBookingOverlapTests(TestCase):
+    def setUp(self):
+        self.manager = make_user('manager', role='venue_manager')
+        self.booker = make_user('booker')
+        self.venue = make_venue(self.manager)
+        self.start = (timezone.now() + timedelta(days=10)).replace(minute=0, second=0, microsecond=0)
+        self.booked = make_booking(self.venue, self.booker, self.start, self.start + timedelta(hours=4), status='confirmed')
+
+    def hours(self, start, end):
+        return self.start + timedelta(hours=start), self.start + timedelta(hours=end)
+
+    def test_back_to_back_bookings_are_allowed(self):
+        before = make_booking(self.venue, self.booker, *self.hours(-2, 0), status='confirmed')
+        after = make_booking(self.venue, self.booker, *self.hours(4, 6), status='confirmed')
+
+        self.assertEqual(VenueBooking.objects.filter(status='confirmed').count(), 3)
+        self.assertFalse(before.conflicts().exists())
+        self.assertFalse(after.conflicts().exists())
+
+    def test_overlapping_booking_is_rejected(self):
+        for start, end in [(3, 5), (-1, 1), (1, 2), (-1, 5), (0, 4)]:
+            with self.subTest(hours=(start, end)):
+                with self.assertRaises(VenueUnavailable):
+                    make_booking(self.venue, self.booker, *self.hours(start, end), status='confirmed')
+        self.assertEqual(VenueBooking.objects.count(), 1)
+
+    def test_confirming_an_overlapping_request_is_rejected(self):
+        request = make_booking(self.venue, self.booker, *self.hours(2, 6))
+        request.status = 'confirmed'
+
+        with self.assertRaises(ValidationError):
+            request.clean()
+        with self.assertRaises(VenueUnavailable):
+            request.save()
+        request.refresh_from_db()
+        self.assertEqual(request.status, 'pending')
+
+    def test_moving_a_confirmed_booking_onto_another_is_rejected(self):
+        later = make_booking(self.venue, self.booker, *self.hours(6, 8), status='confirmed')
+        later.start_date, later.end_date = self.hours(3, 8)
+
+        with self.assertRaises(VenueUnavailable):
+            later.save()
+
+    def test_cancelled_and_pending_bookings_do_not_block(self):
+        self.booked.status = 'cancelled'
+        self.booked.save()
+        make_booking(self.venue, self.booker, *self.hours(1, 3))
+
+        replacement = make_booking(self.venue, self.booker, *self.hours(0, 4), status='confirmed')
+        self.assertEqual(replacement.status, 'confirmed')
+
+    def test_other_venues_do_not_block(self):
+        other = make_venue(self.manager, name='Other Venue')
+        make_booking(other, self.booker, *self.hours(0, 4), status='confirmed')
+
+        self.assertEqual(VenueBooking.objects.filter(status='confirmed').count(), 2)
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        manager = make_user('manager', role='venue_manager')
+        booker = make_user('booker')
+        self.start = (timezone.now() + timedelta(days=10)).replace(minute=0, second=0, microsecond=0)
+        self.venues = [make_venue(manager, name=f'Venue {number}') for number in range(4)]
+        bookings = [
+            (0, 0, 4, 'confirmed'),
+            (0, 10, 12, 'completed'),
+            (1, 2, 3, 'confirmed'),
+            (1, 3, 8, 'cancelled'),
+            (2, 5, 9, 'pending'),
+            (3, 4, 6, 'confirmed'),
+            (3, 6, 7, 'confirmed'),
+        ]
+        for venue, start, end, status in bookings:
+            make_booking(self.venues[venue], booker, *self.hours(start, end), status=status)
+
+    def hours(self, start, end):
+        return self.start + timedelta(hours=start), self.start + timedelta(hours=end)
+
+    def test_available_between_agrees_with_the_calendars(self):
+        venue_ids = [venue.pk for venue in self.venues]
+        windows = [(0, 1), (3, 4), (4, 5), (2, 3), (7, 10), (6, 7), (12, 14), (-2, 0), (-1, 13)]
+        for start, end in windows:
+            window = self.hours(start, end)
+            with self.subTest(hours=(start, end)):
+                in_sql = set(Venue.objects.filter(pk__in=venue_ids).available_between(*window).values_list('pk', flat=True))
+                calendars = venue_calendars(venue_ids, *window)
+                in_memory = {pk for pk, calendar in calendars.items() if calendar.is_free(*window)}
+                self.assertEqual(in_sql, in_memory)
+
+    def test_available_between_edges(self):
+        free = set(Venue.objects.available_between(*self.hours(4, 5)).values_list('name', flat=True))
+        self.assertEqual(free, {'Venue 0', 'Venue 1', 'Venue 2'})
+
+        free = set(Venue.objects.available_between(*self.hours(-1, 13)).values_list('name', flat=True))
+        self.assertEqual(free, {'Venue 2'})
+
+    def test_calendar_overlapping(self):
+        calendar = VenueCalendar([
+            (self.start, self.start + timedelta(hours=10), 1),
+            (self.start + timedelta(hours=1), self.start + timedelta(hours=2), 2),
+            (self.start + timedelta(hours=4), self.start + timedelta(hours=5), 3),
+        ])
+
+        # The long first booking keeps the running end high, so later short ones are still found
+        self.assertEqual([pk for _, _, pk in calendar.overlapping(*self.hours(4, 6))], [1, 3])
+        self.assertEqual(calendar.overlapping(*self.hours(10, 11)), [])
+        self.assertTrue(calendar.is_free(*self.hours(-1, 0)))
+        self.assertFalse(calendar.is_free(*self.hours(9, 11)))
+
+
+class PricingTests(TestCase):
+    def setUp(self):
+        self.manager = make_user('manager', role='venue_manager')
+        # Friday 4 January 2030, midnight UTC
+        self.friday = datetime(2030, 1, 4, tzinfo=dt_timezone.utc)
+
+    def at(self, days=0, hours=0, minutes=0):
+        return self.friday + timedelta(days=days, hours=hours, minutes=minutes)
+
+    def test_partial_days(self):
+        hourly = make_venue(self.manager, price_per_hour=Decimal('10.00'))
+        daily = make_venue(self.manager, price_per_hour=Decimal('0.00'), price_per_day=Decimal('100.00'))
+        cases = [
+            (hourly, 0, 90, '15.00'),
+            (hourly, 0, 20, '3.33'),
+            (hourly, 0, 36 * 60, '360.00'),
+            # The daily rate charges whole days, at least one
+            (daily, 0, 5 * 60, '100.00'),
+            (daily, 0, 36 * 60, '100.00'),
+            (daily, 0, 48 * 60, '200.00'),
+            (daily, 10 * 60, 10 * 60 + 49 * 60, '200.00'),
+        ]
+        for venue, start, end, expected in cases:
+            with self.subTest(rate=venue.price_per_hour, minutes=(start, end)):
+                self.assertEqual(window_price(venue, self.at(minutes=start), self.at(minutes=end)), Decimal(expected))
+
+    def test_weekend_days_cost_the_same(self):
+        daily = make_venue(self.manager, price_per_hour=Decimal('0.00'), price_per_day=Decimal('80.00'))
+        hourly = make_venue(self.manager, price_per_hour=Decimal('12.50'))
+        weekdays = [(self.at(days=day), self.at(days=day + 1)) for day in range(7)]
+
+        quotes = quote([daily, hourly], weekdays)
+        self.assertEqual({entry['price'] for entry in quotes[daily.pk]}, {Decimal('80.00')})
+        self.assertEqual({entry['price'] for entry in quotes[hourly.pk]}, {Decimal('300.00')})
+        # Friday to Monday morning: three whole days at the daily rate
+        self.assertEqual(window_price(daily, self.at(), self.at(days=3)), Decimal('240.00'))
+
+        calendar = price_calendar(daily, 2030, 1)
+        self.assertEqual(len(calendar), 31)
+        self.assertEqual({entry['price'] for entry in calendar}, {Decimal('80.00')})
+
+    def test_list_prices_match_quotes(self):
+        rates = ['0.15', '12.35', '19.99', '33.33', '7.05']
+        venues = [make_venue(self.manager, name=f'Venue {rate}', price_per_hour=Decimal(rate)) for rate in rates]
+        venues.append(make_venue(self.manager, name='Daily', price_per_hour=Decimal('0.00'), price_per_day=Decimal('45.50')))
+        start, end = self.at(hours=9), self.at(hours=9, minutes=30)
+        quoted = {pk: entries[0]['price'] for pk, entries in quote(venues, [(start, end)]).items()}
+
+        response = self.client.get(reverse('venues:available_venues'), {
+            'start': '2030-01-04T09:00', 'end': '2030-01-04T09:30', 'sort': 'price_asc',
+        })
+
+        results = response.json()['results']
+        self.assertEqual({item['id']: Decimal(item['window_price']) for item in results}, quoted)
+        prices = [Decimal(item['window_price']) for item in results]
+        self.assertEqual(prices, sorted(prices))
+        # Half a cent rounds the same way as a booking: 0.15/h for half an hour
+        self.assertEqual(quoted[venues[0].pk], Decimal('0.08'))
+
+    def test_venue_list_shows_the_quoted_price(self):
+        venue = make_venue(self.manager, price_per_hour=Decimal('12.35'))
+
+        response = self.client.get(reverse('venues:venue_list'), {
+            'start': '2030-01-04T09:00', 'end': '2030-01-04T09:07', 'sort': 'price_asc',
+        })
+
+        listed = response.context['page_obj'][0]
+        self.assertEqual(listed.window_price, window_price(venue, self.at(hours=9), self.at(hours=9, minutes=7)))
+        self.assertContains(response, '$1.44')
+
+
+class AmenityFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['generations'].clear()
+        manager = make_user('manager', role='venue_manager')
+        combinations = {
+            'Bare': [],
+            'Wired': ['has_wifi'],
+            'Parked': ['has_parking', 'has_wifi'],
+            'Catered': ['has_catering', 'has_wifi', 'has_air_conditioning'],
+            'Everything': list(AMENITY_BITS),
+        }
+        for name, fields in combinations.items():
+            make_venue(manager, name=name, **{field: field in fields for field in AMENITY_BITS})
+
+    def names(self, queryset):
+        return set(queryset.values_list('name', flat=True))
+
+    def test_mask_from_keys_and_labels(self):
+        self.assertEqual(amenity_mask(['wifi', 'Parking', ' A/V Equipment ', 'sauna']),
+                         AMENITY_BITS['has_wifi'] | AMENITY_BITS['has_parking'] | AMENITY_BITS['has_av_equipment'])
+        self.assertEqual(amenity_mask([]), 0)
+
+    def test_filter_keeps_supersets_of_every_mask(self):
+        venues = list(Venue.objects.all())
+        for mask in range(ALL_AMENITIES_MASK + 1):
+            with self.subTest(mask=mask):
+                expected = {venue.name for venue in venues if venue.amenity_mask & mask == mask}
+                self.assertEqual(self.names(Venue.objects.with_amenities(mask)), expected)
+
+    def test_saving_amenity_fields_updates_the_mask(self):
+        venue = Venue.objects.get(name='Bare')
+        venue.has_wifi = venue.has_catering = True
+        venue.save(update_fields=['has_wifi', 'has_catering'])
+
+        venue.refresh_from_db()
+        self.assertEqual(venue.amenity_mask, AMENITY_BITS['has_wifi'] | AMENITY_BITS['has_catering'])
+        self.assertEqual(venue.amenities_list, ['WiFi', 'Catering'])
+
+    def test_venue_list_filters_by_amenities(self):
+        response = self.client.get(reverse('venues:venue_list'), {'amenities': ['wifi', 'Air Conditioning']})
+
+        self.assertEqual({venue.name for venue in response.context['page_obj']}, {'Catered', 'Everything'})
+
+
+@override_settings(VENUE_RATING_PRIOR_WEIGHT=5)
+class RatingSortTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['generations'].clear()
+        manager = make_user('manager', role='venue_manager')
+        # name: (rating_sum, rating_count)
+        for name, (total, count) in {
+            'Two perfect': (10, 2),
+            'Many great': (980, 200),
+            'Mediocre': (30, 10),
+            'Unrated': (0, 0),
+        }.items():
+            venue = make_venue(manager, name=name)
+            Venue.objects.filter(pk=venue.pk).update(rating_sum=total, rating_count=count)
+        Venue.objects.update(rating_avg=RATING_AVG)
+
+    def listed(self, sort):
+        response = self.client.get(reverse('venues:venue_list'), {'sort': sort})
+        return [venue.name for venue in response.context['page_obj']]
+
+    def test_prior_is_the_mean_of_all_reviews(self):
+        mean, weight = rating_prior()
+
+        self.assertAlmostEqual(mean, 1020 / 212)
+        self.assertEqual(weight, 5)
+
+    def test_score_shrinks_small_samples_towards_the_mean(self):
+        mean = 1020 / 212
+        scores = dict(Venue.objects.with_rating_score().values_list('name', 'rating_score'))
+
+        self.assertAlmostEqual(scores['Two perfect'], (5 * mean + 10) / 7)
+        self.assertAlmostEqual(scores['Unrated'], mean)
+        self.assertGreater(scores['Many great'], scores['Two perfect'])
+
+    def test_venue_list_rating_sorts(self):
+        self.assertEqual(self.listed('rating'), ['Two perfect', 'Many great', 'Mediocre', 'Unrated'])
+        self.assertEqual(self.listed('rating_weighted'), ['Many great', 'Two perfect', 'Unrated', 'Mediocre'])
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GeoSearchTests(TestCase):
+    PLACES = {
+        'Motijheel': (23.7330, 90.4172),
+        'Gulshan': (23.7925, 90.4078),
+        'Uttara': (23.8759, 90.3795),
+        'Savar': (23.8583, 90.2667),
+        'Narayanganj': (23.6238, 90.5000),
+        'Chittagong': (22.3569, 91.7832),
+        'Fiji East': (-17.0, 179.9),
+        'Fiji West': (-17.0, -179.9),
+    }
+
+    def setUp(self):
+        manager = make_user('manager', role='venue_manager')
+        for name, (latitude, longitude) in self.PLACES.items():
+            make_venue(manager, name=name, latitude=latitude, longitude=longitude)
+        make_venue(manager, name='Nowhere', city='Atlantis', country='Nowhere')
+
+    def test_geohash_encoding(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744), 'u4pruydqq')
+        self.assertEqual(Venue.objects.get(name='Gulshan').geohash, encode_geohash(23.7925, 90.4078))
+        self.assertEqual(Venue.objects.get(name='Nowhere').geohash, '')
+
+    def test_near_matches_a_full_scan(self):
+        for latitude, longitude, radius in [(23.81, 90.41, 5), (23.81, 90.41, 12), (23.81, 90.41, 30),
+                                            (23.0, 91.0, 150), (-17.0, 180.0, 20)]:
+            with self.subTest(point=(latitude, longitude), radius=radius):
+                found = {venue.name: venue.distance for venue in Venue.objects.near(latitude, longitude, radius)}
+                expected = {
+                    name: haversine(latitude, longitude, *place) for name, place in self.PLACES.items()
+                    if haversine(latitude, longitude, *place) <= radius
+                }
+                self.assertEqual(set(found), set(expected))
+                for name, distance in found.items():
+                    self.assertAlmostEqual(distance, expected[name], places=6)
+
+    def test_within_bbox_crossing_the_antimeridian(self):
+        names = set(Venue.objects.within_bbox(-18, 179, -16, -179).values_list('name', flat=True))
+        self.assertEqual(names, {'Fiji East', 'Fiji West'})
+
+        names = set(Venue.objects.within_bbox(23.7, 90.3, 23.9, 90.45).values_list('name', flat=True))
+        self.assertEqual(names, {'Motijheel', 'Gulshan', 'Uttara'})
+
+    def test_nearby_api_is_sorted_by_distance(self):
+        response = self.client.get(reverse('venues:nearby_venues'), {'lat': 23.80, 'lng': 90.41, 'radius': 25})
+
+        results = response.json()['results']
+        expected = sorted(
+            (name for name, place in self.PLACES.items() if haversine(23.80, 90.41, *place) <= 25),
+            key=lambda name: haversine(23.80, 90.41, *self.PLACES[name]),
+        )
+        self.assertEqual(len(expected), 5)
+        self.assertEqual([item['name'] for item in results], expected)
+
+        response = self.client.get(reverse('venues:nearby_venues'), {'lat': 23.80})
+        self.assertEqual(response.status_code, 400)
+
+
+class BookingStatsTests(TestCase):
+    def setUp(self):
+        self.manager = make_user('manager', role='venue_manager')
+        self.booker = make_user('booker')
+        self.hall = make_venue(self.manager, name='Hall')
+        self.garden = make_venue(self.manager, name='Garden')
+        other = make_venue(make_user('other', role='venue_manager'), name='Elsewhere')
+        start = timezone.now() + timedelta(days=10)
+        for offset, (venue, status, amount) in enumerate([
+            (self.hall, 'pending', '40.00'),
+            (self.hall, 'confirmed', '100.10'),
+            (self.hall, 'completed', '59.95'),
+            (self.hall, 'cancelled', '80.00'),
+            (self.garden, 'pending', '25.00'),
+            (self.garden, 'confirmed', '10.05'),
+            (other, 'confirmed', '999.00'),
+        ]):
+            slot = start + timedelta(days=offset)
+            make_booking(venue, self.booker, slot, slot + timedelta(hours=2), status=status, total_amount=Decimal(amount))
+
+    def test_counts_and_revenue_per_venue_and_status(self):
+        with self.assertNumQueries(1):
+            stats = BookingStats(VenueBooking.objects.managed_by(self.manager))
+
+        self.assertEqual(stats.total_count, 6)
+        self.assertEqual((stats.count('pending'), stats.count('confirmed'), stats.count('cancelled')), (2, 2, 1))
+        self.assertEqual(stats.revenue, Decimal('170.10'))
+        self.assertEqual(stats.venue(self.hall.pk),
+                         {'total_bookings': 4, 'pending_bookings': 1, 'total_revenue': Decimal('160.05')})
+        self.assertEqual(stats.venue(self.garden.pk)['total_revenue'], Decimal('10.05'))
+        self.assertEqual(stats.venue(0), {'total_bookings': 0, 'pending_bookings': 0, 'total_revenue': Decimal('0.00')})
+        self.assertEqual(stats.tab_counts()['completed_count'], 1)
+
+    def test_bookings_follow_a_change_of_manager(self):
+        successor = make_user('successor', role='venue_manager')
+        self.garden.manager = successor
+        self.garden.save()
+
+        self.assertEqual(BookingStats(VenueBooking.objects.managed_by(self.manager)).total_count, 4)
+        self.assertEqual(BookingStats(VenueBooking.objects.managed_by(successor)).total_count, 2)
+
+    def test_dashboard_shows_per_venue_figures(self):
+        self.client.force_login(self.manager)
+
+        response = self.client.get(reverse('venues:my_venues'))
+
+        venues = {venue.name: venue for venue in response.context['user_venues']}
+        self.assertEqual((venues['Hall'].total_bookings, venues['Hall'].total_revenue), (4, Decimal('160.05')))
+        self.assertEqual(response.context['total_revenue'], Decimal('170.10'))
+        self.assertEqual(response.context['pending_bookings'], 2)
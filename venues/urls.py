@@ -7,6 +7,10 @@ urlpatterns = [
     # Venue listing and details
     path('', views.venue_list, name='venue_list'),
     path('<int:pk>/', views.venue_detail, name='venue_detail'),
+    path('api/available/', views.available_venues, name='available_venues'),
+    path('api/nearby/', views.nearby_venues, name='nearby_venues'),
+    path('api/quote/', views.venue_quote, name='venue_quote'),
+    path('<int:pk>/api/price-calendar/', views.venue_price_calendar, name='venue_price_calendar'),
     
     # Venue management (for venue managers and admins)
     path('create/', views.venue_create, name='venue_create'),
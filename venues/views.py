@@ -1,13 +1,22 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.urls import reverse
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import JsonResponse, HttpResponse
-from decimal import Decimal
-from .models import Venue, VenueBooking, VenueImage, VenueComment, VenueCommentLike
-from .forms import VenueForm, VenueBookingForm, VenueCommentForm
+from .models import Venue, VenueBooking, VenueImage, VenueComment, VenueCommentLike, VenueUnavailable, AMENITIES, amenity_mask
+from .forms import (
+    VenueForm, VenueBookingForm, VenueCommentForm, VenueAvailabilityForm, VenueNearbyForm, VenueQuoteForm,
+    VenuePriceCalendarForm,
+)
+from .pricing import price_calendar, quote, set_window_prices, window_price
+from .stats import BookingStats
 from users.decorators import role_required
+from search import index as search_index
+from core.pagination import paginate, cursor_page_json, CursorPaginator
+from core.cache import cache_list_page
+from core.comments import load_comment_tree
 from notifications.helpers import create_venue_booking_notification, create_venue_booking_request_notification
 
 # Add PDF generation imports
@@ -20,20 +29,62 @@ from reportlab.pdfgen import canvas
 from io import BytesIO
 from datetime import datetime
 
+# Pending requests listed on the my_venues dashboard; the rest are on my_bookings?status=pending
+PENDING_REQUESTS_SHOWN = 20
+
+
+def _venue_list_generations(request):
+    # Availability depends on bookings too, but plain listings should not be invalidated by them
+    if request.GET.get('start') or request.GET.get('end'):
+        return ['venues', 'venue_bookings']
+    return ['venues']
+
+
+def _venue_json(venue):
+    data = {
+        'id': venue.pk,
+        'name': venue.name,
+        'venue_type': venue.venue_type,
+        'city': venue.city,
+        'capacity': venue.capacity,
+        'price_per_hour': str(venue.price_per_hour),
+        'average_rating': venue.average_rating,
+        'amenities': venue.amenities_list,
+        'url': reverse('venues:venue_detail', args=[venue.pk]),
+    }
+    if hasattr(venue, 'window_price'):
+        data['window_price'] = str(venue.window_price)
+    if hasattr(venue, 'distance'):
+        data['latitude'], data['longitude'] = venue.latitude, venue.longitude
+        data['distance_km'] = round(venue.distance, 2)
+    return data
+
+
+@cache_list_page('venue_list', _venue_list_generations)
 def venue_list(request):
     """List all active venues with search, filtering, and sorting"""
     venues = Venue.objects.filter(is_available=True).prefetch_related('images')
     
+    # Availability window: only venues free for the whole window, priced for it
+    window_form = None
+    if request.GET.get('start') or request.GET.get('end'):
+        window_form = VenueAvailabilityForm({'start': request.GET.get('start'), 'end': request.GET.get('end')})
+        if window_form.is_valid():
+            start, end = window_form.cleaned_data['start'], window_form.cleaned_data['end']
+            venues = venues.available_between(start, end).with_window_price(start, end)
+    
+    # Near a point: geohash cell scans plus an exact radius test, sortable by distance
+    location_form = None
+    if request.GET.get('lat') or request.GET.get('lng'):
+        location_form = VenueNearbyForm({key: request.GET.get(key) for key in ('lat', 'lng', 'radius')})
+        if location_form.is_valid():
+            venues = location_form.filter(venues)
+    located = location_form is not None and location_form.is_valid()
+    
     # Search functionality
     search_query = request.GET.get('q', '')
     if search_query:
-        venues = venues.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(venue_type__icontains=search_query) |
-            Q(address__icontains=search_query) |
-            Q(city__icontains=search_query)
-        )
+        venues = search_index.search(venues, search_query)
     
     # Filter by venue type
     venue_type = request.GET.get('type', '')
@@ -48,13 +99,12 @@ def venue_list(request):
         except ValueError:
             pass
     
-    # Filter by amenities
+    # Filter by amenities: one indexed predicate on the amenity bitmask, whatever the combination
     amenities = request.GET.getlist('amenities')
-    for amenity in amenities:
-        venues = venues.filter(amenities__icontains=amenity)
+    venues = venues.with_amenities(amenity_mask(amenities))
     
     # Sorting functionality
-    sort_by = request.GET.get('sort', 'name')
+    sort_by = request.GET.get('sort', 'relevance' if search_query else 'distance' if located else 'name')
     sort_options = {
         'name_asc': 'name',
         'name_desc': '-name',
@@ -64,41 +114,60 @@ def venue_list(request):
         'capacity_desc': '-capacity',
         'newest': '-created_at',
         'oldest': 'created_at',
-        'rating': '-rating',  # Assuming there's a rating field
+        'rating': ['-rating_avg', '-rating_count'],
+        'rating_weighted': '-rating_score',
         'city': 'city',
     }
-    
-    if sort_by in sort_options:
-        venues = venues.order_by(sort_options[sort_by])
-    else:
-        venues = venues.order_by('name')
-    
-    # Pagination
-    paginator = Paginator(venues, 12)  # Show 12 venues per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if search_query:
+        sort_options['relevance'] = 'search_rank'
+    if window_form is not None and window_form.is_valid():
+        # Sort by what the requested window costs, not the hourly rate
+        sort_options['price_asc'] = 'window_price_sort'
+        sort_options['price_desc'] = '-window_price_sort'
+    if located:
+        sort_options['distance'] = 'distance'
+    
+    sort_fields = sort_options.get(sort_by, 'name')
+    if isinstance(sort_fields, str):
+        sort_fields = [sort_fields]
+    if sort_by == 'rating_weighted':
+        venues = venues.with_rating_score()
+    # pk breaks ties so the ordering is unique for cursor pagination
+    ordering = [*sort_fields, '-pk' if sort_fields[0].startswith('-') else 'pk']
+    venues = venues.order_by(*ordering)
+    
+    # Pagination (12 venues per page); ?cursor= switches to keyset pages
+    page_obj = paginate(request, venues, 12, ordering)
+    if window_form is not None and window_form.is_valid():
+        set_window_prices(page_obj, start, end)
+    
+    if request.GET.get('format') == 'json':
+        return cursor_page_json(page_obj, _venue_json)
     
     # Get venue type choices for filter dropdown
     venue_types = Venue.VENUE_TYPE_CHOICES
     
     # Sort options for dropdown
     sort_choices = [
+        ('relevance', 'Best Match'),
+        ('distance', 'Nearest First'),
         ('name_asc', 'Name (A-Z)'),
         ('name_desc', 'Name (Z-A)'),
         ('price_asc', 'Price (Low to High)'),
         ('price_desc', 'Price (High to Low)'),
         ('capacity_asc', 'Capacity (Small to Large)'),
         ('capacity_desc', 'Capacity (Large to Small)'),
+        ('rating', 'Highest Rated'),
+        ('rating_weighted', 'Top Rated (weighted by reviews)'),
         ('newest', 'Newest First'),
         ('oldest', 'Oldest First'),
         ('city', 'City (A-Z)'),
     ]
+    if not located:
+        sort_choices = [choice for choice in sort_choices if choice[0] != 'distance']
     
-    # Common amenities for filter
-    common_amenities = [
-        'WiFi', 'Parking', 'Air Conditioning', 'Sound System', 'Projector',
-        'Catering', 'Kitchen', 'Bar', 'Stage', 'Dance Floor'
-    ]
+    # Amenities for filter checkboxes (key, label)
+    common_amenities = [(key, label) for _, key, label in AMENITIES]
     
     return render(request, 'venues/venue_list.html', {
         'page_obj': page_obj,
@@ -110,8 +179,95 @@ def venue_list(request):
         'venue_types': venue_types,
         'sort_choices': sort_choices,
         'common_amenities': common_amenities,
+        'window_start': request.GET.get('start', ''),
+        'window_end': request.GET.get('end', ''),
+        'window_form': window_form,
+        'location_form': location_form,
+        'location_lat': request.GET.get('lat', ''),
+        'location_lng': request.GET.get('lng', ''),
+        'radius': request.GET.get('radius', ''),
+        'radius_choices': VenueNearbyForm.RADIUS_CHOICES,
+        'default_radius': VenueNearbyForm.DEFAULT_RADIUS_KM,
     })
 
+def available_venues(request):
+    """
+    JSON API: venues with no confirmed booking overlapping ?start=&end=, with their
+    price for that window. Optional min_capacity, type, amenities and sort (default price_asc);
+    pages are keyset-paginated with ?cursor=.
+    """
+    form = VenueAvailabilityForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    data = form.cleaned_data
+    venues = Venue.objects.filter(is_available=True).available_between(
+        data['start'], data['end']
+    ).with_window_price(data['start'], data['end'])
+    if data['min_capacity']:
+        venues = venues.filter(capacity__gte=data['min_capacity'])
+    if data['type']:
+        venues = venues.filter(venue_type=data['type'])
+    venues = venues.with_amenities(amenity_mask(request.GET.getlist('amenities')))
+    
+    ordering = {
+        'price_asc': ['window_price_sort', 'pk'],
+        'price_desc': ['-window_price_sort', '-pk'],
+        'capacity_asc': ['capacity', 'pk'],
+        'capacity_desc': ['-capacity', '-pk'],
+    }[data['sort'] or 'price_asc']
+    page = CursorPaginator(venues, 20, ordering).get_page(request.GET.get('cursor'))
+    set_window_prices(page, data['start'], data['end'])
+    return cursor_page_json(page, _venue_json)
+
+def nearby_venues(request):
+    """
+    JSON API: venues within ?radius= km (default 25) of ?lat=&lng=, or inside the box
+    ?min_lat=&min_lng=&max_lat=&max_lng=, nearest first (from the box centre) with their
+    distance. Optional min_capacity, type and amenities; pages are keyset-paginated with ?cursor=.
+    """
+    form = VenueNearbyForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    venues = form.filter(Venue.objects.filter(is_available=True))
+    min_capacity = request.GET.get('min_capacity', '')
+    if min_capacity.isdigit():
+        venues = venues.filter(capacity__gte=int(min_capacity))
+    if request.GET.get('type'):
+        venues = venues.filter(venue_type=request.GET['type'])
+    venues = venues.with_amenities(amenity_mask(request.GET.getlist('amenities')))
+    
+    page = CursorPaginator(venues, 20, ['distance', 'pk']).get_page(request.GET.get('cursor'))
+    return cursor_page_json(page, _venue_json)
+
+def venue_quote(request):
+    """
+    JSON API: price and availability of every ?window=start/end (up to 100) at every
+    ?venue=<id> (up to 50), e.g. ?venue=3&venue=7&window=2026-11-01T10:00/2026-11-01T14:00
+    """
+    form = VenueQuoteForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    venues = form.cleaned_data['venue']
+    quotes = quote(venues, form.cleaned_data['window'])
+    return JsonResponse({'venues': [
+        {**_venue_json(venue), 'quotes': quotes[venue.pk]} for venue in venues
+    ]})
+
+def venue_price_calendar(request, pk):
+    """
+    JSON API: for each day of ?month=YYYY-MM, the price and availability of the venue for
+    the whole day or for ?start_time=HH:MM&end_time=HH:MM, and the share already booked
+    """
+    venue = get_object_or_404(Venue, pk=pk, is_available=True)
+    form = VenuePriceCalendarForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    month = form.cleaned_data['month']
+    days = price_calendar(
+        venue, month.year, month.month, form.cleaned_data['start_time'], form.cleaned_data['end_time']
+    )
+    return JsonResponse({'venue': _venue_json(venue), 'month': month.strftime('%Y-%m'), 'days': days})
+
 def venue_detail(request, pk):
     """Show venue details and allow booking"""
     venue = get_object_or_404(
@@ -148,22 +304,8 @@ def venue_detail(request, pk):
     else:
         comment_form = VenueCommentForm()
     
-    # Get all comments (top-level comments only, replies will be handled in template)
-    comments = VenueComment.objects.filter(
-        venue=venue, 
-        parent=None
-    ).select_related('user', 'user__profile').prefetch_related(        
-        'likes',
-        'replies__user', 
-        'replies__user__profile',
-        'replies__likes',
-        'replies__replies__user',
-        'replies__replies__user__profile',
-        'replies__replies__likes',
-        'replies__replies__replies__user',
-        'replies__replies__replies__user__profile',
-        'replies__replies__replies__likes'
-    ).order_by('created_at')
+    # Whole comment thread in one query, linked into comment.children for the template
+    comments = load_comment_tree(VenueComment.objects.filter(venue=venue), user=request.user)
     
     # Check if current user can review this venue
     user_can_review_venue = False
@@ -302,16 +444,7 @@ def venue_book(request, pk):
             booking.user = request.user
             
             # Calculate amount based on venue pricing
-            duration = booking.end_date - booking.start_date
-            hours = Decimal(str(duration.total_seconds() / 3600))
-            
-            if venue.price_per_hour:
-                booking.total_amount = (venue.price_per_hour * hours).quantize(Decimal('0.01'))
-            elif venue.price_per_day:
-                days = max(1, int(float(hours) / 24))
-                booking.total_amount = (venue.price_per_day * Decimal(str(days))).quantize(Decimal('0.01'))
-            else:
-                booking.total_amount = Decimal('0.00')
+            booking.total_amount = window_price(venue, booking.start_date, booking.end_date)
             
             # Set initial status
             booking.status = 'pending'
@@ -357,16 +490,16 @@ def my_venues(request):
         # Event Manager Dashboard - only show their bookings and related info
         bookings = VenueBooking.objects.filter(user=request.user).order_by('-booking_date')
         
-        # Calculate statistics for event manager
-        total_bookings = bookings.count()
-        pending_bookings = bookings.filter(status='pending').count()
-        confirmed_bookings = bookings.filter(status='confirmed').count()
-        completed_bookings = bookings.filter(status='completed').count()
-        cancelled_bookings = bookings.filter(status='cancelled').count()
+        # Calculate statistics for event manager (one grouped query)
+        stats = BookingStats(bookings)
+        total_bookings = stats.total_count
+        pending_bookings = stats.count('pending')
+        confirmed_bookings = stats.count('confirmed')
+        completed_bookings = stats.count('completed')
+        cancelled_bookings = stats.count('cancelled')
         
         # Calculate total spent
-        confirmed_and_completed = bookings.filter(status__in=['confirmed', 'completed'])
-        total_spent = sum(booking.total_amount for booking in confirmed_and_completed)
+        total_spent = stats.revenue
         
         # Recent activity (last 5 bookings)
         recent_bookings = bookings[:5]
@@ -391,34 +524,37 @@ def my_venues(request):
         # User's managed venues (if they are venue manager or admin)
         managed_venues = []
         if user_role in ['admin', 'venue_manager']:
-            managed_venues = Venue.objects.filter(manager=request.user).order_by('-created_at')
+            managed_venues = list(
+                Venue.objects.filter(manager=request.user).prefetch_related('images').order_by('-created_at')
+            )
         
         # For venue managers, get booking requests for their venues
         pending_booking_requests = []
         venue_bookings = VenueBooking.objects.none()  # Initialize empty queryset
         
-        if user_role in ['admin', 'venue_manager'] and managed_venues:
-            # Get all bookings for managed venues
-            venue_bookings = VenueBooking.objects.filter(
-                venue__in=managed_venues
-            ).select_related('venue', 'user', 'user__profile').order_by('-booking_date')
+        if managed_venues:
+            # Bookings for managed venues, newest first in index order (only slices of them are loaded)
+            venue_bookings = VenueBooking.objects.managed_by(request.user).select_related(
+                'venue', 'user', 'user__profile'
+            ).order_by('-booking_date', '-pk')
             
-            # Get pending booking requests
-            pending_booking_requests = venue_bookings.filter(status='pending')
-        
-        # Calculate statistics based on managed venue bookings (not user's own bookings)
-        total_venues = managed_venues.count() if managed_venues else 0
+            # Oldest requests are still listed on my_bookings?status=pending
+            pending_booking_requests = venue_bookings.filter(status='pending')[:PENDING_REQUESTS_SHOWN]
         
-        # Statistics based on bookings for managed venues
-        total_bookings = venue_bookings.count()
-        pending_bookings = venue_bookings.filter(status='pending').count()
+        # Per-venue and per-status counts and revenue in one grouped query
+        stats = BookingStats(venue_bookings)
+        for venue in managed_venues:
+            for name, value in stats.venue(venue.pk).items():
+                setattr(venue, name, value)
         
-        # Calculate total revenue from confirmed and completed bookings for managed venues
-        confirmed_and_completed_bookings = venue_bookings.filter(status__in=['confirmed', 'completed'])
-        total_revenue = sum(booking.total_amount for booking in confirmed_and_completed_bookings)
+        # Calculate statistics based on managed venue bookings (not user's own bookings)
+        total_venues = len(managed_venues)
+        total_bookings = stats.total_count
+        pending_bookings = stats.count('pending')
+        total_revenue = stats.revenue
         
         # Recent activity (last 5 bookings for managed venues)
-        recent_bookings = venue_bookings[:5] if venue_bookings.exists() else bookings[:5]
+        recent_bookings = venue_bookings[:5] if total_bookings else bookings[:5]
         
         return render(request, 'venues/my_venues.html', {
             'bookings': bookings,
@@ -443,12 +579,11 @@ def my_bookings(request):
         # For venue managers, show bookings for their venues
         if user_role == 'admin':
             # Admins see all bookings
-            bookings = VenueBooking.objects.all().order_by('-booking_date')
+            all_bookings = VenueBooking.objects.all()
         else:
-            # Venue managers see bookings for their venues
-            bookings = VenueBooking.objects.filter(
-                venue__manager=request.user
-            ).order_by('-booking_date')
+            # Venue managers see bookings for their venues (indexed on venue_manager, status, booking_date)
+            all_bookings = VenueBooking.objects.managed_by(request.user)
+        bookings = all_bookings
         
         # Add status filtering
         status_filter = request.GET.get('status', 'all')
@@ -465,20 +600,17 @@ def my_bookings(request):
                 Q(venue__name__icontains=search_query)
             )
         
-        # Calculate counts for tabs
-        all_bookings = VenueBooking.objects.filter(venue__manager=request.user) if user_role == 'venue_manager' else VenueBooking.objects.all()
-        counts = {
-            'total_count': all_bookings.count(),
-            'pending_count': all_bookings.filter(status='pending').count(),
-            'confirmed_count': all_bookings.filter(status='confirmed').count(),
-            'completed_count': all_bookings.filter(status='completed').count(),
-            'cancelled_count': all_bookings.filter(status='cancelled').count(),
-            'rejected_count': all_bookings.filter(status='rejected').count(),
-        }
+        # Calculate counts for tabs (one grouped query)
+        counts = BookingStats(all_bookings).tab_counts()
+        
+        # Keyset pagination keeps large booking histories cheap to page through
+        page_obj = paginate(request, bookings.select_related('venue', 'user'), 20,
+                            ['-booking_date', '-pk'], cursor_default=True)
         
         template_name = 'venues/my_bookings_manager.html'
         context = {
-            'bookings': bookings,
+            'bookings': page_obj,
+            'page_obj': page_obj,
             'current_status': status_filter,
             'search_query': search_query,
             'user_role': user_role,
@@ -486,12 +618,26 @@ def my_bookings(request):
         }
     else:
         # For regular users, show only their own bookings
-        bookings = VenueBooking.objects.filter(user=request.user).order_by('-booking_date')
+        bookings = VenueBooking.objects.filter(user=request.user).select_related('venue')
+        page_obj = paginate(request, bookings, 20, ['-booking_date', '-pk'], cursor_default=True)
         template_name = 'venues/my_bookings.html'
         context = {
-            'bookings': bookings,
+            'bookings': page_obj,
+            'page_obj': page_obj,
         }
     
+    if request.GET.get('format') == 'json':
+        return cursor_page_json(page_obj, lambda booking: {
+            'id': booking.pk,
+            'venue': booking.venue.name,
+            'event_title': booking.event_title,
+            'start_date': booking.start_date.isoformat(),
+            'end_date': booking.end_date.isoformat(),
+            'status': booking.status,
+            'total_amount': str(booking.total_amount),
+            'booking_date': booking.booking_date.isoformat(),
+        })
+    
     return render(request, template_name, context)
 
 @login_required
@@ -554,7 +700,13 @@ def update_booking_status(request, pk):
         new_status = request.POST.get('status')
         if new_status in ['pending', 'confirmed', 'cancelled', 'completed', 'rejected']:
             booking.status = new_status
-            booking.save()
+            try:
+                booking.save()
+            except VenueUnavailable as exc:
+                if request.headers.get('Content-Type') == 'application/x-www-form-urlencoded':
+                    return JsonResponse({'error': str(exc)}, status=409)
+                messages.error(request, f'Could not mark the booking {new_status}: {exc}')
+                return redirect('venues:my_bookings')
             
             # Return JSON response for AJAX requests
             if request.headers.get('Content-Type') == 'application/x-www-form-urlencoded':